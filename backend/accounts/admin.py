@@ -1,9 +1,16 @@
 from django.contrib import admin
 
-from .models import CompanyProfile
+from .models import ApiToken, CompanyProfile
 
 
 @admin.register(CompanyProfile)
 class CompanyProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "legal_name", "tax_id", "updated_at")
     search_fields = ("user__username", "legal_name", "tax_id")
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    list_display = ("name", "user", "created_at", "last_used_at")
+    search_fields = ("name", "user__username")
+    readonly_fields = ("key_hash", "created_at", "last_used_at")
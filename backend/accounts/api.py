@@ -0,0 +1,44 @@
+from functools import wraps
+
+from django.http import JsonResponse
+from django.utils import timezone
+
+from .models import ApiToken
+
+
+def _bearer_key(request):
+    header = request.headers.get("Authorization", "")
+    scheme, _, key = header.partition(" ")
+    if scheme.lower() != "bearer" or not key.strip():
+        return None
+    return key.strip()
+
+
+def api_token_required(view):
+    """Authenticate the request with an ``Authorization: Bearer <key>`` header.
+
+    On success ``request.user`` is the token's owner and ``request.api_token``
+    the token; otherwise a 401 JSON response is returned.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = _bearer_key(request)
+        token = None
+        if key:
+            token = (
+                ApiToken.objects.select_related("user")
+                .filter(key_hash=ApiToken.hash_key(key), user__is_active=True)
+                .first()
+            )
+        if token is None:
+            response = JsonResponse({"error": "Token de API inválido o ausente."}, status=401)
+            response["WWW-Authenticate"] = 'Bearer realm="api"'
+            return response
+
+        ApiToken.objects.filter(pk=token.pk).update(last_used_at=timezone.now())
+        request.user = token.user
+        request.api_token = token
+        return view(request, *args, **kwargs)
+
+    return wrapper
@@ -2,7 +2,7 @@ from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import PasswordChangeForm
 
-from .models import CompanyProfile
+from .models import DEFAULT_LOW_STOCK_THRESHOLD, CompanyProfile
 
 
 class BaseStyledForm:
@@ -70,8 +70,18 @@ class CompanyProfileForm(BaseStyledForm, forms.ModelForm):
             "contact_email",
             "contact_phone",
             "logo",
+            "low_stock_threshold",
         ]
         widgets = {
             "tax_address": forms.Textarea(attrs={"rows": 3}),
+            "low_stock_threshold": forms.NumberInput(attrs={"min": 0}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["low_stock_threshold"].required = False
+
+    def clean_low_stock_threshold(self):
+        threshold = self.cleaned_data.get("low_stock_threshold")
+        return DEFAULT_LOW_STOCK_THRESHOLD if threshold is None else threshold
+
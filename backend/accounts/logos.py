@@ -0,0 +1,57 @@
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+
+from PIL import Image, ImageOps
+
+
+# El encabezado del PDF reserva 1.6" para el logo; 480 px lo cubren a 300 dpi.
+HEADER_LOGO_MAX_SIZE = (480, 480)
+
+
+def _clear_header_logo(profile):
+    if profile.header_logo:
+        profile.header_logo.delete(save=False)
+    profile.header_logo = ""
+    profile.header_logo_width = None
+    profile.header_logo_height = None
+
+
+def refresh_header_logo(profile):
+    """Rebuild the pre-sized header logo from the uploaded one and save it.
+
+    The PDF only ever reads this copy, so the original upload is decoded
+    once here instead of on every render.
+    """
+
+    changed = bool(profile.header_logo)
+    _clear_header_logo(profile)
+    if profile.logo:
+        try:
+            with profile.logo.open("rb") as source:
+                image = Image.open(source)
+                image.load()
+        except (OSError, ValueError):
+            image = None
+
+        if image is not None:
+            image = ImageOps.exif_transpose(image)
+            has_alpha = image.mode in ("RGBA", "LA", "P") and (
+                image.mode != "P" or "transparency" in image.info
+            )
+            image = image.convert("RGBA" if has_alpha else "RGB")
+            image.thumbnail(HEADER_LOGO_MAX_SIZE, Image.Resampling.LANCZOS)
+
+            buffer = BytesIO()
+            image.save(buffer, format="PNG", optimize=True)
+            profile.header_logo.save("logo-header.png", ContentFile(buffer.getvalue()), save=False)
+            profile.header_logo_width, profile.header_logo_height = image.size
+            changed = True
+
+    if not changed:
+        # Un logo ilegible sin copia previa: no hay nada que guardar.
+        return profile
+    profile.save(
+        update_fields=["header_logo", "header_logo_width", "header_logo_height", "updated_at"]
+    )
+    return profile
@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import ApiToken
+
+
+class Command(BaseCommand):
+    help = "Crea un token para la API JSON y muestra la clave (solo se muestra una vez)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="Usuario dueño de los datos que se cargarán.")
+        parser.add_argument("--name", default="ERP", help="Nombre descriptivo del token.")
+
+    def handle(self, *args, **options):
+        user_model = get_user_model()
+        try:
+            user = user_model.objects.get(**{user_model.USERNAME_FIELD: options["username"]})
+        except user_model.DoesNotExist:
+            raise CommandError(f"No existe el usuario {options['username']!r}.")
+
+        token, key = ApiToken.issue(user, options["name"])
+        self.stdout.write(key)
+        if options["verbosity"] > 1:
+            self.stderr.write(f"Token #{token.pk} creado para {user}.")
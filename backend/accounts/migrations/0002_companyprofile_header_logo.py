@@ -0,0 +1,27 @@
+from django.db import migrations, models
+import accounts.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="companyprofile",
+            name="header_logo",
+            field=models.ImageField(blank=True, editable=False, help_text="Copia del logo ajustada al tamaño del encabezado del PDF.", upload_to=accounts.models.user_header_logo_upload_path),
+        ),
+        migrations.AddField(
+            model_name="companyprofile",
+            name="header_logo_width",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="companyprofile",
+            name="header_logo_height",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_apitoken"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="companyprofile",
+            name="low_stock_threshold",
+            field=models.PositiveIntegerField(default=5, help_text="Unidades a partir de las cuales un producto sin umbral propio se considera con stock bajo.", verbose_name="Umbral de stock bajo"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_companyprofile_low_stock_threshold"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataVersion",
+            fields=[
+                ("user", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="data_version", serialize=False, to=settings.AUTH_USER_MODEL)),
+                ("quotes", models.PositiveBigIntegerField(default=0)),
+                ("clients", models.PositiveBigIntegerField(default=0)),
+                ("items", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
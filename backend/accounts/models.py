@@ -1,3 +1,5 @@
+import hashlib
+import secrets
 from pathlib import Path
 
 from django.conf import settings
@@ -5,6 +7,10 @@ from django.core.validators import RegexValidator
 from django.db import models
 
 
+# Umbral de stock bajo de los productos que no definen uno propio.
+DEFAULT_LOW_STOCK_THRESHOLD = 5
+
+
 def user_logo_upload_path(instance, filename):
     """Build a stable upload path per user for logos."""
 
@@ -12,6 +18,12 @@ def user_logo_upload_path(instance, filename):
     return f"user-assets/{instance.user_id}/logo{suffix}"
 
 
+def user_header_logo_upload_path(instance, filename):
+    """Path of the pre-sized logo used in the PDF header."""
+
+    return f"user-assets/{instance.user_id}/logo-header.png"
+
+
 class CompanyProfile(models.Model):
     """Company identity data tied to a user for quote branding."""
 
@@ -59,6 +71,19 @@ class CompanyProfile(models.Model):
         blank=True,
         help_text="Logo que se mostrará en el encabezado de las cotizaciones.",
     )
+    header_logo = models.ImageField(
+        upload_to=user_header_logo_upload_path,
+        blank=True,
+        editable=False,
+        help_text="Copia del logo ajustada al tamaño del encabezado del PDF.",
+    )
+    low_stock_threshold = models.PositiveIntegerField(
+        "Umbral de stock bajo",
+        default=DEFAULT_LOW_STOCK_THRESHOLD,
+        help_text="Unidades a partir de las cuales un producto sin umbral propio se considera con stock bajo.",
+    )
+    header_logo_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    header_logo_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -67,3 +92,57 @@ class CompanyProfile(models.Model):
 
     def __str__(self):
         return self.legal_name or f"Perfil de {self.user.get_username()}"
+
+
+class ApiToken(models.Model):
+    """Bearer token for the JSON API; only the SHA-256 of the key is stored."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="api_tokens",
+    )
+    name = models.CharField("Nombre", max_length=80)
+    key_hash = models.CharField(max_length=64, unique=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        verbose_name = "Token de API"
+        verbose_name_plural = "Tokens de API"
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.user})"
+
+    @staticmethod
+    def hash_key(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def issue(cls, user, name):
+        """Create a token and return it with the raw key, which is not stored anywhere."""
+
+        key = secrets.token_urlsafe(32)
+        token = cls.objects.create(user=user, name=name, key_hash=cls.hash_key(key))
+        return token, key
+
+
+class DataVersion(models.Model):
+    """Per-user counters that grow with every write to quotes, clients and items.
+
+    List ETags and the item catalog read them with one primary-key lookup
+    instead of aggregating the rows they describe; see ``accounts.versions``.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="data_version",
+    )
+    quotes = models.PositiveBigIntegerField(default=0)
+    clients = models.PositiveBigIntegerField(default=0)
+    items = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.user_id}: {self.quotes}.{self.clients}.{self.items}"
@@ -1,3 +1,98 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from PIL import Image
+
+from .models import CompanyProfile
+from .versions import CLIENTS, ITEMS, QUOTES, bump_data_versions, data_version
+
+
+def make_png(size, mode="RGB"):
+    buffer = BytesIO()
+    Image.new(mode, size, "#1d4ed8").save(buffer, format="PNG")
+    return SimpleUploadedFile("logo.png", buffer.getvalue(), content_type="image/png")
+
+
+class CompanyProfileLogoTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._temp_media = tempfile.mkdtemp()
+        cls._override = override_settings(MEDIA_ROOT=cls._temp_media)
+        cls._override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._override.disable()
+        shutil.rmtree(cls._temp_media, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="owner", password="secret")
+        self.client.force_login(self.user)
+
+    def post_profile(self, **extra):
+        data = {"action": "update-profile", "legal_name": "ACME"}
+        data.update(extra)
+        return self.client.post(reverse("accounts:profile"), data)
+
+    def test_upload_builds_resized_header_logo(self):
+        response = self.post_profile(logo=make_png((2000, 1000), mode="RGBA"))
+
+        self.assertEqual(response.status_code, 302)
+        profile = CompanyProfile.objects.get(user=self.user)
+        self.assertEqual((profile.header_logo_width, profile.header_logo_height), (480, 240))
+        with profile.header_logo.open("rb") as logo_file:
+            header = Image.open(logo_file)
+            self.assertEqual(header.format, "PNG")
+            self.assertEqual(header.size, (480, 240))
+            self.assertEqual(header.mode, "RGBA")
+
+    def test_small_logo_keeps_its_size(self):
+        self.post_profile(logo=make_png((120, 60)))
+
+        profile = CompanyProfile.objects.get(user=self.user)
+        self.assertEqual((profile.header_logo_width, profile.header_logo_height), (120, 60))
+
+    def test_clearing_logo_removes_header_logo(self):
+        self.post_profile(logo=make_png((300, 300)))
+        profile = CompanyProfile.objects.get(user=self.user)
+        header_name = profile.header_logo.name
+
+        self.post_profile(**{"logo-clear": "on"})
+
+        profile.refresh_from_db()
+        self.assertFalse(profile.logo)
+        self.assertFalse(profile.header_logo)
+        self.assertIsNone(profile.header_logo_width)
+        self.assertFalse(profile.header_logo.storage.exists(header_name))
+
+
+class DataVersionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="owner", password="secret")
+
+    def test_bumps_only_the_given_scopes_after_commit(self):
+        self.assertEqual(data_version(self.user, QUOTES, CLIENTS, ITEMS), "0.0.0")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_versions([self.user.pk], ITEMS)
+            bump_data_versions([self.user.pk, None], CLIENTS, ITEMS)
+            self.assertEqual(data_version(self.user, ITEMS), "0")
+
+        self.assertEqual(data_version(self.user, QUOTES, CLIENTS, ITEMS), "0.1.2")
+
+    def test_rolled_back_writes_do_not_bump(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError), transaction.atomic():
+                bump_data_versions([self.user.pk], QUOTES)
+                raise ValueError
+
+        self.assertEqual(data_version(self.user, QUOTES), "0")
@@ -0,0 +1,49 @@
+from functools import partial
+
+from django.db import connection, transaction
+
+from .models import DataVersion
+
+
+QUOTES = "quotes"
+CLIENTS = "clients"
+ITEMS = "items"
+SCOPES = (QUOTES, CLIENTS, ITEMS)
+
+
+def bump_data_versions(owner_ids, *scopes):
+    """Add one to the ``scopes`` counters of every owner once the transaction commits.
+
+    The bump is its own statement after the commit, so writers never hold
+    (or queue on) the counter row and readers never see a new version
+    before the data it stands for.
+    """
+
+    owner_ids = sorted({pk for pk in owner_ids if pk is not None})
+    if owner_ids:
+        transaction.on_commit(partial(_bump, owner_ids, scopes))
+
+
+def _bump(owner_ids, scopes):
+    table = connection.ops.quote_name(DataVersion._meta.db_table)
+    initial = ", ".join("1" if scope in scopes else "0" for scope in SCOPES)
+    increments = ", ".join(f"{scope} = {table}.{scope} + 1" for scope in SCOPES if scope in scopes)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, {", ".join(SCOPES)})
+            SELECT owner.id, {initial} FROM unnest(%s::bigint[]) AS owner (id)
+            ON CONFLICT (user_id) DO UPDATE SET {increments}
+            """,
+            [owner_ids],
+        )
+
+
+def data_version(user, *scopes) -> str:
+    """The user's counters for ``scopes`` as one string, for ETags and cache keys."""
+
+    values = (
+        DataVersion.objects.filter(user=user).values_list(*scopes).first()
+        or (0,) * len(scopes)
+    )
+    return ".".join(str(value) for value in values)
@@ -3,7 +3,10 @@ from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render
 
+from inventory.alerts import apply_default_threshold
+
 from .forms import CompanyProfileForm, StyledPasswordChangeForm, UserAccountForm
+from .logos import refresh_header_logo
 from .models import CompanyProfile
 
 
@@ -39,7 +42,11 @@ def profile(request):
             profile_form = CompanyProfileForm(request.POST, request.FILES, instance=profile)
 
             if profile_form.is_valid():
-                profile_form.save()
+                profile = profile_form.save()
+                if "logo" in profile_form.changed_data:
+                    refresh_header_logo(profile)
+                if "low_stock_threshold" in profile_form.changed_data:
+                    apply_default_threshold(request.user, profile.low_stock_threshold)
                 messages.success(request, "Datos fiscales actualizados correctamente.")
                 return redirect("accounts:profile")
     else:
@@ -1,4 +1,6 @@
 from django import forms
+from django.db.models import Q
+from django.http import QueryDict
 
 from .models import Client
 
@@ -15,3 +17,53 @@ class ClientForm(forms.ModelForm):
             "name": "Nombre",
             "email": "Correo electrónico",
         }
+
+
+def search_clients(queryset, term):
+    """Clients whose name or email starts with ``term`` (both prefixes are indexed)."""
+
+    term = term.strip()
+    if not term:
+        return queryset
+    return queryset.filter(Q(name__istartswith=term) | Q(email__istartswith=term))
+
+
+class ClientFilterForm(forms.Form):
+    q = forms.CharField(
+        label="Buscar",
+        required=False,
+        max_length=120,
+        widget=forms.TextInput(
+            attrs={"class": "form-input", "placeholder": "Nombre o correo", "type": "search"}
+        ),
+    )
+
+    def querystring(self) -> str:
+        """The submitted, non-empty filters as a query string (without ``?``)."""
+
+        params = QueryDict(mutable=True)
+        if self.is_bound:
+            for name in self.fields:
+                value = self.data.get(name)
+                if value not in (None, ""):
+                    params[name] = value
+        return params.urlencode()
+
+    def filter(self, queryset):
+        return search_clients(queryset, self.cleaned_data.get("q", ""))
+
+
+class ClientPickerSelect(forms.Select):
+    """Select that renders only the chosen client; the rest come from ``clients:search``."""
+
+    template_name = "clients/widgets/client_picker.html"
+
+    def optgroups(self, name, value, attrs=None):
+        queryset = getattr(self.choices, "queryset", None)
+        empty_label = getattr(getattr(self.choices, "field", None), "empty_label", None)
+        choices = [] if empty_label is None else [("", empty_label)]
+        selected = [pk for pk in value if str(pk).isdigit()]
+        if queryset is not None and selected:
+            choices += [(client.pk, str(client)) for client in queryset.filter(pk__in=selected)]
+        self.choices = choices
+        return super().optgroups(name, value, attrs)
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clients", "0002_client_owner"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(models.F("owner"), models.OrderBy(models.F("created_at"), descending=True), condition=models.Q(("deleted__isnull", True)), name="client_owner_created_idx"),
+        ),
+    ]
@@ -0,0 +1,28 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clients", "0003_client_owner_created_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="client",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(models.F("owner"), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("name"), name="text_pattern_ops"), condition=models.Q(("deleted__isnull", True)), name="client_owner_name_prefix_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(models.F("owner"), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper("email"), name="text_pattern_ops"), condition=models.Q(("deleted__isnull", True)), name="client_owner_email_prefix_idx"),
+        ),
+    ]
@@ -1,8 +1,14 @@
 from django.conf import settings
 from django.db import models
+from django.contrib.postgres.indexes import OpClass
+from django.db.models import F, Q
+from django.db.models.functions import Upper
 from safedelete.models import SafeDeleteModel
 from safedelete.models import SOFT_DELETE
 
+from accounts.versions import CLIENTS, bump_data_versions
+
+
 class Client(SafeDeleteModel):
     _safedelete_policy = SOFT_DELETE
     
@@ -16,8 +22,41 @@ class Client(SafeDeleteModel):
     name = models.CharField(max_length=120)
     email = models.EmailField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # Listado de clientes: filtra por dueño y ordena por fecha.
+            models.Index(
+                F("owner"),
+                F("created_at").desc(),
+                name="client_owner_created_idx",
+                condition=Q(deleted__isnull=True),
+            ),
+            # Búsqueda por prefijo de nombre o correo (``__istartswith``).
+            models.Index(
+                F("owner"),
+                OpClass(Upper("name"), name="text_pattern_ops"),
+                name="client_owner_name_prefix_idx",
+                condition=Q(deleted__isnull=True),
+            ),
+            models.Index(
+                F("owner"),
+                OpClass(Upper("email"), name="text_pattern_ops"),
+                name="client_owner_email_prefix_idx",
+                condition=Q(deleted__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_data_versions([self.owner_id], CLIENTS)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_data_versions([self.owner_id], CLIENTS)
+        return result
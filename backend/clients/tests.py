@@ -1,3 +1,55 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+
+from .models import Client
+
+
+class ClientListTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="seller", password="secret123")
+        self.client.force_login(self.user)
+        self.acme = Client.objects.create(owner=self.user, name="Acme Corp", email="compras@acme.test")
+        self.globex = Client.objects.create(owner=self.user, name="Globex", email="ventas@globex.test")
+        self.initech = Client.objects.create(owner=self.user, name="Initech", email="acme@initech.test")
+        stranger = get_user_model().objects.create_user(username="stranger")
+        Client.objects.create(owner=stranger, name="Acme ajeno")
+
+    def rows(self, response):
+        return [client.pk for client in response.context["clients"]]
+
+    def test_searches_name_and_email_prefix(self):
+        response = self.client.get(reverse("clients:list_page"), {"q": "ACME"})
+
+        self.assertEqual(self.rows(response), [self.initech.pk, self.acme.pk])
+        self.assertNotContains(response, "<html")
+        self.assertEqual(
+            self.rows(self.client.get(reverse("clients:list_page"), {"q": "ventas@"})),
+            [self.globex.pk],
+        )
+
+    def test_pages_with_load_more_keeping_the_search(self):
+        with mock.patch("config.pagination.PAGE_SIZE", 2):
+            first = self.client.get(reverse("clients:list"))
+            self.assertEqual(self.rows(first), [self.initech.pk, self.globex.pk])
+
+            cursor = first.context["page"].next_cursor
+            second = self.client.get(reverse("clients:list_page"), {"cursor": cursor})
+        self.assertEqual(self.rows(second), [self.acme.pk])
+        self.assertFalse(second.context["page"].has_next)
+
+    def test_form_errors_without_htmx_do_not_render_the_list(self):
+        response = self.client.post(reverse("clients:create"), {"name": "", "email": "x"})
+
+        self.assertTemplateUsed(response, "clients/form_page.html")
+        self.assertNotContains(response, "Globex")
+
+    def test_typeahead_returns_the_owner_matches_by_name(self):
+        response = self.client.get(reverse("clients:search"), {"q": "acme", "limit": 1})
 
-# Create your tests here.
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": self.acme.pk, "name": "Acme Corp", "email": "compras@acme.test", "label": "Acme Corp"}],
+        )
@@ -6,6 +6,8 @@ app_name = "clients"
 
 urlpatterns = [
     path("", views.client_list, name="list"),
+    path("page/", views.client_list_page, name="list_page"),
+    path("search/", views.client_search, name="search"),
     path("create/", views.client_create, name="create"),
     path("<int:pk>/edit/", views.client_update, name="update"),
     path("<int:pk>/row/", views.client_row, name="row"),
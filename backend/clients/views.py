@@ -1,36 +1,106 @@
+import hashlib
 import json
 
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, HttpResponseNotAllowed
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    JsonResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 
-from .forms import ClientForm
+from accounts.versions import CLIENTS, data_version
+from config.pagination import keyset_page
+
+from .forms import ClientFilterForm, ClientForm, search_clients
 from .models import Client
 
 
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+
+
 def _is_htmx(request):
     return request.headers.get("HX-Request") == "true"
 
 
-def _render_client_form(request, form, client=None):
-    return render(
-        request,
-        "clients/partials/client_form.html",
-        {"form": form, "client": client},
-    )
+def _render_client_form(request, form, client=None, template="clients/partials/client_form.html"):
+    return render(request, template, {"form": form, "client": client})
+
+
+def _client_list_context(request, filter_form, cursor=None):
+    context = {
+        "filter_form": filter_form,
+        "filter_query": filter_form.querystring(),
+        "cursor": cursor,
+        "clients": [],
+        "page": None,
+    }
+    if filter_form.is_bound and not filter_form.is_valid():
+        return context
+
+    queryset = Client.objects.filter(owner=request.user)
+    if filter_form.is_bound:
+        queryset = filter_form.filter(queryset)
+    page = keyset_page(queryset, cursor)
+    context.update(clients=page.items, page=page)
+    return context
+
+
+def _client_list_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    version = data_version(request.user, CLIENTS)
+    raw = f"{request.user.pk}:{request.GET.urlencode()}:{version}"
+    return hashlib.sha1(raw.encode()).hexdigest()
 
 
 @login_required
 def client_list(request):
-    return render(
-        request,
-        "clients/list.html",
-        {
-            "clients": Client.objects.filter(owner=request.user).order_by("-created_at"),
-            "form": ClientForm(),
-        },
-    )
+    filter_form = ClientFilterForm(request.GET or None)
+    context = _client_list_context(request, filter_form)
+    context["form"] = ClientForm()
+    status = 400 if filter_form.errors else 200
+    return render(request, "clients/list.html", context, status=status)
+
+
+@login_required
+@condition(etag_func=_client_list_etag)
+def client_list_page(request):
+    """Rows matching the search after ``cursor``, plus the following "load more" row."""
+
+    filter_form = ClientFilterForm(request.GET)
+    try:
+        context = _client_list_context(request, filter_form, request.GET.get("cursor"))
+    except ValueError:
+        return HttpResponseBadRequest("Cursor inválido.")
+    status = 400 if filter_form.errors else 200
+    response = render(request, "clients/partials/client_rows.html", context, status=status)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+def client_search(request):
+    """Typeahead results for the client picker of the quote forms."""
+
+    try:
+        limit = int(request.GET.get("limit", SEARCH_LIMIT))
+    except ValueError:
+        limit = SEARCH_LIMIT
+    limit = min(max(limit, 1), SEARCH_MAX_LIMIT)
+    clients = search_clients(Client.objects.filter(owner=request.user), request.GET.get("q", ""))
+    results = [
+        {"id": pk, "name": name, "email": email or "", "label": name}
+        for pk, name, email in clients.order_by("name", "id").values_list(
+            "pk", "name", "email"
+        )[:limit]
+    ]
+    return JsonResponse({"results": results})
 
 
 @login_required
@@ -43,14 +113,7 @@ def client_create(request):
     form = ClientForm(request.POST)
     if not form.is_valid():
         if not _is_htmx(request):
-            return render(
-                request,
-                "clients/list.html",
-                {
-                    "clients": Client.objects.filter(owner=request.user).order_by("-created_at"),
-                    "form": form,
-                },
-            )
+            return _render_client_form(request, form, template="clients/form_page.html")
         return _render_client_form(request, form)
 
     client = form.save(commit=False)
@@ -98,14 +161,7 @@ def client_update(request, pk):
     form = ClientForm(request.POST, instance=client)
     if not form.is_valid():
         if not _is_htmx(request):
-            return render(
-                request,
-                "clients/list.html",
-                {
-                    "clients": Client.objects.filter(owner=request.user).order_by("-created_at"),
-                    "form": form,
-                },
-            )
+            return _render_client_form(request, form, client, template="clients/form_page.html")
         return _render_client_form(request, form, client)
 
     client = form.save()
@@ -0,0 +1,69 @@
+import base64
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+PAGE_SIZE = 50
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(created_at, pk) -> str:
+    raw = f"{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return ``(created_at, pk)`` from a cursor or raise ``ValueError``."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, pk = raw.rsplit("|", 1)
+        value = parse_datetime(created_at)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError) as error:
+        raise ValueError("Cursor inválido.") from error
+    if value is None:
+        raise ValueError("Cursor inválido.")
+    return value, pk
+
+
+def keyset_queryset(queryset, cursor=None, per_page=None):
+    """The query behind :func:`keyset_page`: one row more than ``per_page``, after ``cursor``."""
+
+    per_page = per_page or PAGE_SIZE
+    queryset = queryset.order_by("-created_at", "-id")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        # Equivale a (created_at, id) < (valor, pk); el primer término acota el índice.
+        queryset = queryset.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(id__lt=pk)
+        )
+    return queryset[: per_page + 1]
+
+
+def keyset_page(queryset, cursor=None, per_page=None) -> KeysetPage:
+    """Newest-first page ordered by ``(created_at, id)`` that starts after ``cursor``.
+
+    Each page is a range scan on the index instead of an ``OFFSET``, so its
+    cost does not grow with the depth of the page.
+    """
+
+    per_page = per_page or PAGE_SIZE
+    items = list(keyset_queryset(queryset, cursor, per_page))
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.pk)
+    return KeysetPage(items=items, next_cursor=next_cursor)
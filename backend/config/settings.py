@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # my locales
     "accounts",
@@ -65,6 +66,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "quotes.context_processors.quote_pdf",
             ],
         },
     },
@@ -101,6 +103,15 @@ if not DEBUG:
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# --- Caché de PDFs de cotizaciones
+# Alias de STORAGES donde guardar los PDF generados; vacío usa QUOTE_PDF_CACHE_ROOT.
+QUOTE_PDF_CACHE_STORAGE = env("QUOTE_PDF_CACHE_STORAGE", default="")
+QUOTE_PDF_CACHE_ROOT = env("QUOTE_PDF_CACHE_ROOT", default=str(BASE_DIR / "cache" / "quote-pdfs"))
+# Con True los PDF se encolan y los genera `manage.py render_quote_pdfs` fuera del request.
+QUOTE_PDF_ASYNC = env.bool("QUOTE_PDF_ASYNC", default=False)
+# Procesos para la exportación masiva de PDF; con 1 se generan dentro del request.
+QUOTE_PDF_EXPORT_WORKERS = env.int("QUOTE_PDF_EXPORT_WORKERS", default=min(4, os.cpu_count() or 1))
+
 # --- Otros
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
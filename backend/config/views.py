@@ -3,11 +3,10 @@ from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from django.db.models import DecimalField, F, Sum
 from django.shortcuts import render
 
-from inventory.models import Item
+from inventory.models import Item, LowStockDigest
 from quotes.models import QuoteItem
 
 
-LOW_STOCK_THRESHOLD = 5
 THOUSAND = Decimal("1000")
 
 
@@ -84,11 +83,10 @@ def home(request):
         total_stock = totals.get("total_stock") or 0
         inventory_value = totals.get("inventory_value") or Decimal("0")
 
-        low_stock_queryset = items.filter(stock__lte=LOW_STOCK_THRESHOLD).order_by(
-            "stock", "name"
-        )
-        low_stock_total = low_stock_queryset.count()
-        low_stock_preview = list(low_stock_queryset[:5])
+        # El resumen de stock bajo lo calcula refresh_low_stock_digests en segundo plano.
+        low_stock_digest = LowStockDigest.objects.filter(user=request.user).first()
+        low_stock_total = low_stock_digest.total if low_stock_digest else 0
+        low_stock_preview = low_stock_digest.preview if low_stock_digest else []
 
         quote_items = QuoteItem.objects.filter(
             quote__created_by=request.user, quote__deleted__isnull=True
@@ -123,7 +121,7 @@ def home(request):
             "inventory_value": inventory_value,
             "inventory_value_display": format_compact_currency(inventory_value),
             "inventory_value_detail": format_currency(inventory_value),
-            "low_stock_threshold": LOW_STOCK_THRESHOLD,
+            "low_stock_digest": low_stock_digest,
             "low_stock_total": low_stock_total,
             "low_stock_preview": low_stock_preview,
             "extra_low_stock": max(low_stock_total - len(low_stock_preview), 0),
@@ -1,9 +1,17 @@
 from django.contrib import admin
-from .models import Item
+from .models import (
+    ArchivedStockMovement,
+    CostChange,
+    InventoryValuation,
+    Item,
+    LowStockDigest,
+    StockMovement,
+    StockSnapshot,
+)
 
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
-    list_display = ("id", "sku", "name", "stock", "cost", "created_at")
+    list_display = ("id", "sku", "name", "stock", "low_stock_level", "cost", "created_at")
     list_filter = ("created_at",)
     search_fields = ("sku", "name")
 
@@ -11,3 +19,76 @@ class ItemAdmin(admin.ModelAdmin):
     def is_deleted(self, obj):
         # SafeDeleteModel agrega 'deleted' (None si no está eliminado)
         return bool(getattr(obj, "deleted", None))
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "item", "kind", "quantity", "balance", "reference")
+    list_filter = ("kind",)
+    list_select_related = ("item",)
+    search_fields = ("item__sku", "reference")
+    raw_id_fields = ("item",)
+
+    # El historial es de solo anexar: los movimientos no se editan ni se borran aquí.
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedStockMovement)
+class ArchivedStockMovementAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "item", "kind", "quantity", "balance", "reference")
+    list_filter = ("kind",)
+    list_select_related = ("item",)
+    search_fields = ("item__sku", "reference")
+    raw_id_fields = ("item",)
+
+    # El archivo conserva el historial tal cual: solo lectura.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("taken_at", "item", "balance")
+    list_select_related = ("item",)
+    search_fields = ("item__sku",)
+    raw_id_fields = ("item",)
+
+
+@admin.register(LowStockDigest)
+class LowStockDigestAdmin(admin.ModelAdmin):
+    list_display = ("user", "total", "computed_at")
+    search_fields = ("user__username",)
+    readonly_fields = ("user", "total", "preview", "computed_at")
+
+
+@admin.register(InventoryValuation)
+class InventoryValuationAdmin(admin.ModelAdmin):
+    list_display = ("date", "user", "item_count", "total_stock", "value")
+    list_filter = ("date",)
+    search_fields = ("user__username",)
+    readonly_fields = ("computed_at",)
+
+
+@admin.register(CostChange)
+class CostChangeAdmin(admin.ModelAdmin):
+    list_display = ("changed_at", "item", "old_cost", "new_cost", "reference")
+    list_select_related = ("item",)
+    search_fields = ("item__sku", "reference")
+    raw_id_fields = ("item",)
+
+    # Es un historial de auditoría: no se edita ni se borra desde aquí.
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from accounts.versions import ITEMS, bump_data_versions
+
+from .models import Item, LowStockDigest
+
+
+# Productos más urgentes que el resumen guarda para el tablero.
+DIGEST_PREVIEW_SIZE = 5
+
+
+def low_stock_items(owner):
+    """The owner's items at or below their threshold, answered by ``item_low_stock_idx``."""
+
+    return Item.objects.filter(owner=owner, stock__lte=F("low_stock_level"))
+
+
+def apply_default_threshold(owner, threshold) -> int:
+    """Copy a new profile threshold onto the owner's items that have none of their own."""
+
+    updated = (
+        Item.all_objects.filter(owner=owner, low_stock_threshold__isnull=True)
+        .exclude(low_stock_level=threshold)
+        .update(low_stock_level=threshold, updated_at=timezone.now())
+    )
+    if updated:
+        bump_data_versions([owner.pk], ITEMS)
+    return updated
+
+
+def refresh_low_stock_digests(batch_size=1000) -> int:
+    """Recompute every user's ``LowStockDigest``; returns how many were written.
+
+    One query reads only the low-stock rows of all owners (the partial index)
+    and ranks them per owner, so the totals and previews come back together.
+    The digests are then upserted in batches.
+    """
+
+    rows = (
+        Item.objects.filter(owner__isnull=False, stock__lte=F("low_stock_level"))
+        .annotate(
+            owner_total=Window(Count("id"), partition_by=F("owner")),
+            rank=Window(
+                RowNumber(),
+                partition_by=F("owner"),
+                order_by=(F("stock").asc(), F("name").asc(), F("id").asc()),
+            ),
+        )
+        .filter(rank__lte=DIGEST_PREVIEW_SIZE)
+        .order_by("owner", "rank")
+        .values_list("owner", "owner_total", "id", "sku", "name", "stock", "low_stock_level")
+    )
+    now = timezone.now()
+    digests = {}
+    for owner_id, total, pk, sku, name, stock, level in rows:
+        digest = digests.setdefault(
+            owner_id, LowStockDigest(user_id=owner_id, total=total, preview=[], computed_at=now)
+        )
+        digest.preview.append(
+            {"id": pk, "sku": sku, "name": name, "stock": stock, "level": level}
+        )
+
+    # Los usuarios sin stock bajo también reciben su resumen (vacío).
+    user_ids = get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+    written = LowStockDigest.objects.bulk_create(
+        [
+            digests.get(pk) or LowStockDigest(user_id=pk, total=0, preview=[], computed_at=now)
+            for pk in user_ids
+        ],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["total", "preview", "computed_at"],
+    )
+    return len(written)
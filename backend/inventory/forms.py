@@ -1,6 +1,14 @@
+import re
+from datetime import timedelta
+
 from django import forms
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import QueryDict
+from django.utils import timezone
 
-from .models import Item
+from .models import Item, StockMovement
+from .repricing import REPRICE_MODE_CHOICES, REPRICE_PERCENT
 
 
 class ItemForm(forms.ModelForm):
@@ -11,36 +19,229 @@ class ItemForm(forms.ModelForm):
             instance_owner = getattr(self.instance, "owner", None)
             if instance_owner is not None:
                 self.owner = instance_owner
+        if self.instance.pk:
+            # El stock de un producto existente solo cambia con movimientos.
+            del self.fields["stock"]
 
     class Meta:
         model = Item
-        fields = ["sku", "name", "stock", "cost"]
+        fields = ["sku", "name", "stock", "cost", "low_stock_threshold"]
         widgets = {
             "sku": forms.TextInput(attrs={"placeholder": "SKU"}),
             "name": forms.TextInput(attrs={"placeholder": "Nombre del producto"}),
             "stock": forms.NumberInput(attrs={"min": 0}),
             "cost": forms.NumberInput(attrs={"min": 0, "step": "0.01"}),
+            "low_stock_threshold": forms.NumberInput(attrs={"min": 0, "placeholder": "Del perfil"}),
         }
         labels = {
             "sku": "SKU",
             "name": "Nombre",
             "stock": "Inventario",
             "cost": "Costo unitario",
+            "low_stock_threshold": "Alerta de stock bajo",
         }
 
-    def clean_sku(self):
-        sku = self.cleaned_data.get("sku")
-        owner = self.owner
-        if not sku or owner is None:
-            return sku
 
-        queryset = Item.objects.filter(owner=owner, sku__iexact=sku)
-        if self.instance.pk:
-            queryset = queryset.exclude(pk=self.instance.pk)
+class StockMovementForm(forms.Form):
+    kind = forms.ChoiceField(
+        label="Movimiento",
+        choices=[
+            (StockMovement.KIND_RECEIPT, "Entrada"),
+            (StockMovement.KIND_ADJUSTMENT, "Ajuste"),
+        ],
+    )
+    quantity = forms.IntegerField(
+        label="Cantidad",
+        help_text="Usa un número negativo para descontar en un ajuste.",
+    )
+    reference = forms.CharField(
+        label="Referencia",
+        required=False,
+        max_length=120,
+        widget=forms.TextInput(attrs={"placeholder": "Factura, conteo físico..."}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        quantity = cleaned_data.get("quantity")
+        if quantity == 0:
+            self.add_error("quantity", "La cantidad no puede ser cero.")
+        elif (
+            quantity is not None
+            and quantity < 0
+            and cleaned_data.get("kind") == StockMovement.KIND_RECEIPT
+        ):
+            self.add_error("quantity", "Una entrada debe sumar unidades.")
+        return cleaned_data
+
+
+class ItemImportForm(forms.Form):
+    file = forms.FileField(
+        label="Archivo CSV",
+        widget=forms.ClearableFileInput(attrs={"accept": ".csv,text/csv"}),
+    )
+
+
+class RepricingForm(forms.Form):
+    """Which items to reprice (every given criterion must match) and by how much."""
+
+    sku = forms.CharField(
+        label="SKU",
+        required=False,
+        max_length=64,
+        help_text="Prefijo, o patrón con * como comodín (p. ej. TOR-*-INOX).",
+        widget=forms.TextInput(attrs={"placeholder": "TOR-"}),
+    )
+    q = forms.CharField(
+        label="Nombre contiene",
+        required=False,
+        max_length=100,
+        widget=forms.TextInput(attrs={"placeholder": "tornillo"}),
+    )
+    ids = forms.CharField(
+        label="IDs",
+        required=False,
+        help_text="Lista separada por comas.",
+        widget=forms.TextInput(attrs={"placeholder": "12, 15, 40"}),
+    )
+    mode = forms.ChoiceField(label="Tipo de ajuste", choices=REPRICE_MODE_CHOICES)
+    amount = forms.DecimalField(
+        label="Ajuste",
+        max_digits=10,
+        decimal_places=2,
+        help_text="Porcentaje o monto a sumar al costo; usa un número negativo para bajarlo.",
+        widget=forms.NumberInput(attrs={"step": "0.01"}),
+    )
+    reference = forms.CharField(
+        label="Referencia",
+        required=False,
+        max_length=120,
+        widget=forms.TextInput(attrs={"placeholder": "Lista de precios del proveedor..."}),
+    )
+
+    def clean_ids(self):
+        raw = self.cleaned_data.get("ids", "")
+        tokens = [token for token in re.split(r"[\s,]+", raw) if token]
+        if not all(token.isdigit() for token in tokens):
+            raise ValidationError("Los IDs deben ser números separados por comas.")
+        return sorted({int(token) for token in tokens})
+
+    def clean(self):
+        cleaned_data = super().clean()
+        has_selection = (
+            cleaned_data.get("sku", "").strip()
+            or cleaned_data.get("q", "").strip()
+            or cleaned_data.get("ids")
+        )
+        if not has_selection and "ids" not in self.errors:
+            raise ValidationError("Indica al menos un SKU, un nombre o una lista de IDs.")
+        amount = cleaned_data.get("amount")
+        if amount == 0:
+            self.add_error("amount", "El ajuste no puede ser cero.")
+        elif amount is not None and cleaned_data.get("mode") == REPRICE_PERCENT and amount < -100:
+            self.add_error("amount", "Un porcentaje no puede bajar el costo más de 100 %.")
+        return cleaned_data
+
+    def filter(self, queryset):
+        data = self.cleaned_data
+        sku = data.get("sku", "").strip()
+        if "*" in sku:
+            pattern = ".*".join(re.escape(part) for part in sku.split("*"))
+            queryset = queryset.filter(sku__iregex=f"^{pattern}$")
+        elif sku:
+            queryset = queryset.filter(sku__istartswith=sku)
+        term = data.get("q", "").strip()
+        if term:
+            queryset = queryset.filter(name__icontains=term)
+        if data.get("ids"):
+            queryset = queryset.filter(pk__in=data["ids"])
+        return queryset
 
-        if queryset.exists():
-            raise forms.ValidationError(
-                "Ya existe un producto con este SKU. Ingresa un identificador diferente o edita el producto existente.",
+
+class ItemFilterForm(forms.Form):
+    """Search over the owner's catalog: SKU prefix or similar name, plus a stock range."""
+
+    q = forms.CharField(
+        label="Buscar",
+        required=False,
+        max_length=100,
+        widget=forms.TextInput(
+            attrs={"class": "form-input", "placeholder": "SKU o nombre", "type": "search"}
+        ),
+    )
+    stock_min = forms.IntegerField(
+        label="Stock mínimo",
+        required=False,
+        min_value=0,
+        widget=forms.NumberInput(attrs={"class": "form-input", "min": 0}),
+    )
+    stock_max = forms.IntegerField(
+        label="Stock máximo",
+        required=False,
+        min_value=0,
+        widget=forms.NumberInput(attrs={"class": "form-input", "min": 0}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        stock_min = cleaned_data.get("stock_min")
+        stock_max = cleaned_data.get("stock_max")
+        if stock_min is not None and stock_max is not None and stock_min > stock_max:
+            raise ValidationError("El stock mínimo no puede ser mayor que el máximo.")
+        return cleaned_data
+
+    def querystring(self) -> str:
+        """The submitted, non-empty filters as a query string (without ``?``)."""
+
+        params = QueryDict(mutable=True)
+        if self.is_bound:
+            for name in self.fields:
+                value = self.data.get(name)
+                if value not in (None, ""):
+                    params[name] = value
+        return params.urlencode()
+
+    def filter(self, queryset):
+        """Apply the cleaned filters.
+
+        The term matches SKUs by prefix (``item_owner_sku_prefix_idx``) and
+        names by substring (``item_name_upper_trgm_idx``) or, to tolerate
+        typos, by trigram word similarity (``item_name_trgm_idx``).
+        """
+
+        data = self.cleaned_data
+        term = data.get("q", "").strip()
+        if term:
+            queryset = queryset.filter(
+                Q(sku__istartswith=term)
+                | Q(name__icontains=term)
+                | Q(name__trigram_word_similar=term)
             )
+        if data.get("stock_min") is not None:
+            queryset = queryset.filter(stock__gte=data["stock_min"])
+        if data.get("stock_max") is not None:
+            queryset = queryset.filter(stock__lte=data["stock_max"])
+        return queryset
+
+
+class ValuationRangeForm(forms.Form):
+    """Date range of the valuation series; defaults to the last ``DEFAULT_DAYS`` days."""
+
+    DEFAULT_DAYS = 90
+    MAX_DAYS = 730
+
+    start = forms.DateField(label="Desde", required=False)
+    end = forms.DateField(label="Hasta", required=False)
 
-        return sku
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        end = cleaned_data.get("end") or timezone.localdate()
+        start = cleaned_data.get("start") or end - timedelta(days=self.DEFAULT_DAYS - 1)
+        if start > end:
+            raise ValidationError("La fecha inicial no puede ser posterior a la final.")
+        if (end - start).days >= self.MAX_DAYS:
+            raise ValidationError(f"El rango no puede superar {self.MAX_DAYS} días.")
+        cleaned_data.update(start=start, end=end)
+        return cleaned_data
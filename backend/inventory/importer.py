@@ -0,0 +1,252 @@
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from accounts.versions import ITEMS, bump_data_versions
+
+from .models import CostChange, Item, StockMovement, default_low_stock_threshold
+
+
+# Filas que se guardan por sentencia (y por transacción).
+IMPORT_CHUNK_SIZE = 1000
+
+# Encabezados aceptados para cada campo; los del formulario también valen.
+COLUMN_ALIASES = {
+    "sku": "sku",
+    "name": "name",
+    "nombre": "name",
+    "stock": "stock",
+    "inventario": "stock",
+    "cost": "cost",
+    "costo": "cost",
+    "costo unitario": "cost",
+}
+REQUIRED_COLUMNS = ("sku", "name")
+
+SKU_MAX_LENGTH = Item._meta.get_field("sku").max_length
+NAME_MAX_LENGTH = Item._meta.get_field("name").max_length
+MAX_STOCK = 2147483647
+MAX_COST = Decimal("99999999.99")
+
+INSERT_COLUMNS = (
+    "owner_id",
+    "sku",
+    "name",
+    "stock",
+    "cost",
+    "low_stock_threshold",
+    "low_stock_level",
+    "created_at",
+    "updated_at",
+    "deleted",
+    "deleted_by_cascade",
+)
+
+
+class ImportReport:
+    """Running totals of an import, handed to the progress callback after each chunk."""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self.error = ""
+
+    @property
+    def saved(self) -> int:
+        return self.created + self.updated
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+
+def _columns(header):
+    columns = {}
+    for position, title in enumerate(header):
+        field = COLUMN_ALIASES.get(title.strip().lower())
+        if field and field not in columns:
+            columns[field] = position
+    return columns
+
+
+def _parse_row(row, columns):
+    """Return ``(values, None)`` or ``(None, message)`` for one CSV row."""
+
+    def value(field):
+        position = columns.get(field)
+        return row[position].strip() if position is not None and position < len(row) else ""
+
+    sku = value("sku")
+    if not sku:
+        return None, "Falta el SKU."
+    if len(sku) > SKU_MAX_LENGTH:
+        return None, f"El SKU supera {SKU_MAX_LENGTH} caracteres."
+    values = {"sku": sku}
+
+    name = value("name")
+    if not name:
+        return None, "Falta el nombre."
+    if len(name) > NAME_MAX_LENGTH:
+        return None, f"El nombre supera {NAME_MAX_LENGTH} caracteres."
+    values["name"] = name
+
+    if "stock" in columns:
+        try:
+            stock = int(value("stock") or 0)
+        except ValueError:
+            return None, "El inventario debe ser un número entero."
+        if not 0 <= stock <= MAX_STOCK:
+            return None, "El inventario debe ser un entero positivo."
+        values["stock"] = stock
+
+    if "cost" in columns:
+        try:
+            cost = Decimal(value("cost") or 0)
+        except InvalidOperation:
+            return None, "El costo debe ser un número."
+        if not cost.is_finite() or not 0 <= cost <= MAX_COST or cost.as_tuple().exponent < -2:
+            return None, "El costo debe ser positivo y tener como máximo dos decimales."
+        values["cost"] = cost
+    return values, None
+
+
+def _upsert_sql(update_fields):
+    table = connection.ops.quote_name(Item._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(column) for column in INSERT_COLUMNS)
+    updates = ", ".join(
+        f"{connection.ops.quote_name(field)} = EXCLUDED.{connection.ops.quote_name(field)}"
+        for field in update_fields
+    )
+    # Debe coincidir con el índice único item_owner_sku_ci_unique.
+    return (
+        f"INSERT INTO {table} ({columns}) VALUES {{values}} "
+        f"ON CONFLICT (owner_id, LOWER(sku)) WHERE deleted IS NULL DO UPDATE SET {updates}"
+    )
+
+
+def _save_chunk(owner, rows, sql, report, low_stock_level):
+    keys = [values["sku"].lower() for _, values in rows]
+    now = timezone.now()
+    params = []
+    for _, values in rows:
+        params += [
+            owner.pk,
+            values["sku"],
+            values["name"],
+            values.get("stock", 0),
+            values.get("cost", Decimal("0")),
+            low_stock_level,
+            now,
+            now,
+            False,
+        ]
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s, NULL, %s, %s, %s, NULL, %s)"] * len(rows))
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Se bloquean en orden de pk, como en el resto de movimientos de stock.
+        previous = {
+            key: (stock, cost)
+            for key, stock, cost in Item.objects.filter(owner=owner)
+            .annotate(sku_key=Lower("sku"))
+            .filter(sku_key__in=keys)
+            .select_for_update()
+            .order_by("pk")
+            .values_list("sku_key", "stock", "cost")
+        }
+        cursor.execute(sql.format(values=placeholders) + " RETURNING id, LOWER(sku)", params)
+        saved = {key: pk for pk, key in cursor.fetchall()}
+        # El upsert ya fijó stock y costo; aquí solo se anotan en sus historiales.
+        movements = []
+        cost_changes = []
+        for _, values in rows:
+            key = values["sku"].lower()
+            stock, cost = previous.get(key, (0, None))
+            if "stock" in values and values["stock"] != stock:
+                movements.append(
+                    StockMovement(
+                        item_id=saved[key],
+                        kind=(
+                            StockMovement.KIND_ADJUSTMENT
+                            if key in previous
+                            else StockMovement.KIND_RECEIPT
+                        ),
+                        quantity=values["stock"] - stock,
+                        balance=values["stock"],
+                        reference="Importación CSV",
+                        created_at=now,
+                    )
+                )
+            if cost is not None and "cost" in values and values["cost"] != cost:
+                cost_changes.append(
+                    CostChange(
+                        item_id=saved[key],
+                        old_cost=cost,
+                        new_cost=values["cost"],
+                        reference="Importación CSV",
+                        changed_at=now,
+                    )
+                )
+        StockMovement.objects.bulk_create(movements)
+        CostChange.objects.bulk_create(cost_changes)
+        bump_data_versions([owner.pk], ITEMS)
+    report.updated += len(previous)
+    report.created += len(rows) - len(previous)
+
+
+def import_items(owner, stream, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """Create or update ``owner``'s items from a CSV byte stream.
+
+    Rows are parsed as they are read and upserted on ``(owner, lower(sku))``
+    with one ``INSERT ... ON CONFLICT DO UPDATE`` per chunk, so memory and
+    query count depend on ``chunk_size`` rather than on the file. Optional
+    columns left out of the file (stock, cost) keep their current value on
+    existing items; soft-deleted items are left alone and a new one is made.
+    Stock changes are written to the movement ledger and cost changes of
+    existing items to their cost history.
+    """
+
+    report = ImportReport()
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    try:
+        columns = _columns(next(reader, []))
+        missing = [field for field in REQUIRED_COLUMNS if field not in columns]
+        if missing:
+            report.error = "Faltan columnas obligatorias: " + ", ".join(missing) + "."
+            return report
+        sql = _upsert_sql(
+            [field for field in ("name", "stock", "cost") if field in columns] + ["updated_at"]
+        )
+        # Los productos nuevos toman el umbral del perfil; los existentes conservan el suyo.
+        low_stock_level = default_low_stock_threshold(owner)
+
+        seen = {}
+        chunk = []
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            report.rows += 1
+            values, message = _parse_row(row, columns)
+            if message:
+                report.add_error(reader.line_num, message)
+                continue
+            first = seen.setdefault(values["sku"].lower(), reader.line_num)
+            if first != reader.line_num:
+                report.add_error(reader.line_num, f"SKU repetido (ya aparece en la fila {first}).")
+                continue
+            chunk.append((reader.line_num, values))
+            if len(chunk) >= chunk_size:
+                _save_chunk(owner, chunk, sql, report, low_stock_level)
+                chunk = []
+                if progress:
+                    progress(report)
+        if chunk:
+            _save_chunk(owner, chunk, sql, report, low_stock_level)
+    except (UnicodeDecodeError, csv.Error) as error:
+        report.error = f"No se pudo leer el archivo cerca de la fila {reader.line_num}: {error}"
+    if progress:
+        progress(report)
+    return report
@@ -0,0 +1,175 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.versions import ITEMS, bump_data_versions
+
+from .models import ArchivedStockMovement, Item, StockMovement, StockSnapshot
+
+
+class InsufficientStock(Exception):
+    """Raised when movements would leave an item with negative stock."""
+
+    def __init__(self, shortages):
+        # ``shortages``: lista de (item, cantidad pedida, stock disponible).
+        self.shortages = shortages
+        super().__init__(
+            "Stock insuficiente: "
+            + "; ".join(
+                f"{item.sku} (se necesitan {requested}, hay {available})"
+                for item, requested, available in shortages
+            )
+            + "."
+        )
+
+
+def lock_stock(item_ids) -> dict:
+    """Lock the given items in primary-key order and return them by pk.
+
+    Every path that touches stock locks in this order (after any quote rows),
+    so concurrent movements queue instead of deadlocking.
+    """
+
+    if not item_ids:
+        return {}
+    items = Item.all_objects.select_for_update().filter(pk__in=item_ids).order_by("pk")
+    return {item.pk: item for item in items}
+
+
+def _add_to_stock(changes, now):
+    """``stock = stock + delta`` for every item in ``changes``, as one UPDATE.
+
+    The deltas travel as two arrays, so the statement stays the same size and
+    cheap to build whatever the number of items.
+    """
+
+    table = connection.ops.quote_name(Item._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {table} AS item
+            SET stock = item.stock + change.delta, updated_at = %s
+            FROM unnest(%s::bigint[], %s::integer[]) AS change (id, delta)
+            WHERE item.id = change.id
+            """,
+            [now, list(changes), list(changes.values())],
+        )
+
+
+def record_movements(movements, items=None):
+    """Append unsaved ``StockMovement`` rows and move ``Item.stock`` accordingly.
+
+    The items are locked once, every movement gets the running balance it
+    leaves, stock is written with a single ``stock + delta`` UPDATE and the
+    movements with one bulk INSERT, whatever their number. Nothing is
+    written if any item would go below zero. ``items`` may pass rows the
+    caller already locked.
+    """
+
+    movements = [movement for movement in movements if movement.quantity]
+    if not movements:
+        return []
+
+    changes = {}
+    for movement in movements:
+        changes[movement.item_id] = changes.get(movement.item_id, 0) + movement.quantity
+
+    with transaction.atomic():
+        if items is None:
+            items = lock_stock(changes)
+        shortages = [
+            (items[pk], -delta, items[pk].stock)
+            for pk, delta in sorted(changes.items())
+            if items[pk].stock + delta < 0
+        ]
+        if shortages:
+            raise InsufficientStock(shortages)
+
+        now = timezone.now()
+        balances = {pk: items[pk].stock for pk in changes}
+        for movement in movements:
+            balances[movement.item_id] += movement.quantity
+            movement.balance = balances[movement.item_id]
+            movement.created_at = now
+        _add_to_stock(changes, now)
+        StockMovement.objects.bulk_create(movements, batch_size=5000)
+        bump_data_versions((items[pk].owner_id for pk in changes), ITEMS)
+        for pk, balance in balances.items():
+            items[pk].stock = balance
+    return movements
+
+
+def move_stock(item, quantity, kind, reference=""):
+    """Record a single movement for ``item``; returns it with its balance."""
+
+    movements = record_movements(
+        [StockMovement(item_id=item.pk, quantity=quantity, kind=kind, reference=reference)]
+    )
+    item.refresh_from_db(fields=["stock", "updated_at"])
+    return movements[0] if movements else None
+
+
+def stock_at(item, when) -> int:
+    """Stock of ``item`` at ``when``.
+
+    One index seek on the live movements; dates before a compaction fall back
+    to the same seek on the archive, and then to the snapshots.
+    """
+
+    for model in (StockMovement, ArchivedStockMovement):
+        balance = (
+            model.objects.filter(item=item, created_at__lte=when)
+            .order_by("-created_at", "-id")
+            .values_list("balance", flat=True)
+            .first()
+        )
+        if balance is not None:
+            return balance
+    balance = (
+        StockSnapshot.objects.filter(item=item, taken_at__lte=when)
+        .order_by("-taken_at")
+        .values_list("balance", flat=True)
+        .first()
+    )
+    return balance or 0
+
+
+def compact_ledger(cutoff) -> tuple:
+    """Archive every movement before ``cutoff`` and leave one snapshot per item.
+
+    Nothing is deleted: the movements move, unchanged, to
+    ``ArchivedStockMovement`` in the same statement that removes them from
+    the live ledger, which then only grows with recent history. Dates
+    before the cutoff are answered by the snapshots. Returns
+    ``(snapshots, movements)``.
+    """
+
+    movement_table = connection.ops.quote_name(StockMovement._meta.db_table)
+    archive_table = connection.ops.quote_name(ArchivedStockMovement._meta.db_table)
+    snapshot_table = connection.ops.quote_name(StockSnapshot._meta.db_table)
+    columns = "id, item_id, kind, quantity, balance, reference, created_at"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {snapshot_table} (item_id, taken_at, balance)
+            SELECT DISTINCT ON (item_id) item_id, %s, balance
+            FROM {movement_table}
+            WHERE created_at < %s
+            ORDER BY item_id, created_at DESC, id DESC
+            ON CONFLICT (item_id, taken_at) DO NOTHING
+            """,
+            [cutoff, cutoff],
+        )
+        snapshots = cursor.rowcount
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {movement_table} WHERE created_at < %s
+                RETURNING {columns}
+            )
+            INSERT INTO {archive_table} ({columns})
+            SELECT {columns} FROM moved
+            """,
+            [cutoff],
+        )
+        archived = cursor.rowcount
+    return snapshots, archived
@@ -0,0 +1,35 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from inventory.ledger import compact_ledger
+
+
+class Command(BaseCommand):
+    help = (
+        "Resume los movimientos de stock anteriores a una fecha en un saldo por producto "
+        "y los pasa del historial vivo al archivo, sin borrarlos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=365,
+            help="Días de movimientos que se conservan en el historial vivo.",
+        )
+
+    def handle(self, *args, **options):
+        if options["keep_days"] < 1:
+            raise CommandError("--keep-days debe ser mayor que cero.")
+
+        day = timezone.localdate() - timedelta(days=options["keep_days"])
+        cutoff = timezone.make_aware(datetime.combine(day, time.min))
+        snapshots, movements = compact_ledger(cutoff)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{movements} movimientos anteriores al {day:%d/%m/%Y} archivados y resumidos "
+                f"en {snapshots} saldos."
+            )
+        )
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.importer import IMPORT_CHUNK_SIZE, import_items
+
+
+class Command(BaseCommand):
+    help = "Crea o actualiza productos del inventario de un usuario desde un CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="Usuario dueño del inventario.")
+        parser.add_argument("path", help="Archivo CSV con columnas sku, nombre, inventario y costo.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help="Filas por sentencia de inserción.",
+        )
+
+    def handle(self, *args, **options):
+        user_model = get_user_model()
+        try:
+            user = user_model.objects.get(**{user_model.USERNAME_FIELD: options["username"]})
+        except user_model.DoesNotExist:
+            raise CommandError(f"No existe el usuario {options['username']!r}.")
+
+        def progress(report):
+            if options["verbosity"] > 0:
+                self.stderr.write(f"{report.rows} filas leídas, {report.saved} guardadas.")
+
+        try:
+            with open(options["path"], "rb") as stream:
+                report = import_items(user, stream, options["chunk_size"], progress=progress)
+        except OSError as error:
+            raise CommandError(str(error))
+
+        for line, message in report.errors:
+            self.stderr.write(f"Fila {line}: {message}")
+        if report.error:
+            raise CommandError(report.error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report.created} productos creados, {report.updated} actualizados, "
+                f"{len(report.errors)} filas con errores."
+            )
+        )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory.alerts import refresh_low_stock_digests
+
+
+class Command(BaseCommand):
+    help = "Recalcula el resumen de stock bajo que muestra el tablero de cada usuario."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Calcula los resúmenes una vez y termina en lugar de repetir.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60.0,
+            help="Segundos de espera entre recálculos.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            written = refresh_low_stock_digests()
+            if options["verbosity"] > 1 or options["once"]:
+                self.stdout.write(self.style.SUCCESS(f"{written} resumen(es) de stock bajo actualizados."))
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.valuation import snapshot_valuations
+
+
+class Command(BaseCommand):
+    help = (
+        "Guarda la valuación del inventario de cada usuario para un día. Pensado para "
+        "ejecutarse cada noche; con --date reconstruye un día pasado desde el historial de stock."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            help="Día a valuar (AAAA-MM-DD). Por defecto, hoy.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            written = snapshot_valuations(options["date"])
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+        self.stdout.write(self.style.SUCCESS(f"{written} valuación(es) guardadas."))
@@ -0,0 +1,23 @@
+from django.contrib.postgres.indexes import OpClass
+from django.db import migrations, models
+from django.db.models import F, Q
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0003_item_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                F("owner"),
+                OpClass(Upper("sku"), name="text_pattern_ops"),
+                condition=Q(deleted__isnull=True),
+                name="item_owner_sku_prefix_idx",
+            ),
+        ),
+    ]
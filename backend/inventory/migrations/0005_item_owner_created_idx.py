@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0004_item_owner_sku_prefix_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(models.F("owner"), models.OrderBy(models.F("created_at"), descending=True), condition=models.Q(("deleted__isnull", True)), name="item_owner_created_idx"),
+        ),
+    ]
@@ -0,0 +1,68 @@
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+
+def rename_case_duplicates(apps, schema_editor):
+    """Give a distinct SKU to live items that only differ from another by case.
+
+    The oldest item of each group keeps its SKU and the others get ``-<id>``
+    appended, so the case-insensitive constraint can be added without
+    deleting or hiding any item.
+    """
+
+    Item = apps.get_model("inventory", "Item")
+    max_length = Item._meta.get_field("sku").max_length
+    groups = (
+        Item.objects.filter(owner__isnull=False, deleted__isnull=True)
+        .annotate(sku_key=Lower("sku"))
+        .values("owner", "sku_key")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by("owner", "sku_key")
+    )
+    now = timezone.now()
+    for group in groups:
+        owner_items = Item.objects.filter(owner=group["owner"])
+        # También las eliminadas: el unique_together anterior aún las incluye.
+        taken = {sku.lower() for sku in owner_items.values_list("sku", flat=True)}
+        duplicates = (
+            owner_items.filter(deleted__isnull=True)
+            .annotate(sku_key=Lower("sku"))
+            .filter(sku_key=group["sku_key"])
+            .order_by("pk")
+            .values_list("pk", "sku")
+        )
+        for pk, sku in list(duplicates)[1:]:
+            suffix, attempt = f"-{pk}", 1
+            while True:
+                renamed = sku[: max_length - len(suffix)] + suffix
+                if renamed.lower() not in taken:
+                    break
+                attempt += 1
+                suffix = f"-{pk}-{attempt}"
+            taken.add(renamed.lower())
+            Item.objects.filter(pk=pk).update(sku=renamed, updated_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0005_item_owner_created_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_case_duplicates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="item",
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name="item",
+            constraint=models.UniqueConstraint(models.F("owner"), django.db.models.functions.text.Lower("sku"), condition=models.Q(("deleted__isnull", True)), name="item_owner_sku_ci_unique", violation_error_message="Ya existe un producto con este SKU. Ingresa un identificador diferente o edita el producto existente."),
+        ),
+    ]
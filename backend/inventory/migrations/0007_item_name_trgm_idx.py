@@ -0,0 +1,20 @@
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0006_item_owner_sku_ci_unique"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="item",
+            index=django.contrib.postgres.indexes.GinIndex(condition=models.Q(("deleted__isnull", True)), fields=["name"], name="item_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+        ),
+    ]
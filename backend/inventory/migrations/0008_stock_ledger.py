@@ -0,0 +1,63 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def open_balances(apps, schema_editor):
+    """Start the ledger of existing items with their current stock."""
+
+    Item = apps.get_model("inventory", "Item")
+    StockMovement = apps.get_model("inventory", "StockMovement")
+    StockMovement.objects.bulk_create(
+        (
+            StockMovement(
+                item_id=pk,
+                kind="adjustment",
+                quantity=stock,
+                balance=stock,
+                reference="Saldo inicial",
+            )
+            for pk, stock in Item.objects.filter(stock__gt=0).values_list("pk", "stock").iterator()
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0007_item_name_trgm_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockMovement",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("receipt", "Entrada"), ("sale", "Venta"), ("return", "Devolución"), ("adjustment", "Ajuste")], max_length=16)),
+                ("quantity", models.IntegerField()),
+                ("balance", models.PositiveIntegerField()),
+                ("reference", models.CharField(blank=True, max_length=120)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("item", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="movements", to="inventory.item")),
+            ],
+            options={
+                "ordering": ("-created_at", "-id"),
+                "indexes": [models.Index(models.F("item"), models.OrderBy(models.F("created_at"), descending=True), models.OrderBy(models.F("id"), descending=True), name="stock_move_item_created_idx"), models.Index(fields=["created_at"], name="stock_move_created_idx")],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("taken_at", models.DateTimeField()),
+                ("balance", models.PositiveIntegerField()),
+                ("item", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="stock_snapshots", to="inventory.item")),
+            ],
+            options={
+                "ordering": ("-taken_at",),
+                "constraints": [models.UniqueConstraint(fields=("item", "taken_at"), name="stock_snapshot_item_unique")],
+            },
+        ),
+        migrations.RunPython(open_balances, migrations.RunPython.noop),
+    ]
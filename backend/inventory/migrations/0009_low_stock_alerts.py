@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0008_stock_ledger"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LowStockDigest",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("preview", models.JSONField(blank=True, default=list)),
+                ("computed_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="item",
+            name="low_stock_level",
+            field=models.PositiveIntegerField(default=5, editable=False),
+        ),
+        migrations.AddField(
+            model_name="item",
+            name="low_stock_threshold",
+            field=models.PositiveIntegerField(blank=True, help_text="Déjalo vacío para usar el umbral de tu perfil.", null=True),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(models.F("owner"), models.OrderBy(models.F("created_at"), descending=True), models.OrderBy(models.F("id"), descending=True), condition=models.Q(("deleted__isnull", True), ("stock__lte", models.F("low_stock_level"))), name="item_low_stock_idx"),
+        ),
+        migrations.AddField(
+            model_name="lowstockdigest",
+            name="user",
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="low_stock_digest", to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,31 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0009_low_stock_alerts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventoryValuation",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("item_count", models.PositiveIntegerField(default=0)),
+                ("total_stock", models.PositiveBigIntegerField(default=0)),
+                ("value", models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ("computed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("user", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="inventory_valuations", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "ordering": ("date",),
+                "constraints": [models.UniqueConstraint(fields=("user", "date"), name="inventory_valuation_user_date_unique")],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0010_inventory_valuation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CostChange",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("old_cost", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("new_cost", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("reference", models.CharField(blank=True, max_length=120)),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("item", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="cost_changes", to="inventory.item")),
+            ],
+            options={
+                "ordering": ("-changed_at", "-id"),
+                "indexes": [models.Index(models.F("item"), models.OrderBy(models.F("changed_at"), descending=True), models.OrderBy(models.F("id"), descending=True), name="cost_change_item_idx")],
+            },
+        ),
+    ]
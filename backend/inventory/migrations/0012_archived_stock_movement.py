@@ -0,0 +1,28 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0011_cost_change"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedStockMovement",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("kind", models.CharField(choices=[("receipt", "Entrada"), ("sale", "Venta"), ("return", "Devolución"), ("adjustment", "Ajuste")], max_length=16)),
+                ("quantity", models.IntegerField()),
+                ("balance", models.PositiveIntegerField()),
+                ("reference", models.CharField(blank=True, max_length=120)),
+                ("created_at", models.DateTimeField()),
+                ("item", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name="archived_movements", to="inventory.item")),
+            ],
+            options={
+                "ordering": ("-created_at", "-id"),
+                "indexes": [models.Index(models.F("item"), models.OrderBy(models.F("created_at"), descending=True), models.OrderBy(models.F("id"), descending=True), name="stock_archive_item_created_idx")],
+            },
+        ),
+    ]
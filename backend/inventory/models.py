@@ -1,8 +1,32 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Lower, Upper
+from django.utils import timezone
 from safedelete.models import SafeDeleteModel
 from safedelete.models import SOFT_DELETE
 
+from accounts.models import DEFAULT_LOW_STOCK_THRESHOLD, CompanyProfile
+from accounts.versions import ITEMS, bump_data_versions
+
+
+SKU_TAKEN_MESSAGE = (
+    "Ya existe un producto con este SKU. Ingresa un identificador diferente o edita el producto existente."
+)
+
+
+def default_low_stock_threshold(owner) -> int:
+    """Threshold from the owner's profile, used by items without their own."""
+
+    threshold = (
+        CompanyProfile.objects.filter(user=owner)
+        .values_list("low_stock_threshold", flat=True)
+        .first()
+    )
+    return DEFAULT_LOW_STOCK_THRESHOLD if threshold is None else threshold
+
+
 class Item(SafeDeleteModel):
     _safedelete_policy = SOFT_DELETE
 
@@ -17,11 +41,256 @@ class Item(SafeDeleteModel):
     name = models.CharField(max_length=150)
     stock = models.PositiveIntegerField(default=0)
     cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    low_stock_threshold = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Déjalo vacío para usar el umbral de tu perfil.",
+    )
+    # Umbral efectivo: el propio o, si no hay, el del perfil del dueño. Se
+    # guarda en la fila para que el índice parcial de stock bajo pueda
+    # compararlo con ``stock``.
+    low_stock_level = models.PositiveIntegerField(
+        default=DEFAULT_LOW_STOCK_THRESHOLD, editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
-    
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         ordering = ("-created_at",)
-        unique_together = ("owner", "sku")
+        constraints = [
+            # El SKU es único por dueño sin distinguir mayúsculas; los productos
+            # eliminados (soft delete) liberan su SKU.
+            models.UniqueConstraint(
+                F("owner"),
+                Lower("sku"),
+                name="item_owner_sku_ci_unique",
+                condition=Q(deleted__isnull=True),
+                violation_error_message=SKU_TAKEN_MESSAGE,
+            ),
+        ]
+        indexes = [
+            # Listado del inventario: filtra por dueño y ordena por fecha.
+            models.Index(
+                F("owner"),
+                F("created_at").desc(),
+                name="item_owner_created_idx",
+                condition=Q(deleted__isnull=True),
+            ),
+            # Sirve las búsquedas por prefijo de SKU (``sku__istartswith``).
+            models.Index(
+                F("owner"),
+                OpClass(Upper("sku"), name="text_pattern_ops"),
+                name="item_owner_sku_prefix_idx",
+                condition=Q(deleted__isnull=True),
+            ),
+            # Búsqueda difusa por nombre (``name__trigram_word_similar``); requiere pg_trgm.
+            GinIndex(
+                fields=["name"],
+                opclasses=["gin_trgm_ops"],
+                name="item_name_trgm_idx",
+                condition=Q(deleted__isnull=True),
+            ),
+            # Subcadena del nombre (``name__icontains`` compara ``UPPER(name) LIKE``).
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="item_name_upper_trgm_idx",
+                condition=Q(deleted__isnull=True),
+            ),
+            # Alertas de stock bajo: solo contiene las filas en o bajo su umbral.
+            models.Index(
+                F("owner"),
+                F("created_at").desc(),
+                F("id").desc(),
+                name="item_low_stock_idx",
+                condition=Q(deleted__isnull=True, stock__lte=F("low_stock_level")),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.sku} - {self.name}"
+
+    def save(self, *args, **kwargs):
+        # El umbral efectivo se deriva aquí para que ningún camino (formulario,
+        # admin o código) lo deje desfasado del propio o del perfil.
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "low_stock_threshold" in update_fields:
+            self.low_stock_level = (
+                self.low_stock_threshold
+                if self.low_stock_threshold is not None
+                else default_low_stock_threshold(self.owner_id)
+            )
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "low_stock_level"}
+        super().save(*args, **kwargs)
+        bump_data_versions([self.owner_id], ITEMS)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_data_versions([self.owner_id], ITEMS)
+        return result
+
+    @property
+    def is_low_stock(self) -> bool:
+        return self.stock <= self.low_stock_level
+
+
+class StockMovement(models.Model):
+    """One append-only change to an item's stock and the balance it left."""
+
+    KIND_RECEIPT = "receipt"
+    KIND_SALE = "sale"
+    KIND_RETURN = "return"
+    KIND_ADJUSTMENT = "adjustment"
+    KIND_CHOICES = [
+        (KIND_RECEIPT, "Entrada"),
+        (KIND_SALE, "Venta"),
+        (KIND_RETURN, "Devolución"),
+        (KIND_ADJUSTMENT, "Ajuste"),
+    ]
+
+    # El índice compuesto de abajo ya empieza por ``item``.
+    item = models.ForeignKey(
+        Item, on_delete=models.CASCADE, related_name="movements", db_index=False
+    )
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    quantity = models.IntegerField()
+    balance = models.PositiveIntegerField()
+    reference = models.CharField(max_length=120, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("-created_at", "-id")
+        indexes = [
+            # "Stock a la fecha X": último movimiento del producto hasta X.
+            models.Index(
+                F("item"),
+                F("created_at").desc(),
+                F("id").desc(),
+                name="stock_move_item_created_idx",
+            ),
+            models.Index(fields=["created_at"], name="stock_move_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.quantity:+d} de {self.item_id}"
+
+
+class ArchivedStockMovement(models.Model):
+    """A ``StockMovement`` moved out of the live ledger by compaction, unchanged."""
+
+    # Conserva el id original del movimiento.
+    id = models.BigIntegerField(primary_key=True)
+    item = models.ForeignKey(
+        Item, on_delete=models.CASCADE, related_name="archived_movements", db_index=False
+    )
+    kind = models.CharField(max_length=16, choices=StockMovement.KIND_CHOICES)
+    quantity = models.IntegerField()
+    balance = models.PositiveIntegerField()
+    reference = models.CharField(max_length=120, blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-created_at", "-id")
+        indexes = [
+            models.Index(
+                F("item"),
+                F("created_at").desc(),
+                F("id").desc(),
+                name="stock_archive_item_created_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.quantity:+d} de {self.item_id}"
+
+
+class StockSnapshot(models.Model):
+    """Balance of an item at a compaction cutoff; stands in for the archived movements."""
+
+    item = models.ForeignKey(
+        Item, on_delete=models.CASCADE, related_name="stock_snapshots", db_index=False
+    )
+    taken_at = models.DateTimeField()
+    balance = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ("-taken_at",)
+        constraints = [
+            models.UniqueConstraint(fields=["item", "taken_at"], name="stock_snapshot_item_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} @ {self.taken_at:%Y-%m-%d}: {self.balance}"
+
+
+class CostChange(models.Model):
+    """An item's cost before and after one change, kept for auditing reprices."""
+
+    # El índice compuesto de abajo ya empieza por ``item``.
+    item = models.ForeignKey(
+        Item, on_delete=models.CASCADE, related_name="cost_changes", db_index=False
+    )
+    old_cost = models.DecimalField(max_digits=10, decimal_places=2)
+    new_cost = models.DecimalField(max_digits=10, decimal_places=2)
+    reference = models.CharField(max_length=120, blank=True)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("-changed_at", "-id")
+        indexes = [
+            models.Index(
+                F("item"),
+                F("changed_at").desc(),
+                F("id").desc(),
+                name="cost_change_item_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id}: {self.old_cost} → {self.new_cost}"
+
+
+class LowStockDigest(models.Model):
+    """Low-stock summary for the dashboard, refreshed by ``refresh_low_stock_digests``."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="low_stock_digest",
+    )
+    total = models.PositiveIntegerField(default=0)
+    # Los productos más urgentes: [{"id", "sku", "name", "stock", "level"}, ...].
+    preview = models.JSONField(default=list, blank=True)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user}: {self.total} con stock bajo"
+
+
+class InventoryValuation(models.Model):
+    """Value of a user's inventory at the end of a day, kept for historical charts."""
+
+    # El índice único de abajo ya empieza por ``user``.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="inventory_valuations",
+        db_index=False,
+    )
+    date = models.DateField()
+    item_count = models.PositiveIntegerField(default=0)
+    total_stock = models.PositiveBigIntegerField(default=0)
+    value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("date",)
+        constraints = [
+            # También sirve la serie de un usuario: un rango sobre (user, date).
+            models.UniqueConstraint(
+                fields=["user", "date"], name="inventory_valuation_user_date_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} @ {self.date}: {self.value}"
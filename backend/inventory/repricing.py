@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Greatest, Least, Round
+from django.utils import timezone
+
+from accounts.versions import ITEMS, bump_data_versions
+
+from .importer import MAX_COST
+from .models import CostChange, Item
+
+
+REPRICE_PERCENT = "percent"
+REPRICE_AMOUNT = "amount"
+REPRICE_MODE_CHOICES = [
+    (REPRICE_PERCENT, "Porcentaje"),
+    (REPRICE_AMOUNT, "Monto fijo"),
+]
+
+# Productos que se muestran en la vista previa; el resto solo se cuenta.
+PREVIEW_SIZE = 20
+
+
+class RepricePreview:
+    """What a reprice would change, without changing it."""
+
+    def __init__(self, count, old_total, new_total, sample):
+        self.count = count
+        self.old_total = old_total or Decimal("0")
+        self.new_total = new_total or Decimal("0")
+        # Lista de (sku, nombre, costo actual, costo nuevo).
+        self.sample = sample
+
+    @property
+    def hidden(self) -> int:
+        return max(self.count - len(self.sample), 0)
+
+
+def repriced_cost(mode, amount):
+    """New cost as an expression: rounded to cents and kept within the column's range."""
+
+    if mode == REPRICE_PERCENT:
+        cost = Round(F("cost") * (Decimal("100") + amount) / Decimal("100"), 2)
+    else:
+        cost = F("cost") + amount
+    return Greatest(
+        Least(cost, Value(MAX_COST)),
+        Value(Decimal("0")),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def _repriced(queryset, mode, amount):
+    return queryset.annotate(new_cost=repriced_cost(mode, amount)).exclude(new_cost=F("cost"))
+
+
+def preview_repricing(queryset, mode, amount, limit=PREVIEW_SIZE) -> RepricePreview:
+    """Count and sample the items of ``queryset`` whose cost would change."""
+
+    repriced = _repriced(queryset, mode, amount)
+    totals = repriced.aggregate(count=Count("id"), old_total=Sum("cost"), new_total=Sum("new_cost"))
+    sample = list(repriced.order_by("sku").values_list("sku", "name", "cost", "new_cost")[:limit])
+    return RepricePreview(sample=sample, **totals)
+
+
+def apply_repricing(queryset, mode, amount, reference="") -> int:
+    """Reprice the items of ``queryset`` with one statement; returns how many changed.
+
+    The rows are locked in pk order, updated with ``updated_at``, and every
+    change is written to ``CostChange`` by the same statement, so the
+    history never misses or duplicates a reprice.
+    """
+
+    item_table = connection.ops.quote_name(Item._meta.db_table)
+    history_table = connection.ops.quote_name(CostChange._meta.db_table)
+    now = timezone.now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        target = (
+            _repriced(queryset, mode, amount)
+            .select_for_update()
+            .order_by("pk")
+            .values_list("pk", "cost", "new_cost")
+        )
+        target_sql, target_params = target.query.sql_with_params()
+        cursor.execute(
+            f"""
+            WITH target (id, cost, new_cost) AS ({target_sql}),
+            changed AS (
+                UPDATE {item_table} AS item
+                SET cost = target.new_cost, updated_at = %s
+                FROM target
+                WHERE item.id = target.id
+                RETURNING item.id, item.owner_id, target.cost, target.new_cost
+            ),
+            history AS (
+                INSERT INTO {history_table} (item_id, old_cost, new_cost, reference, changed_at)
+                SELECT id, cost, new_cost, %s, %s FROM changed
+            )
+            SELECT count(*), array_agg(DISTINCT owner_id) FROM changed
+            """,
+            [*target_params, now, reference, now],
+        )
+        repriced, owner_ids = cursor.fetchone()
+        bump_data_versions(owner_ids or [], ITEMS)
+        return repriced
@@ -1,11 +1,37 @@
 import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
+from accounts.models import CompanyProfile
+
+from .alerts import low_stock_items, refresh_low_stock_digests
 from .forms import ItemForm
-from .models import Item
+from .importer import import_items
+from .repricing import REPRICE_AMOUNT, REPRICE_PERCENT, apply_repricing
+from .valuation import snapshot_valuations
+from .ledger import InsufficientStock, compact_ledger, record_movements, stock_at
+from .models import (
+    ArchivedStockMovement,
+    CostChange,
+    InventoryValuation,
+    Item,
+    LowStockDigest,
+    StockMovement,
+    StockSnapshot,
+)
 
 
 class ItemFormTests(TestCase):
@@ -16,17 +42,27 @@ class ItemFormTests(TestCase):
             password="secret123",
         )
 
-    def test_item_form_blocks_duplicate_sku_for_owner(self):
+    def test_item_form_leaves_sku_uniqueness_to_the_database(self):
         Item.objects.create(owner=self.user, sku="SKU-001", name="Base", stock=1, cost=1)
 
         form = ItemForm(
-            data={"sku": "SKU-001", "name": "Otro", "stock": 5, "cost": "10.00"},
+            data={"sku": "sku-001", "name": "Otro", "stock": 5, "cost": "10.00"},
             owner=self.user,
         )
 
-        self.assertFalse(form.is_valid())
-        self.assertIn("sku", form.errors)
-        self.assertIn("Ya existe un producto con este SKU", form.errors["sku"][0])
+        with self.assertNumQueries(0):
+            self.assertTrue(form.is_valid())
+        item = form.save(commit=False)
+        item.owner = self.user
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            item.save()
+
+    def test_deleted_items_release_their_sku(self):
+        Item.objects.create(owner=self.user, sku="SKU-001", name="Base").delete()
+
+        Item.objects.create(owner=self.user, sku="sku-001", name="Nuevo")
+
+        self.assertEqual(Item.all_objects.filter(owner=self.user).count(), 2)
 
     def test_item_form_allows_same_sku_for_same_item(self):
         item = Item.objects.create(owner=self.user, sku="SKU-002", name="Base", stock=1, cost=1)
@@ -54,7 +90,7 @@ class ItemCreateViewTests(TestCase):
 
         response = self.client.post(
             reverse("inventory:create"),
-            data={"sku": "SKU-ABC", "name": "Nuevo", "stock": 2, "cost": "3.50"},
+            data={"sku": "sku-abc", "name": "Nuevo", "stock": 2, "cost": "3.50"},
             HTTP_HX_REQUEST="true",
         )
 
@@ -64,3 +100,641 @@ class ItemCreateViewTests(TestCase):
         self.assertIn("toast", triggers)
         self.assertEqual(triggers["toast"]["type"], "error")
         self.assertIn("SKU", triggers["toast"]["message"])
+
+
+class ItemImportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="importer", password="secret123")
+        self.client.force_login(self.user)
+
+    def upload(self, content):
+        return self.client.post(
+            reverse("inventory:import"),
+            {"file": SimpleUploadedFile("items.csv", content.encode(), content_type="text/csv")},
+            HTTP_HX_REQUEST="true",
+        )
+
+    def test_upserts_rows_and_reports_errors(self):
+        Item.objects.create(owner=self.user, sku="A-1", name="Viejo", stock=3, cost=1)
+        gone = Item.objects.create(owner=self.user, sku="B-2", name="Borrado", stock=0, cost=1)
+        gone.delete()
+        content = (
+            "\ufeffSKU,Nombre,Inventario,Costo\n"
+            "a-1,Nuevo nombre,10,2.50\n"
+            "B-2,Reemplazo,4,1\n"
+            "C-3,Nuevo,1,0.99\n"
+            ",Sin SKU,1,1\n"
+            "D-4,Malo,-1,1\n"
+            "c-3,Repetido,1,1\n"
+        )
+
+        response = self.upload(content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "6 filas leídas: 2 creadas, 1 actualizadas, 3 con errores.")
+        self.assertContains(response, "Fila 5: Falta el SKU.")
+        self.assertContains(response, "Fila 7: SKU repetido (ya aparece en la fila 4).")
+        self.assertEqual(json.loads(response["HX-Trigger"])["toast"]["type"], "info")
+        self.assertEqual(
+            list(Item.objects.order_by("sku").values_list("sku", "name", "stock", "cost")),
+            [
+                ("A-1", "Nuevo nombre", 10, Decimal("2.50")),
+                ("B-2", "Reemplazo", 4, Decimal("1.00")),
+                ("C-3", "Nuevo", 1, Decimal("0.99")),
+            ],
+        )
+        self.assertEqual(Item.all_objects.get(pk=gone.pk).name, "Borrado")
+
+    def test_missing_optional_columns_keep_current_values(self):
+        Item.objects.create(owner=self.user, sku="A-1", name="Viejo", stock=7, cost=5)
+
+        import_items(self.user, BytesIO(b"sku,name\nA-1,Renombrado\n"))
+
+        item = Item.objects.get(sku="A-1")
+        self.assertEqual((item.name, item.stock, item.cost), ("Renombrado", 7, Decimal("5.00")))
+
+    def test_rejects_files_without_required_columns(self):
+        response = self.upload("codigo,precio\nA,1\n")
+
+        self.assertContains(response, "Faltan columnas obligatorias: sku, name.")
+        self.assertFalse(Item.objects.exists())
+
+    def test_query_count_depends_on_chunks_not_rows(self):
+        def run(rows):
+            content = "sku,name\n" + "".join(f"S-{index},Producto {index}\n" for index in range(rows))
+            with CaptureQueriesContext(connection) as queries:
+                import_items(self.user, BytesIO(content.encode()), chunk_size=500)
+            return len(queries)
+
+        self.assertEqual(run(400), run(450))
+        self.assertEqual(Item.objects.count(), 450)
+
+    def test_command_reports_progress(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as handle:
+            handle.write("sku,name,stock\nA-1,Uno,1\nA-2,Dos,2\nA-3,Tres,x\n")
+            handle.flush()
+            stdout, stderr = StringIO(), StringIO()
+            call_command(
+                "import_items", "importer", handle.name, chunk_size=1, stdout=stdout, stderr=stderr
+            )
+
+        self.assertIn("2 productos creados, 0 actualizados, 1 filas con errores.", stdout.getvalue())
+        self.assertIn("1 filas leídas, 1 guardadas.", stderr.getvalue())
+        self.assertIn("Fila 4: El inventario debe ser un número entero.", stderr.getvalue())
+
+
+class ItemListSearchTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="browser", password="secret123")
+        self.client.force_login(self.user)
+        self.screw = Item.objects.create(owner=self.user, sku="TOR-10", name="Tornillo hexagonal", stock=50)
+        self.nut = Item.objects.create(owner=self.user, sku="TUE-20", name="Tuerca de seguridad", stock=5)
+        self.washer = Item.objects.create(owner=self.user, sku="ARA-30", name="Arandela plana", stock=0)
+        stranger = get_user_model().objects.create_user(username="other", password="secret123")
+        Item.objects.create(owner=stranger, sku="TOR-99", name="Tornillo ajeno", stock=1)
+
+    def rows(self, response):
+        return [item.pk for item in response.context["items"]]
+
+    def test_searches_sku_prefix_and_similar_names(self):
+        page = reverse("inventory:list_page")
+
+        self.assertEqual(self.rows(self.client.get(page, {"q": "tor"})), [self.screw.pk])
+        self.assertEqual(self.rows(self.client.get(page, {"q": "tornilo"})), [self.screw.pk])
+        self.assertEqual(self.rows(self.client.get(page, {"q": "seguridad"})), [self.nut.pk])
+        self.assertEqual(self.rows(self.client.get(page, {"q": "agon"})), [self.screw.pk])
+
+    def test_filters_by_stock_range(self):
+        response = self.client.get(reverse("inventory:list_page"), {"stock_min": 1, "stock_max": 10})
+
+        self.assertEqual(self.rows(response), [self.nut.pk])
+        self.assertNotContains(response, "<html")
+
+    def test_rejects_inverted_stock_range(self):
+        response = self.client.get(reverse("inventory:list"), {"stock_min": 10, "stock_max": 1})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertContains(response, "El stock mínimo no puede ser mayor que el máximo.", status_code=400)
+
+    def test_pages_with_load_more_keeping_the_search(self):
+        with mock.patch("config.pagination.PAGE_SIZE", 1):
+            first = self.client.get(reverse("inventory:list"), {"stock_max": 50})
+            self.assertEqual(self.rows(first), [self.washer.pk])
+            self.assertContains(first, "?stock_max=50&amp;cursor=")
+
+            cursor = first.context["page"].next_cursor
+            second = self.client.get(
+                reverse("inventory:list_page"), {"stock_max": 50, "cursor": cursor}
+            )
+        self.assertEqual(self.rows(second), [self.nut.pk])
+
+    def test_stock_movements_invalidate_the_list_etag(self):
+        page = reverse("inventory:list_page")
+        etag = self.client.get(page)["ETag"]
+        self.assertEqual(self.client.get(page, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record_movements(
+                [StockMovement(item_id=self.nut.pk, quantity=3, kind=StockMovement.KIND_RECEIPT)]
+            )
+
+        self.assertEqual(self.client.get(page, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_form_errors_without_htmx_do_not_render_the_catalog(self):
+        response = self.client.post(
+            reverse("inventory:create"),
+            data={"sku": "tor-10", "name": "Repetido", "stock": 1, "cost": "1.00"},
+        )
+
+        self.assertTemplateUsed(response, "inventory/form_page.html")
+        self.assertContains(response, "Ya existe un producto con este SKU")
+        self.assertNotContains(response, "Tuerca de seguridad")
+
+
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="ledger", password="secret123")
+        self.client.force_login(self.user)
+        self.items = [
+            Item.objects.create(owner=self.user, sku=f"L-{index}", name=f"Producto {index}")
+            for index in range(20)
+        ]
+
+    def receipt(self, item, quantity, **extra):
+        return StockMovement(item_id=item.pk, quantity=quantity, kind=StockMovement.KIND_RECEIPT, **extra)
+
+    def test_movements_keep_a_running_balance(self):
+        bolt = self.items[0]
+
+        movements = record_movements(
+            [self.receipt(bolt, 10), self.receipt(bolt, 5), self.receipt(self.items[1], 2)]
+        )
+
+        self.assertEqual([movement.balance for movement in movements], [10, 15, 2])
+        bolt.refresh_from_db()
+        self.assertEqual(bolt.stock, 15)
+        self.assertEqual(StockMovement.objects.filter(item=bolt).first().balance, 15)
+
+    def test_batch_size_does_not_change_query_count(self):
+        with CaptureQueriesContext(connection) as small:
+            record_movements([self.receipt(item, 1) for item in self.items[:2]])
+        with CaptureQueriesContext(connection) as large:
+            record_movements([self.receipt(item, 1) for item in self.items] * 50)
+
+        self.assertEqual(len(large), len(small))
+        self.assertEqual(StockMovement.objects.count(), 1002)
+
+    def test_shortage_writes_nothing(self):
+        record_movements([self.receipt(self.items[0], 3)])
+
+        with self.assertRaises(InsufficientStock):
+            record_movements(
+                [
+                    self.receipt(self.items[1], 4),
+                    StockMovement(item_id=self.items[0].pk, quantity=-5, kind=StockMovement.KIND_ADJUSTMENT),
+                ]
+            )
+
+        self.assertEqual(StockMovement.objects.count(), 1)
+        self.assertEqual(list(Item.objects.filter(stock__gt=0).values_list("stock", flat=True)), [3])
+
+    def test_stock_at_date_survives_compaction(self):
+        item = self.items[0]
+        start = timezone.now() - timedelta(days=10)
+        for day, quantity in ((0, 10), (2, -4), (5, 7)):
+            with mock.patch("inventory.ledger.timezone.now", return_value=start + timedelta(days=day)):
+                record_movements(
+                    [StockMovement(item_id=item.pk, quantity=quantity, kind=StockMovement.KIND_ADJUSTMENT)]
+                )
+
+        self.assertEqual(stock_at(item, start - timedelta(days=1)), 0)
+        self.assertEqual(stock_at(item, start + timedelta(days=3)), 6)
+
+        history = list(StockMovement.objects.values_list("id", "quantity", "balance", "created_at"))
+
+        snapshots, archived = compact_ledger(start + timedelta(days=4))
+
+        self.assertEqual((snapshots, archived), (1, 2))
+        self.assertEqual(StockSnapshot.objects.get(item=item).balance, 6)
+        self.assertEqual(StockMovement.objects.count(), 1)
+        self.assertEqual(
+            list(StockMovement.objects.values_list("id", "quantity", "balance", "created_at"))
+            + list(ArchivedStockMovement.objects.values_list("id", "quantity", "balance", "created_at")),
+            history,
+        )
+        self.assertEqual(stock_at(item, start + timedelta(days=4, hours=1)), 6)
+        self.assertEqual(stock_at(item, start + timedelta(days=6)), 13)
+        # Antes del corte responde el archivo con el saldo real de cada fecha.
+        self.assertEqual(stock_at(item, start + timedelta(days=1)), 10)
+        self.assertEqual(stock_at(item, start + timedelta(days=3)), 6)
+        self.assertEqual(stock_at(item, start - timedelta(days=1)), 0)
+
+        with self.assertNumQueries(1):
+            stock_at(item, start + timedelta(days=6))
+
+    def test_editing_an_item_keeps_its_stock_and_movements_change_it(self):
+        item = self.items[0]
+        record_movements([self.receipt(item, 8)])
+
+        self.client.post(
+            reverse("inventory:update", args=[item.pk]),
+            {"sku": item.sku, "name": "Renombrado", "stock": 0, "cost": "1.00"},
+            HTTP_HX_REQUEST="true",
+        )
+        item.refresh_from_db()
+        self.assertEqual((item.name, item.stock), ("Renombrado", 8))
+
+        response = self.client.post(
+            reverse("inventory:stock", args=[item.pk]),
+            {"kind": StockMovement.KIND_ADJUSTMENT, "quantity": -3, "reference": "Conteo"},
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertIn("Stock actualizado: 5.", response["HX-Trigger"])
+
+        response = self.client.post(
+            reverse("inventory:stock", args=[item.pk]),
+            {"kind": StockMovement.KIND_ADJUSTMENT, "quantity": -9},
+            HTTP_HX_REQUEST="true",
+        )
+        self.assertIn("Stock insuficiente", response["HX-Trigger"])
+        item.refresh_from_db()
+        self.assertEqual(item.stock, 5)
+        self.assertEqual(
+            list(item.movements.values_list("kind", "quantity", "balance", "reference")),
+            [("adjustment", -3, 5, "Conteo"), ("receipt", 8, 8, "")],
+        )
+
+    def test_creation_and_import_are_recorded(self):
+        self.client.post(
+            reverse("inventory:create"),
+            {"sku": "NEW-1", "name": "Nuevo", "stock": 4, "cost": "1.00"},
+            HTTP_HX_REQUEST="true",
+        )
+        import_items(self.user, BytesIO(b"sku,name,stock\nNEW-1,Nuevo,10\nNEW-2,Otro,3\n"))
+
+        self.assertEqual(
+            list(
+                StockMovement.objects.filter(item__sku__startswith="NEW")
+                .order_by("id")
+                .values_list("item__sku", "kind", "quantity", "balance")
+            ),
+            [
+                ("NEW-1", "receipt", 4, 4),
+                ("NEW-1", "adjustment", 6, 10),
+                ("NEW-2", "receipt", 3, 3),
+            ],
+        )
+
+
+class LowStockAlertTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="alerts", password="secret123")
+        self.client.force_login(self.user)
+        self.profile = CompanyProfile.objects.create(user=self.user, low_stock_threshold=10)
+
+    def save_item(self, **data):
+        form = ItemForm(data={"cost": "1.00", **data}, owner=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+        item = form.save(commit=False)
+        item.owner = self.user
+        item.save()
+        return item
+
+    def test_items_use_their_own_threshold_or_the_profile_one(self):
+        own = self.save_item(sku="A-1", name="Propio", stock=3, low_stock_threshold=2)
+        inherited = self.save_item(sku="A-2", name="Del perfil", stock=3)
+
+        self.assertEqual((own.low_stock_level, own.is_low_stock), (2, False))
+        self.assertEqual((inherited.low_stock_level, inherited.is_low_stock), (10, True))
+
+    def test_profile_threshold_reaches_items_without_their_own(self):
+        own = self.save_item(sku="A-1", name="Propio", stock=3, low_stock_threshold=2)
+        inherited = self.save_item(sku="A-2", name="Del perfil", stock=3)
+
+        self.client.post(
+            reverse("accounts:profile"),
+            {"action": "update-company", "legal_name": "ACME", "low_stock_threshold": 1},
+        )
+
+        own.refresh_from_db()
+        inherited.refresh_from_db()
+        self.assertEqual((own.low_stock_level, inherited.low_stock_level), (2, 1))
+
+    def test_threshold_changed_outside_the_form_updates_the_level(self):
+        item = Item.objects.create(owner=self.user, sku="A-3", name="Directo", stock=3)
+        self.assertEqual(item.low_stock_level, 10)
+
+        item.low_stock_threshold = 2
+        item.save(update_fields=["low_stock_threshold"])
+        item.refresh_from_db()
+        self.assertEqual((item.low_stock_level, item.is_low_stock), (2, False))
+
+        item.low_stock_threshold = None
+        item.save()
+        item.refresh_from_db()
+        self.assertEqual(item.low_stock_level, 10)
+        self.assertEqual(list(low_stock_items(self.user)), [item])
+
+    def test_import_gives_new_items_the_profile_threshold(self):
+        import_items(self.user, BytesIO(b"sku,name,stock\nIMP-1,Importado,4\n"))
+
+        self.assertEqual(Item.objects.get(sku="IMP-1").low_stock_level, 10)
+
+    def test_low_stock_view_pages_only_low_items(self):
+        low = [
+            Item.objects.create(owner=self.user, sku=f"L-{n}", name=f"Bajo {n}", stock=n, low_stock_threshold=5)
+            for n in range(3)
+        ]
+        Item.objects.create(owner=self.user, sku="OK-1", name="Suficiente", stock=6, low_stock_threshold=5)
+
+        with mock.patch("config.pagination.PAGE_SIZE", 2):
+            first = self.client.get(reverse("inventory:low_stock"))
+            second = self.client.get(
+                reverse("inventory:low_stock_page"), {"cursor": first.context["page"].next_cursor}
+            )
+
+        self.assertEqual([item.pk for item in first.context["items"]], [low[2].pk, low[1].pk])
+        self.assertEqual([item.pk for item in second.context["items"]], [low[0].pk])
+        self.assertFalse(second.context["page"].has_next)
+
+    def test_digest_is_computed_in_the_background_and_read_by_the_dashboard(self):
+        for n in range(7):
+            Item.objects.create(
+                owner=self.user, sku=f"L-{n}", name=f"Bajo {n}", stock=6 - n, low_stock_threshold=5
+            )
+        Item.objects.create(owner=self.user, sku="OK-1", name="Suficiente", stock=50)
+        quiet = get_user_model().objects.create_user(username="quiet")
+
+        pending = self.client.get(reverse("home"))
+        self.assertContains(pending, "Estamos calculando el resumen de stock bajo")
+
+        with self.assertNumQueries(3):
+            self.assertEqual(refresh_low_stock_digests(), 2)
+        digest = LowStockDigest.objects.get(user=self.user)
+        self.assertEqual(digest.total, 6)
+        self.assertEqual([entry["sku"] for entry in digest.preview], ["L-6", "L-5", "L-4", "L-3", "L-2"])
+        self.assertEqual(LowStockDigest.objects.get(user=quiet).total, 0)
+
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, "6 productos están en o por debajo de su umbral de alerta.")
+        self.assertContains(response, "… y 1 más.")
+
+
+class InventoryValuationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="valuer", password="secret123")
+        self.user.date_joined = timezone.now() - timedelta(days=30)
+        self.user.save(update_fields=["date_joined"])
+        self.client.force_login(self.user)
+        self.today = timezone.localdate()
+
+    def test_snapshot_of_today_uses_live_stock_and_can_be_rerun(self):
+        Item.objects.create(owner=self.user, sku="V-1", name="Uno", stock=3, cost=Decimal("2.50"))
+        Item.objects.create(owner=self.user, sku="V-2", name="Dos", stock=4, cost=Decimal("1.00"))
+
+        snapshot_valuations()
+        Item.objects.filter(sku="V-2").update(stock=0)
+        snapshot_valuations()
+
+        valuation = InventoryValuation.objects.get(user=self.user)
+        self.assertEqual((valuation.date, valuation.item_count), (self.today, 2))
+        self.assertEqual((valuation.total_stock, valuation.value), (3, Decimal("7.50")))
+
+    def test_past_days_are_rebuilt_from_the_ledger(self):
+        item = Item.objects.create(owner=self.user, sku="V-1", name="Uno", cost=Decimal("2.00"))
+        now = timezone.now()
+        Item.objects.filter(pk=item.pk).update(created_at=now - timedelta(days=5))
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(item=item, kind="receipt", quantity=10, balance=10, created_at=now - timedelta(days=5)),
+                StockMovement(item=item, kind="sale", quantity=-4, balance=6, created_at=now - timedelta(days=2)),
+            ]
+        )
+
+        snapshot_valuations(self.today - timedelta(days=3))
+        snapshot_valuations(self.today - timedelta(days=1))
+        snapshot_valuations(self.today - timedelta(days=7))
+
+        self.assertEqual(
+            list(
+                InventoryValuation.objects.filter(user=self.user).values_list("total_stock", "value")
+            ),
+            [(0, Decimal("0.00")), (10, Decimal("20.00")), (6, Decimal("12.00"))],
+        )
+        with self.assertRaises(ValueError):
+            snapshot_valuations(self.today + timedelta(days=1))
+
+    def test_past_days_before_a_compaction_use_the_archive_and_the_cost_then(self):
+        item = Item.objects.create(owner=self.user, sku="V-1", name="Uno", cost=Decimal("3.00"))
+        now = timezone.now()
+        Item.objects.filter(pk=item.pk).update(created_at=now - timedelta(days=10))
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(item=item, kind="receipt", quantity=10, balance=10, created_at=now - timedelta(days=10)),
+                StockMovement(item=item, kind="sale", quantity=-4, balance=6, created_at=now - timedelta(days=6)),
+                StockMovement(item=item, kind="receipt", quantity=2, balance=8, created_at=now - timedelta(days=1)),
+            ]
+        )
+        CostChange.objects.bulk_create(
+            [
+                CostChange(item=item, old_cost=Decimal("1.00"), new_cost=Decimal("2.00"), changed_at=now - timedelta(days=7)),
+                CostChange(item=item, old_cost=Decimal("2.00"), new_cost=Decimal("3.00"), changed_at=now - timedelta(days=2)),
+            ]
+        )
+        compact_ledger(now - timedelta(days=3))
+
+        for days_ago in (8, 5):
+            snapshot_valuations(self.today - timedelta(days=days_ago))
+
+        self.assertEqual(
+            list(
+                InventoryValuation.objects.filter(user=self.user)
+                .order_by("date")
+                .values_list("total_stock", "value")
+            ),
+            [(10, Decimal("10.00")), (6, Decimal("12.00"))],
+        )
+
+    def test_endpoint_returns_the_stored_series(self):
+        for days_ago, value in ((100, "1.00"), (10, "5.00"), (1, "8.00")):
+            InventoryValuation.objects.create(
+                user=self.user, date=self.today - timedelta(days=days_ago), value=Decimal(value)
+            )
+
+        response = self.client.get(reverse("inventory:valuation"))
+
+        self.assertEqual(
+            [(point["date"], point["value"]) for point in response.json()["points"]],
+            [
+                ((self.today - timedelta(days=10)).isoformat(), "5.00"),
+                ((self.today - timedelta(days=1)).isoformat(), "8.00"),
+            ],
+        )
+        self.assertEqual(
+            self.client.get(reverse("inventory:valuation"), HTTP_IF_NONE_MATCH=response["ETag"]).status_code,
+            304,
+        )
+        invalid = self.client.get(reverse("inventory:valuation"), {"start": "2024-01-01", "end": "2020-01-01"})
+        self.assertEqual(invalid.status_code, 400)
+
+
+class RepricingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="pricer", password="secret123")
+        self.client.force_login(self.user)
+        self.bolt = Item.objects.create(owner=self.user, sku="TOR-10-INOX", name="Tornillo inox", cost=Decimal("10.00"))
+        self.screw = Item.objects.create(owner=self.user, sku="TOR-20", name="Tornillo negro", cost=Decimal("3.33"))
+        self.nut = Item.objects.create(owner=self.user, sku="TUE-10", name="Tuerca", cost=Decimal("1.00"))
+        stranger = get_user_model().objects.create_user(username="stranger")
+        self.foreign = Item.objects.create(owner=stranger, sku="TOR-99", name="Tornillo ajeno", cost=Decimal("5.00"))
+
+    def costs(self):
+        return {
+            item.sku: item.cost
+            for item in Item.all_objects.filter(pk__in=[self.bolt.pk, self.screw.pk, self.nut.pk, self.foreign.pk])
+        }
+
+    def test_reprice_is_one_statement_that_keeps_history(self):
+        items = Item.objects.filter(owner=self.user, sku__istartswith="tor")
+        before = Item.objects.get(pk=self.bolt.pk).updated_at
+
+        with CaptureQueriesContext(connection) as queries:
+            changed = apply_repricing(items, REPRICE_PERCENT, Decimal("10"), "Proveedor")
+
+        self.assertEqual(changed, 2)
+        self.assertEqual(sum("UPDATE" in query["sql"] for query in queries), 1)
+        self.assertEqual(
+            self.costs(),
+            {"TOR-10-INOX": Decimal("11.00"), "TOR-20": Decimal("3.66"), "TUE-10": Decimal("1.00"), "TOR-99": Decimal("5.00")},
+        )
+        self.assertGreater(Item.objects.get(pk=self.bolt.pk).updated_at, before)
+        self.assertEqual(
+            sorted(CostChange.objects.values_list("item__sku", "old_cost", "new_cost", "reference")),
+            [
+                ("TOR-10-INOX", Decimal("10.00"), Decimal("11.00"), "Proveedor"),
+                ("TOR-20", Decimal("3.33"), Decimal("3.66"), "Proveedor"),
+            ],
+        )
+
+    def test_fixed_delta_never_goes_below_zero(self):
+        apply_repricing(Item.objects.filter(owner=self.user), REPRICE_AMOUNT, Decimal("-4.00"))
+
+        self.assertEqual(
+            self.costs(),
+            {"TOR-10-INOX": Decimal("6.00"), "TOR-20": Decimal("0.00"), "TUE-10": Decimal("0.00"), "TOR-99": Decimal("5.00")},
+        )
+
+    def test_preview_changes_nothing_and_apply_uses_the_same_selection(self):
+        data = {"sku": "tor-*-inox", "ids": "", "q": "", "mode": REPRICE_PERCENT, "amount": "-50"}
+
+        preview = self.client.post(reverse("inventory:reprice"), data, HTTP_HX_REQUEST="true")
+
+        self.assertEqual(preview.context["preview"].sample, [("TOR-10-INOX", "Tornillo inox", Decimal("10.00"), Decimal("5.00"))])
+        self.assertContains(preview, "Aplicar a 1 productos")
+        self.assertFalse(CostChange.objects.exists())
+
+        self.client.post(reverse("inventory:reprice"), {**data, "action": "apply"}, HTTP_HX_REQUEST="true")
+        self.assertEqual(self.costs()["TOR-10-INOX"], Decimal("5.00"))
+        self.assertEqual(CostChange.objects.count(), 1)
+
+    def test_selection_by_ids_stays_within_the_owner(self):
+        data = {"ids": f"{self.nut.pk}, {self.foreign.pk}", "mode": REPRICE_AMOUNT, "amount": "1", "action": "apply"}
+
+        response = self.client.post(reverse("inventory:reprice"), data, HTTP_HX_REQUEST="true")
+
+        self.assertEqual(response.context["repriced"], 1)
+        self.assertEqual(self.costs()["TUE-10"], Decimal("2.00"))
+        self.assertEqual(self.costs()["TOR-99"], Decimal("5.00"))
+
+    def test_requires_a_selection(self):
+        response = self.client.post(
+            reverse("inventory:reprice"), {"mode": REPRICE_AMOUNT, "amount": "1"}, HTTP_HX_REQUEST="true"
+        )
+
+        self.assertContains(response, "Indica al menos un SKU, un nombre o una lista de IDs.")
+        self.assertEqual(json.loads(response["HX-Trigger"])["toast"]["type"], "error")
+
+    def test_manual_cost_edit_is_recorded(self):
+        self.client.post(
+            reverse("inventory:update", args=[self.nut.pk]),
+            {"sku": "TUE-10", "name": "Tuerca", "cost": "1.50"},
+            HTTP_HX_REQUEST="true",
+        )
+
+        self.assertEqual(
+            list(CostChange.objects.values_list("old_cost", "new_cost", "reference")),
+            [(Decimal("1.00"), Decimal("1.50"), "Edición manual")],
+        )
+
+    def test_edit_keeps_concurrent_stock_and_cost_changes(self):
+        clean = ItemForm.clean
+
+        def clean_after_a_concurrent_write(form):
+            # Otra petición mueve stock y reprecia mientras se valida el formulario.
+            record_movements(
+                [StockMovement(item_id=self.nut.pk, quantity=4, kind=StockMovement.KIND_RECEIPT)]
+            )
+            Item.objects.filter(pk=self.nut.pk).update(cost=Decimal("1.20"))
+            return clean(form)
+
+        with mock.patch.object(ItemForm, "clean", clean_after_a_concurrent_write):
+            self.client.post(
+                reverse("inventory:update", args=[self.nut.pk]),
+                {"sku": "TUE-10", "name": "Tuerca", "cost": "1.50"},
+                HTTP_HX_REQUEST="true",
+            )
+
+        self.nut.refresh_from_db()
+        self.assertEqual((self.nut.stock, self.nut.cost), (4, Decimal("1.50")))
+        self.assertEqual(
+            list(CostChange.objects.values_list("old_cost", "new_cost")),
+            [(Decimal("1.20"), Decimal("1.50"))],
+        )
+
+    def test_import_records_cost_changes_of_existing_items(self):
+        import_items(self.user, BytesIO(b"sku,name,cost\nTUE-10,Tuerca,1.20\nNEW-1,Nuevo,9\n"))
+
+        self.assertEqual(
+            list(CostChange.objects.values_list("item__sku", "old_cost", "new_cost")),
+            [("TUE-10", Decimal("1.00"), Decimal("1.20"))],
+        )
+
+
+class ItemSkuMigrationTests(TransactionTestCase):
+    before = [("inventory", "0005_item_owner_created_idx")]
+    after = [("inventory", "0006_item_owner_sku_ci_unique")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        self.migrate(executor.loader.graph.leaf_nodes())
+        super().tearDown()
+
+    def test_renames_case_variant_duplicates_before_adding_the_constraint(self):
+        apps = self.migrate(self.before)
+        User = apps.get_model("auth", "User")
+        OldItem = apps.get_model("inventory", "Item")
+        owner = User.objects.create(username="legacy")
+        other = User.objects.create(username="other")
+        now = timezone.now()
+        keep = OldItem.objects.create(owner=owner, sku="abc-1", name="Original")
+        upper = OldItem.objects.create(owner=owner, sku="ABC-1", name="Mayúsculas")
+        mixed = OldItem.objects.create(owner=owner, sku="Abc-1", name="Mixto")
+        gone = OldItem.objects.create(owner=owner, sku="aBC-1", name="Eliminado", deleted=now)
+        foreign = OldItem.objects.create(owner=other, sku="ABC-1", name="Ajeno")
+
+        apps = self.migrate(self.after)
+        Item = apps.get_model("inventory", "Item")
+
+        skus = dict(Item.objects.values_list("pk", "sku"))
+        self.assertEqual(skus[keep.pk], "abc-1")
+        self.assertEqual(skus[upper.pk], f"ABC-1-{upper.pk}")
+        self.assertEqual(skus[mixed.pk], f"Abc-1-{mixed.pk}")
+        self.assertEqual(skus[gone.pk], "aBC-1")
+        self.assertEqual(skus[foreign.pk], "ABC-1")
+        self.assertEqual(Item.objects.filter(deleted__isnull=True).count(), 4)
@@ -6,8 +6,15 @@ app_name = "inventory"
 
 urlpatterns = [
     path("", views.item_list, name="list"),
+    path("page/", views.item_list_page, name="list_page"),
+    path("low-stock/", views.item_low_stock, name="low_stock"),
+    path("low-stock/page/", views.item_low_stock_page, name="low_stock_page"),
+    path("valuation/", views.item_valuation, name="valuation"),
     path("create/", views.item_create, name="create"),
+    path("import/", views.item_import, name="import"),
+    path("reprice/", views.item_reprice, name="reprice"),
     path("<int:pk>/edit/", views.item_update, name="update"),
+    path("<int:pk>/stock/", views.item_stock, name="stock"),
     path("<int:pk>/row/", views.item_row, name="row"),
     path("<int:pk>/delete/", views.item_delete, name="delete"),
 ]
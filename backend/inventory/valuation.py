@@ -0,0 +1,171 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Count, DecimalField, F, Sum
+from django.utils import timezone
+
+from .models import (
+    ArchivedStockMovement,
+    CostChange,
+    InventoryValuation,
+    Item,
+    StockMovement,
+    StockSnapshot,
+)
+
+
+def _end_of_day(day):
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def _current_totals():
+    """``(owner_id, items, stock, value)`` per owner from the live stock."""
+
+    return (
+        Item.objects.filter(owner__isnull=False)
+        .values("owner")
+        .annotate(
+            item_count=Count("id"),
+            total_stock=Sum("stock"),
+            total_value=Sum(
+                F("stock") * F("cost"),
+                output_field=DecimalField(max_digits=18, decimal_places=2),
+            ),
+        )
+        .order_by()
+        .values_list("owner", "item_count", "total_stock", "total_value")
+    )
+
+
+def _ledger_totals(cutoff):
+    """Same totals as they stood at ``cutoff``, rebuilt from the stock and cost history.
+
+    Each item's quantity is one seek on the live movements, then on the
+    archive and the snapshots for dates already compacted. Its cost is the
+    last ``CostChange`` before the cutoff, or the cost the first later change
+    started from, or the current cost if it never changed.
+    """
+
+    item_table = connection.ops.quote_name(Item._meta.db_table)
+    movement_table = connection.ops.quote_name(StockMovement._meta.db_table)
+    archive_table = connection.ops.quote_name(ArchivedStockMovement._meta.db_table)
+    snapshot_table = connection.ops.quote_name(StockSnapshot._meta.db_table)
+    cost_table = connection.ops.quote_name(CostChange._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT item.owner_id, COUNT(*), SUM(past.balance), SUM(past.balance * past.cost)
+            FROM {item_table} AS item
+            CROSS JOIN LATERAL (
+                SELECT
+                    COALESCE(
+                        (
+                            SELECT balance FROM {movement_table}
+                            WHERE item_id = item.id AND created_at < %(cutoff)s
+                            ORDER BY created_at DESC, id DESC
+                            LIMIT 1
+                        ),
+                        (
+                            SELECT balance FROM {archive_table}
+                            WHERE item_id = item.id AND created_at < %(cutoff)s
+                            ORDER BY created_at DESC, id DESC
+                            LIMIT 1
+                        ),
+                        (
+                            SELECT balance FROM {snapshot_table}
+                            WHERE item_id = item.id AND taken_at < %(cutoff)s
+                            ORDER BY taken_at DESC
+                            LIMIT 1
+                        ),
+                        0
+                    ) AS balance,
+                    COALESCE(
+                        (
+                            SELECT new_cost FROM {cost_table}
+                            WHERE item_id = item.id AND changed_at < %(cutoff)s
+                            ORDER BY changed_at DESC, id DESC
+                            LIMIT 1
+                        ),
+                        (
+                            SELECT old_cost FROM {cost_table}
+                            WHERE item_id = item.id AND changed_at >= %(cutoff)s
+                            ORDER BY changed_at, id
+                            LIMIT 1
+                        ),
+                        item.cost
+                    ) AS cost
+            ) AS past
+            WHERE item.owner_id IS NOT NULL
+              AND item.created_at < %(cutoff)s
+              AND (item.deleted IS NULL OR item.deleted >= %(cutoff)s)
+            GROUP BY item.owner_id
+            """,
+            {"cutoff": cutoff},
+        )
+        return cursor.fetchall()
+
+
+def snapshot_valuations(day=None, batch_size=1000) -> int:
+    """Store every user's ``InventoryValuation`` for ``day`` (today by default).
+
+    Today is valued from the live stock; past days are rebuilt from the
+    ledger. Running it again for the same day overwrites that day's rows.
+    Returns how many were written.
+    """
+
+    today = timezone.localdate()
+    day = day or today
+    if day > today:
+        raise ValueError("No se puede valuar un día futuro.")
+    end = _end_of_day(day)
+    rows = _current_totals() if day == today else _ledger_totals(end)
+    totals = {owner_id: (items, stock, value) for owner_id, items, stock, value in rows}
+
+    now = timezone.now()
+    user_ids = (
+        get_user_model()
+        .objects.filter(date_joined__lt=end)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    valuations = []
+    for pk in user_ids:
+        items, stock, value = totals.get(pk, (0, 0, Decimal("0")))
+        valuations.append(
+            InventoryValuation(
+                user_id=pk,
+                date=day,
+                item_count=items,
+                total_stock=stock or 0,
+                value=value or Decimal("0"),
+                computed_at=now,
+            )
+        )
+    written = InventoryValuation.objects.bulk_create(
+        valuations,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["user", "date"],
+        update_fields=["item_count", "total_stock", "value", "computed_at"],
+    )
+    return len(written)
+
+
+def valuation_series(user, start, end) -> list:
+    """The stored valuations of ``user`` between two dates, oldest first."""
+
+    return [
+        {
+            "date": date.isoformat(),
+            "value": format(value, "f"),
+            "stock": stock,
+            "items": items,
+        }
+        for date, value, stock, items in InventoryValuation.objects.filter(
+            user=user, date__range=(start, end)
+        )
+        .order_by("date")
+        .values_list("date", "value", "total_stock", "item_count")
+    ]
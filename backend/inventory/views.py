@@ -1,24 +1,62 @@
+import hashlib
 import json
 
 from django.contrib.auth.decorators import login_required
-from django.db import IntegrityError
-from django.http import HttpResponse, HttpResponseNotAllowed
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    JsonResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 
-from .forms import ItemForm
-from .models import Item
+from accounts.versions import ITEMS, data_version
+from config.pagination import keyset_page
+
+from .alerts import low_stock_items
+from .forms import (
+    ItemFilterForm,
+    ItemForm,
+    ItemImportForm,
+    RepricingForm,
+    StockMovementForm,
+    ValuationRangeForm,
+)
+from .importer import import_items
+from .ledger import InsufficientStock, move_stock
+from .models import SKU_TAKEN_MESSAGE, CostChange, InventoryValuation, Item, StockMovement
+from .repricing import apply_repricing, preview_repricing
+from .valuation import valuation_series
+
+
+# Columnas que guarda la edición de un producto; el stock queda fuera porque
+# solo lo mueve el libro de movimientos.
+ITEM_EDITABLE_FIELDS = ["sku", "name", "cost", "low_stock_threshold", "low_stock_level", "updated_at"]
 
 
 def _is_htmx(request):
     return request.headers.get("HX-Request") == "true"
 
 
-def _render_item_form(request, form, item=None, hx_trigger=None):
+def _render_item_form(
+    request,
+    form,
+    item=None,
+    hx_trigger=None,
+    template="inventory/partials/item_form.html",
+    movement_form=None,
+):
+    if item is not None and movement_form is None:
+        movement_form = StockMovementForm()
     response = render(
         request,
-        "inventory/partials/item_form.html",
-        {"form": form, "item": item},
+        template,
+        {"form": form, "item": item, "movement_form": movement_form},
     )
     if hx_trigger:
         response["HX-Trigger"] = json.dumps(hx_trigger)
@@ -35,16 +73,119 @@ def _first_form_error_message(form):
     return "Por favor corrige los errores en el formulario."
 
 
+def _item_list_context(request, filter_form, cursor=None):
+    context = {
+        "filter_form": filter_form,
+        "filter_query": filter_form.querystring(),
+        "cursor": cursor,
+        "items": [],
+        "page": None,
+    }
+    if filter_form.is_bound and not filter_form.is_valid():
+        return context
+
+    queryset = Item.objects.filter(owner=request.user)
+    if filter_form.is_bound:
+        queryset = filter_form.filter(queryset)
+    page = keyset_page(queryset, cursor)
+    context.update(items=page.items, page=page)
+    return context
+
+
+def _render_item_list(request, filter_form, status=200, **extra):
+    context = _item_list_context(request, filter_form)
+    context.setdefault("form", ItemForm(owner=request.user))
+    context.setdefault("import_form", ItemImportForm())
+    context.setdefault("reprice_form", RepricingForm())
+    context.update(extra)
+    return render(request, "inventory/list.html", context, status=status)
+
+
+def _item_list_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    version = data_version(request.user, ITEMS)
+    raw = f"{request.user.pk}:{request.GET.urlencode()}:{version}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
 @login_required
 def item_list(request):
-    return render(
-        request,
-        "inventory/list.html",
+    filter_form = ItemFilterForm(request.GET or None)
+    status = 400 if filter_form.is_bound and not filter_form.is_valid() else 200
+    return _render_item_list(request, filter_form, status=status)
+
+
+@login_required
+@condition(etag_func=_item_list_etag)
+def item_list_page(request):
+    """Rows matching the search after ``cursor``, plus the following "load more" row."""
+
+    filter_form = ItemFilterForm(request.GET)
+    try:
+        context = _item_list_context(request, filter_form, request.GET.get("cursor"))
+    except ValueError:
+        return HttpResponseBadRequest("Cursor inválido.")
+    status = 400 if filter_form.errors else 200
+    response = render(request, "inventory/partials/item_rows.html", context, status=status)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _low_stock_context(request, cursor=None):
+    page = keyset_page(low_stock_items(request.user), cursor)
+    return {"items": page.items, "page": page, "cursor": cursor}
+
+
+@login_required
+def item_low_stock(request):
+    """Items at or below their low-stock threshold, newest first."""
+
+    return render(request, "inventory/low_stock.html", _low_stock_context(request))
+
+
+@login_required
+@condition(etag_func=_item_list_etag)
+def item_low_stock_page(request):
+    try:
+        context = _low_stock_context(request, request.GET.get("cursor"))
+    except ValueError:
+        return HttpResponseBadRequest("Cursor inválido.")
+    response = render(request, "inventory/partials/low_stock_rows.html", context)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _valuation_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    state = InventoryValuation.objects.filter(user=request.user).aggregate(
+        count=Count("id"), last_update=Max("computed_at")
+    )
+    raw = "{user}:{query}:{count}:{last_update}".format(
+        user=request.user.pk, query=request.GET.urlencode(), **state
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+@login_required
+@condition(etag_func=_valuation_etag)
+def item_valuation(request):
+    """Daily inventory value from the stored snapshots, for historical charts."""
+
+    form = ValuationRangeForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"error": _first_form_error_message(form)}, status=400)
+    start, end = form.cleaned_data["start"], form.cleaned_data["end"]
+    response = JsonResponse(
         {
-            "items": Item.objects.filter(owner=request.user).order_by("-created_at"),
-            "form": ItemForm(owner=request.user),
-        },
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "points": valuation_series(request.user, start, end),
+        }
     )
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @login_required
@@ -57,14 +198,7 @@ def item_create(request):
     form = ItemForm(request.POST, owner=request.user)
     if not form.is_valid():
         if not _is_htmx(request):
-            return render(
-                request,
-                "inventory/list.html",
-                {
-                    "items": Item.objects.filter(owner=request.user).order_by("-created_at"),
-                    "form": form,
-                },
-            )
+            return _render_item_form(request, form, template="inventory/form_page.html")
         return _render_item_form(
             request,
             form,
@@ -78,22 +212,15 @@ def item_create(request):
 
     item = form.save(commit=False)
     item.owner = request.user
+    opening_stock, item.stock = item.stock, 0
     try:
-        item.save()
+        with transaction.atomic():
+            item.save()
+            move_stock(item, opening_stock, StockMovement.KIND_RECEIPT, "Inventario inicial")
     except IntegrityError:
-        form.add_error(
-            "sku",
-            "Ya existe un producto con este SKU. Ingresa un identificador diferente o edita el producto existente.",
-        )
+        form.add_error("sku", SKU_TAKEN_MESSAGE)
         if not _is_htmx(request):
-            return render(
-                request,
-                "inventory/list.html",
-                {
-                    "items": Item.objects.filter(owner=request.user).order_by("-created_at"),
-                    "form": form,
-                },
-            )
+            return _render_item_form(request, form, template="inventory/form_page.html")
         return _render_item_form(
             request,
             form,
@@ -131,6 +258,80 @@ def item_create(request):
     return response
 
 
+# Errores por fila que se muestran tras una importación; el resto solo se cuenta.
+IMPORT_ERRORS_SHOWN = 50
+
+
+@login_required
+def item_import(request):
+    """Upsert items from an uploaded CSV and show the per-row report."""
+
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    form = ItemImportForm(request.POST, request.FILES)
+    report = None
+    if form.is_valid():
+        report = import_items(request.user, form.cleaned_data["file"].file)
+        if report.error:
+            form.add_error("file", report.error)
+    context = {
+        "import_form": ItemImportForm() if report and not report.error else form,
+        "report": report,
+        "errors_shown": report.errors[:IMPORT_ERRORS_SHOWN] if report else [],
+        "errors_hidden": max(len(report.errors) - IMPORT_ERRORS_SHOWN, 0) if report else 0,
+    }
+    if not _is_htmx(request):
+        return _render_item_list(request, ItemFilterForm(), **context)
+
+    response = render(request, "inventory/partials/item_import.html", context)
+    if report is None or report.error:
+        toast = {"message": _first_form_error_message(form), "type": "error"}
+    else:
+        toast = {
+            "message": f"{report.created} productos creados y {report.updated} actualizados.",
+            "type": "info" if report.errors else "success",
+        }
+    response["HX-Trigger"] = json.dumps({"toast": toast})
+    return response
+
+
+@login_required
+def item_reprice(request):
+    """Preview or apply a percentage or fixed change to the cost of the selected items."""
+
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    form = RepricingForm(request.POST)
+    apply = request.POST.get("action") == "apply"
+    preview = None
+    repriced = None
+    if form.is_valid():
+        items = form.filter(Item.objects.filter(owner=request.user))
+        mode, amount = form.cleaned_data["mode"], form.cleaned_data["amount"]
+        if apply:
+            repriced = apply_repricing(items, mode, amount, form.cleaned_data["reference"])
+        else:
+            preview = preview_repricing(items, mode, amount)
+    context = {
+        "reprice_form": RepricingForm() if repriced is not None else form,
+        "preview": preview,
+        "repriced": repriced,
+    }
+    if not _is_htmx(request):
+        return _render_item_list(request, ItemFilterForm(), **context)
+
+    response = render(request, "inventory/partials/item_reprice.html", context)
+    if form.errors:
+        toast = {"message": _first_form_error_message(form), "type": "error"}
+        response["HX-Trigger"] = json.dumps({"toast": toast})
+    elif repriced is not None:
+        toast = {"message": f"Costo actualizado en {repriced} productos.", "type": "success"}
+        response["HX-Trigger"] = json.dumps({"toast": toast})
+    return response
+
+
 @login_required
 def item_update(request, pk):
     item = get_object_or_404(Item.objects.filter(owner=request.user), pk=pk)
@@ -150,14 +351,7 @@ def item_update(request, pk):
     form = ItemForm(request.POST, instance=item, owner=request.user)
     if not form.is_valid():
         if not _is_htmx(request):
-            return render(
-                request,
-                "inventory/list.html",
-                {
-                    "items": Item.objects.filter(owner=request.user).order_by("-created_at"),
-                    "form": form,
-                },
-            )
+            return _render_item_form(request, form, item, template="inventory/form_page.html")
         return _render_item_form(
             request,
             form,
@@ -171,21 +365,24 @@ def item_update(request, pk):
         )
 
     try:
-        item = form.save()
+        with transaction.atomic():
+            # Se relee la fila bloqueada: el costo anterior debe ser el
+            # vigente, no el que vio el formulario.
+            locked = Item.objects.select_for_update().get(pk=item.pk)
+            item = form.save(commit=False)
+            item.stock = locked.stock
+            item.save(update_fields=ITEM_EDITABLE_FIELDS)
+            if item.cost != locked.cost:
+                CostChange.objects.create(
+                    item=item,
+                    old_cost=locked.cost,
+                    new_cost=item.cost,
+                    reference="Edición manual",
+                )
     except IntegrityError:
-        form.add_error(
-            "sku",
-            "Ya existe un producto con este SKU. Ingresa un identificador diferente o edita el producto existente.",
-        )
+        form.add_error("sku", SKU_TAKEN_MESSAGE)
         if not _is_htmx(request):
-            return render(
-                request,
-                "inventory/list.html",
-                {
-                    "items": Item.objects.filter(owner=request.user).order_by("-created_at"),
-                    "form": form,
-                },
-            )
+            return _render_item_form(request, form, item, template="inventory/form_page.html")
         return _render_item_form(
             request,
             form,
@@ -224,6 +421,56 @@ def item_update(request, pk):
     return response
 
 
+@login_required
+def item_stock(request, pk):
+    """Append a receipt or manual adjustment to the item's stock ledger."""
+
+    item = get_object_or_404(Item.objects.filter(owner=request.user), pk=pk)
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    movement_form = StockMovementForm(request.POST)
+    error = None
+    if movement_form.is_valid():
+        try:
+            move_stock(
+                item,
+                movement_form.cleaned_data["quantity"],
+                movement_form.cleaned_data["kind"],
+                movement_form.cleaned_data["reference"],
+            )
+        except InsufficientStock as shortage:
+            error = str(shortage)
+    else:
+        error = _first_form_error_message(movement_form)
+    if not _is_htmx(request):
+        return redirect("inventory:list")
+
+    form = ItemForm(instance=item, owner=request.user)
+    if error:
+        return _render_item_form(
+            request,
+            form,
+            item,
+            hx_trigger={"toast": {"message": error, "type": "error"}},
+            movement_form=movement_form,
+        )
+    row_html = render_to_string("inventory/partials/item_row.html", {"item": item}, request=request)
+    return _render_item_form(
+        request,
+        form,
+        item,
+        hx_trigger={
+            "toast": {"message": f"Stock actualizado: {item.stock}.", "type": "success"},
+            "listChanged": {
+                "action": "replace",
+                "selector": f"#item-{item.pk}",
+                "html": row_html,
+            },
+        },
+    )
+
+
 @login_required
 def item_row(request, pk):
     item = get_object_or_404(Item.objects.filter(owner=request.user), pk=pk)
@@ -1,13 +1,28 @@
 from django.contrib import admin
-from .models import Quote
+from .models import Quote, QuotePDFJob
 
 @admin.register(Quote)
 class QuoteAdmin(admin.ModelAdmin):
-    list_display = ("id", "client", "status", "total", "created_at")
+    list_display = ("id", "client", "item_count", "status", "total", "created_at")
     list_filter = ("status",)
+    list_select_related = ("client",)
     date_hierarchy = "created_at"
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_item_count()
+
+    @admin.display(description="Productos", ordering="annotated_item_count")
+    def item_count(self, obj):
+        return obj.item_count
+
     @admin.display(boolean=True, ordering="deleted", description="Deleted")
     def is_deleted(self, obj):
         # SafeDeleteModel agrega 'deleted' (None si no está eliminado)
         return bool(getattr(obj, "deleted", None))
+
+
+@admin.register(QuotePDFJob)
+class QuotePDFJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "quote", "status", "created_at", "updated_at")
+    list_filter = ("status",)
+    readonly_fields = ("fingerprint", "error")
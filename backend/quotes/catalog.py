@@ -0,0 +1,115 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.functional import cached_property
+
+from accounts.versions import ITEMS, data_version
+from inventory.models import Item
+
+
+SEARCH_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+SEARCH_CACHE_TIMEOUT = 300
+
+
+class ItemCatalog:
+    """Snapshot of the items a user can quote, shared by every form of a request."""
+
+    def __init__(self, user):
+        self.user = user
+        self._requested = set()
+        self._items = {}
+
+    @cached_property
+    def queryset(self):
+        return Item.objects.filter(owner=self.user).order_by("name")
+
+    @cached_property
+    def version(self) -> str:
+        """Short digest that changes whenever an item is added, edited or removed.
+
+        It comes from the owner's item counter (one primary-key lookup), so
+        reading it on every keystroke of the picker stays cheap.
+        """
+
+        raw = f"{self.user.pk}:{data_version(self.user, ITEMS)}"
+        return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+    @cached_property
+    def cost_map_url(self) -> str:
+        return f"{reverse('quotes:catalog')}?v={self.version}"
+
+    def cost_map(self) -> dict:
+        return {
+            str(pk): format(cost, "f")
+            for pk, cost in self.queryset.order_by().values_list("pk", "cost")
+        }
+
+    def request(self, pk):
+        """Register a pk so it is fetched together with the others on first use."""
+
+        if pk in (None, ""):
+            return
+        self._requested.add(str(pk))
+
+    def get(self, pk):
+        """Return the owner's item for ``pk`` or ``None`` if it is unknown or foreign."""
+
+        if pk in (None, ""):
+            return None
+        self.request(pk)
+        pending = self._requested.difference(self._items)
+        if pending:
+            found = {
+                str(item.pk): item
+                for item in Item.objects.filter(
+                    owner=self.user,
+                    pk__in=[key for key in pending if key.isdigit()],
+                )
+            }
+            for key in pending:
+                self._items[key] = found.get(key)
+        return self._items[str(pk)]
+
+    def matching(self, term: str):
+        """Items whose SKU starts with ``term`` or whose name contains it.
+
+        The SKU prefix uses ``item_owner_sku_prefix_idx`` and the name
+        substring the trigram index ``item_name_upper_trgm_idx``.
+        """
+
+        queryset = Item.objects.filter(owner=self.user)
+        term = term.strip()
+        if term:
+            queryset = queryset.filter(Q(sku__istartswith=term) | Q(name__icontains=term))
+        return queryset
+
+    def search_queryset(self, term: str, limit: int = SEARCH_LIMIT):
+        """The picker query for ``term``: ``(pk, sku, name, cost)`` rows by SKU."""
+
+        return self.matching(term).order_by("sku").values_list("pk", "sku", "name", "cost")[:limit]
+
+    def search(self, term: str, limit: int = SEARCH_LIMIT) -> list:
+        """Picker results for ``term``, cached until the owner's items change."""
+
+        term = term.strip()
+        digest = hashlib.md5(term.lower().encode()).hexdigest()
+        cache_key = f"quotes:item-search:{self.user.pk}:{self.version}:{limit}:{digest}"
+        results = cache.get(cache_key)
+        if results is not None:
+            return results
+
+        results = [
+            {
+                "id": pk,
+                "sku": sku,
+                "name": name,
+                "label": f"{sku} - {name}",
+                "cost": format(cost, "f"),
+            }
+            for pk, sku, name, cost in self.search_queryset(term, limit)
+        ]
+        cache.set(cache_key, results, SEARCH_CACHE_TIMEOUT)
+        return results
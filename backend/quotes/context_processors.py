@@ -0,0 +1,7 @@
+from django.conf import settings
+
+
+def quote_pdf(request):
+    """Expose whether quote PDFs are rendered in the background."""
+
+    return {"quote_pdf_async": settings.QUOTE_PDF_ASYNC}
@@ -0,0 +1,47 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.versions import QUOTES, bump_data_versions
+
+from .models import Quote, QuoteItem
+
+
+def duplicate_quote(quote, client=None):
+    """Copy ``quote`` and its lines as a new draft with two INSERT ... SELECT.
+
+    The rows never leave the database, so the cost does not depend on the
+    number of lines. ``client`` replaces the original client when given.
+    """
+
+    quote_table = connection.ops.quote_name(Quote._meta.db_table)
+    line_table = connection.ops.quote_name(QuoteItem._meta.db_table)
+    client_id = client.pk if client is not None else quote.client_id
+    now = timezone.now()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {quote_table}
+                (created_by_id, client_id, created_at, updated_at, total, status,
+                 deleted, deleted_by_cascade)
+            SELECT created_by_id, %s, %s, %s, total, %s, NULL, FALSE
+            FROM {quote_table}
+            WHERE id = %s
+            RETURNING id
+            """,
+            [client_id, now, now, Quote.STATUS_DRAFT, quote.pk],
+        )
+        copy_pk = cursor.fetchone()[0]
+        cursor.execute(
+            f"""
+            INSERT INTO {line_table} (quote_id, item_id, quantity, unit_price)
+            SELECT %s, item_id, quantity, unit_price
+            FROM {line_table}
+            WHERE quote_id = %s
+            ORDER BY id
+            """,
+            [copy_pk, quote.pk],
+        )
+        bump_data_versions([quote.created_by_id], QUOTES)
+
+    return Quote.objects.select_related("client").get(pk=copy_pk)
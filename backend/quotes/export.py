@@ -0,0 +1,168 @@
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.utils import timezone
+
+from config.views import format_currency
+
+from . import pdf_worker
+from .models import Quote, QuoteItem
+from .pdf import (
+    load_header_logo,
+    quote_pdf_fingerprint,
+    read_cached_quote_pdf,
+    render_quote_pdf,
+    store_quote_pdf,
+)
+
+
+# Cotizaciones que se leen de la base por consulta (con sus líneas precargadas).
+EXPORT_CHUNK_SIZE = 100
+# Filas por lectura del cursor del servidor en las exportaciones a hoja de cálculo.
+SPREADSHEET_CHUNK_SIZE = 2000
+
+QUOTE_SHEET_HEADER = ["Folio", "Fecha", "Cliente", "Correo del cliente", "Estado", "Productos", "Total"]
+LINE_SHEET_HEADER = [
+    "Folio",
+    "Fecha",
+    "Estado",
+    "Cliente",
+    "SKU",
+    "Producto",
+    "Cantidad",
+    "Precio unitario",
+    "Subtotal",
+]
+
+
+def _collect(pending):
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        quote, fingerprint = pending.pop(future)
+        content = future.result()
+        store_quote_pdf(quote, fingerprint, content)
+        yield quote, content
+
+
+def iter_quote_pdfs(quotes, company_profile=None, workers=None):
+    """Yield ``(quote, pdf_bytes)`` for every quote as soon as each one is ready.
+
+    Cached versions are returned right away. Misses are rendered on a pool
+    of processes with at most ``2 * workers`` renders in flight, and stored
+    in the PDF cache as they finish. ``quotes`` must come with ``client``,
+    ``created_by`` and ``items__item`` loaded, like for ``render_quote_pdf``.
+    """
+
+    if workers is None:
+        workers = settings.QUOTE_PDF_EXPORT_WORKERS
+    header_logo = load_header_logo(company_profile) if company_profile else None
+    executor = None
+    pending = {}
+    try:
+        for quote in quotes:
+            fingerprint = quote_pdf_fingerprint(quote, company_profile)
+            content = read_cached_quote_pdf(quote, fingerprint)
+            if content is not None:
+                yield quote, content
+                continue
+
+            if workers <= 1:
+                content = render_quote_pdf(quote, company_profile)
+                store_quote_pdf(quote, fingerprint, content)
+                yield quote, content
+                continue
+
+            if executor is None:
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=pdf_worker.setup,
+                )
+            future = executor.submit(pdf_worker.render, quote, company_profile, header_logo)
+            pending[future] = (quote, fingerprint)
+            if len(pending) >= workers * 2:
+                yield from _collect(pending)
+
+        while pending:
+            yield from _collect(pending)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _money(currency):
+    return format_currency if currency else (lambda amount: amount)
+
+
+def _local_datetime(value):
+    return timezone.localtime(value).strftime("%Y-%m-%d %H:%M")
+
+
+def quote_sheet_rows(quotes, currency=False):
+    """Header row plus one row per quote, read with a server-side cursor."""
+
+    statuses = dict(Quote.STATUS_CHOICES)
+    money = _money(currency)
+    yield QUOTE_SHEET_HEADER
+    rows = (
+        quotes.with_item_count()
+        .order_by("created_at", "id")
+        .values_list(
+            "pk",
+            "created_at",
+            "client__name",
+            "client__email",
+            "status",
+            "annotated_item_count",
+            "total",
+        )
+    )
+    for pk, created_at, client, email, status, item_count, total in rows.iterator(
+        chunk_size=SPREADSHEET_CHUNK_SIZE
+    ):
+        yield [
+            pk,
+            _local_datetime(created_at),
+            client,
+            email or "",
+            statuses.get(status, status),
+            item_count,
+            money(total),
+        ]
+
+
+def line_sheet_rows(quotes, currency=False):
+    """Header row plus one row per quote line, joined with its item and client."""
+
+    statuses = dict(Quote.STATUS_CHOICES)
+    money = _money(currency)
+    yield LINE_SHEET_HEADER
+    rows = (
+        QuoteItem.objects.filter(quote__in=quotes.values("pk"))
+        .order_by("quote__created_at", "quote_id", "id")
+        .values_list(
+            "quote_id",
+            "quote__created_at",
+            "quote__status",
+            "quote__client__name",
+            "item__sku",
+            "item__name",
+            "quantity",
+            "unit_price",
+        )
+    )
+    for quote_id, created_at, status, client, sku, name, quantity, unit_price in rows.iterator(
+        chunk_size=SPREADSHEET_CHUNK_SIZE
+    ):
+        yield [
+            quote_id,
+            _local_datetime(created_at),
+            statuses.get(status, status),
+            client,
+            sku,
+            name,
+            quantity,
+            money(unit_price),
+            money(quantity * unit_price),
+        ]
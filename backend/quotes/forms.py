@@ -1,14 +1,21 @@
-import json
+from datetime import datetime, time, timedelta
 
 from django import forms
+from django.core.exceptions import ValidationError
+from django.http import QueryDict
+from django.utils import timezone
 
+from clients.forms import ClientPickerSelect
 from clients.models import Client
 from inventory.models import Item
 
+from .catalog import ItemCatalog
 from .models import Quote
 
 
 class QuoteForm(forms.ModelForm):
+    """Quote header; the client must belong to ``user`` and is picked by search."""
+
     def __init__(self, *args, user=None, **kwargs):
         super().__init__(*args, **kwargs)
         queryset = Client.objects.none()
@@ -23,23 +30,187 @@ class QuoteForm(forms.ModelForm):
             "client": "Cliente",
             "status": "Estado",
         }
+        widgets = {
+            "client": ClientPickerSelect,
+        }
+
+
+class QuoteFilterForm(forms.Form):
+    """Optional filters over the user's quotes, shared by the list and the batch export."""
+
+    date_from = forms.DateField(
+        label="Desde",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date", "class": "form-input"}),
+    )
+    date_to = forms.DateField(
+        label="Hasta",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date", "class": "form-input"}),
+    )
+    status = forms.ChoiceField(
+        label="Estado",
+        required=False,
+        choices=[("", "Todos"), *Quote.STATUS_CHOICES],
+        widget=forms.Select(attrs={"class": "form-input"}),
+    )
+    client = forms.ModelChoiceField(
+        label="Cliente",
+        required=False,
+        queryset=Client.objects.none(),
+        empty_label="Todos",
+        widget=ClientPickerSelect(attrs={"class": "form-input"}),
+    )
+    total_min = forms.DecimalField(
+        label="Total mínimo",
+        required=False,
+        min_value=0,
+        max_digits=12,
+        decimal_places=2,
+        widget=forms.NumberInput(attrs={"class": "form-input", "step": "0.01"}),
+    )
+    total_max = forms.DecimalField(
+        label="Total máximo",
+        required=False,
+        min_value=0,
+        max_digits=12,
+        decimal_places=2,
+        widget=forms.NumberInput(attrs={"class": "form-input", "step": "0.01"}),
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if user is not None:
+            self.fields["client"].queryset = Client.objects.filter(owner=user).order_by("name")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get("date_from")
+        date_to = cleaned_data.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise ValidationError("La fecha inicial no puede ser posterior a la final.")
+        total_min = cleaned_data.get("total_min")
+        total_max = cleaned_data.get("total_max")
+        if total_min is not None and total_max is not None and total_min > total_max:
+            raise ValidationError("El total mínimo no puede ser mayor que el máximo.")
+        return cleaned_data
+
+    def querystring(self) -> str:
+        """The submitted, non-empty filters as a query string (without ``?``)."""
+
+        params = QueryDict(mutable=True)
+        if self.is_bound:
+            for name in self.fields:
+                value = self.data.get(name)
+                if value not in (None, ""):
+                    params[name] = value
+        return params.urlencode()
+
+    def filter(self, queryset):
+        """Apply the cleaned filters; dates become ``created_at`` bounds in local time."""
+
+        data = self.cleaned_data
+        if data.get("date_from"):
+            start = datetime.combine(data["date_from"], time.min)
+            queryset = queryset.filter(created_at__gte=timezone.make_aware(start))
+        if data.get("date_to"):
+            end = datetime.combine(data["date_to"] + timedelta(days=1), time.min)
+            queryset = queryset.filter(created_at__lt=timezone.make_aware(end))
+        if data.get("status"):
+            queryset = queryset.filter(status=data["status"])
+        if data.get("client"):
+            queryset = queryset.filter(client=data["client"])
+        if data.get("total_min") is not None:
+            queryset = queryset.filter(total__gte=data["total_min"])
+        if data.get("total_max") is not None:
+            queryset = queryset.filter(total__lte=data["total_max"])
+        return queryset
+
+
+class QuoteDuplicateForm(forms.Form):
+    client = forms.ModelChoiceField(
+        label="Cliente de la copia",
+        queryset=Client.objects.none(),
+        widget=ClientPickerSelect(attrs={"class": "form-input"}),
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if user is not None:
+            self.fields["client"].queryset = Client.objects.filter(owner=user).order_by("name")
+
+
+class QuoteBulkStatusForm(forms.Form):
+    status = forms.ChoiceField(
+        label="Cambiar estado a",
+        choices=Quote.STATUS_CHOICES,
+        widget=forms.Select(attrs={"class": "form-input"}),
+    )
+
+
+class ItemPickerSelect(forms.Select):
+    """Select that renders only the chosen item; the rest come from ``quotes:item_search``."""
+
+    template_name = "quotes/widgets/item_picker.html"
+    catalog = None
+
+    def optgroups(self, name, value, attrs=None):
+        choices = [("", "---------")]
+        if self.catalog is not None:
+            for pk in value:
+                item = self.catalog.get(pk)
+                if item is not None:
+                    choices.append((item.pk, str(item)))
+        self.choices = choices
+        return super().optgroups(name, value, attrs)
+
+
+class CatalogItemChoiceField(forms.ModelChoiceField):
+    """Item field that resolves its value through the request's shared ItemCatalog.
+
+    Every form of the formset registers its submitted pk on the catalog, so
+    the first field that validates fetches all of them in a single query.
+    """
+
+    catalog = None
+
+    def to_python(self, value):
+        if self.catalog is None or value in self.empty_values:
+            return super().to_python(value)
+        if isinstance(value, Item):
+            value = value.pk
+        item = self.catalog.get(value)
+        if item is None:
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return item
 
 
 class QuoteItemForm(forms.Form):
-    item = forms.ModelChoiceField(queryset=Item.objects.none(), label="Producto")
+    item = CatalogItemChoiceField(
+        queryset=Item.objects.none(), label="Producto", widget=ItemPickerSelect
+    )
     quantity = forms.IntegerField(min_value=1, label="Cantidad")
     unit_price = forms.DecimalField(min_value=0, decimal_places=2, max_digits=10, label="Precio unitario")
 
-    def __init__(self, *args, user=None, **kwargs):
+    def __init__(self, *args, user=None, catalog=None, **kwargs):
         super().__init__(*args, **kwargs)
-        queryset = Item.objects.none()
-        if user is not None:
-            queryset = Item.objects.filter(owner=user).order_by("name")
-        self.fields["item"].queryset = queryset
-        cost_map = {str(item.pk): format(item.cost, "f") for item in queryset}
-        self.fields["item"].widget.attrs.update(
+        if catalog is None and user is not None:
+            catalog = ItemCatalog(user)
+        if catalog is None:
+            return
+        field = self.fields["item"]
+        field.queryset = catalog.queryset
+        field.catalog = catalog
+        field.widget.catalog = catalog
+        field.widget.attrs.update(
             {
-                "data-cost-map": json.dumps(cost_map),
+                "data-item-picker": "",
+                "data-cost-map-url": catalog.cost_map_url,
                 "data-margin": "0.60",
             }
         )
+        catalog.request(self["item"].value())
@@ -0,0 +1,242 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import DatabaseError, transaction
+from django.db.models.functions import Lower
+
+from accounts.versions import QUOTES, bump_data_versions
+from clients.models import Client
+from inventory.ledger import InsufficientStock, lock_stock, record_movements
+from inventory.models import Item
+
+from .models import Quote, QuoteItem
+from .stock import quote_movement
+
+
+# Cotizaciones que se guardan por transacción.
+INGEST_CHUNK_SIZE = 500
+# Máximo de cotizaciones aceptadas por solicitud.
+INGEST_MAX_BATCH = 5000
+# Tamaño máximo del cuerpo JSON de un lote, en bytes (holgado para INGEST_MAX_BATCH).
+INGEST_MAX_BODY_SIZE = 20 * 1024 * 1024
+
+STATUSES = {value for value, _ in Quote.STATUS_CHOICES}
+MAX_UNIT_PRICE = Decimal("99999999.99")
+MAX_TOTAL = Decimal("9999999999.99")
+
+
+def _positive_int(value):
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        return None
+    return value
+
+
+def _price(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        price = Decimal(str(value))
+    except InvalidOperation:
+        return None
+    if not price.is_finite() or price < 0 or price > MAX_UNIT_PRICE:
+        return None
+    if price.as_tuple().exponent < -2:
+        return None
+    return price.quantize(Decimal("0.01"))
+
+
+class _Entry:
+    """One quote of the batch while it is validated and saved."""
+
+    def __init__(self, index, raw):
+        self.index = index
+        self.ref = raw.get("ref") if isinstance(raw, dict) else None
+        self.errors = {}
+        self.client_id = None
+        self.status = Quote.STATUS_DRAFT
+        self.lines = []
+        self.quote = None
+
+    def total(self):
+        return sum((quantity * price for _, quantity, price in self.lines), Decimal("0"))
+
+    def result(self):
+        data = {"index": self.index, "ref": self.ref}
+        if self.quote is not None:
+            data.update(status="created", id=self.quote.pk, total=format(self.quote.total, "f"))
+        else:
+            data.update(status="error", errors=self.errors)
+        return data
+
+
+def _parse(index, raw):
+    entry = _Entry(index, raw)
+    if not isinstance(raw, dict):
+        entry.errors["quote"] = "Cada cotización debe ser un objeto."
+        return entry
+
+    entry.client_id = _positive_int(raw.get("client"))
+    if entry.client_id is None:
+        entry.errors["client"] = "Indica el id numérico del cliente."
+
+    status = raw.get("status", Quote.STATUS_DRAFT)
+    if status not in STATUSES:
+        entry.errors["status"] = f"Estado inválido: {status!r}."
+    else:
+        entry.status = status
+
+    lines = raw.get("lines")
+    if not isinstance(lines, list) or not lines:
+        entry.errors["lines"] = "Agrega al menos un producto."
+        return entry
+
+    line_errors = {}
+    for position, line in enumerate(lines):
+        if not isinstance(line, dict):
+            line_errors[position] = "Cada producto debe ser un objeto."
+            continue
+        item_id = _positive_int(line.get("item"))
+        sku = line.get("sku")
+        if item_id is None and not (isinstance(sku, str) and sku.strip()):
+            line_errors[position] = "Indica el id del producto (item) o su SKU."
+            continue
+        quantity = _positive_int(line.get("quantity"))
+        price = _price(line.get("unit_price"))
+        if quantity is None:
+            line_errors[position] = "La cantidad debe ser un entero mayor que cero."
+        elif price is None:
+            line_errors[position] = "El precio unitario debe ser un número positivo con dos decimales."
+        else:
+            key = ("id", item_id) if item_id is not None else ("sku", sku.strip())
+            entry.lines.append([key, quantity, price])
+    if line_errors:
+        entry.errors["lines"] = line_errors
+    elif entry.total() > MAX_TOTAL:
+        entry.errors["lines"] = "El total de la cotización excede el máximo permitido."
+    return entry
+
+
+def _resolve_ownership(user, entries):
+    """Check clients and items of every entry with one query per kind."""
+
+    client_ids = {entry.client_id for entry in entries}
+    item_ids = {key[1] for entry in entries for key, _, _ in entry.lines if key[0] == "id"}
+    skus = {key[1] for entry in entries for key, _, _ in entry.lines if key[0] == "sku"}
+
+    owned_clients = set(
+        Client.objects.filter(owner=user, pk__in=client_ids).values_list("pk", flat=True)
+    )
+    items = {}
+    if item_ids:
+        items.update(
+            (("id", pk), pk)
+            for pk in Item.objects.filter(owner=user, pk__in=item_ids).values_list("pk", flat=True)
+        )
+    if skus:
+        # Igual que la restricción (owner, Lower(sku)): "sku2" encuentra "SKU2".
+        by_sku = dict(
+            Item.objects.filter(owner=user)
+            .annotate(sku_key=Lower("sku"))
+            .filter(sku_key__in={sku.lower() for sku in skus})
+            .values_list("sku_key", "pk")
+        )
+        items.update(
+            (("sku", sku), by_sku[sku.lower()]) for sku in skus if sku.lower() in by_sku
+        )
+
+    for entry in entries:
+        if entry.client_id not in owned_clients:
+            entry.errors["client"] = "El cliente no existe."
+        missing = {}
+        for position, line in enumerate(entry.lines):
+            key = line[0]
+            if key not in items:
+                missing[position] = f"Producto no encontrado: {key[1]}."
+            else:
+                line[0] = items[key]
+        if missing:
+            entry.errors["lines"] = missing
+
+
+def _units_by_item(entry):
+    units = {}
+    for item_id, quantity, _ in entry.lines:
+        units[item_id] = units.get(item_id, 0) + quantity
+    return units
+
+
+def _check_won_stock(entries):
+    """Lock the items of the won entries and drop those that no longer fit, in order.
+
+    Returns the entries that can be saved and the locked items.
+    """
+
+    won = [entry for entry in entries if entry.status == Quote.STATUS_WON]
+    items = lock_stock({item_id for entry in won for item_id, _, _ in entry.lines})
+    available = {pk: item.stock for pk, item in items.items()}
+    for entry in won:
+        needed = _units_by_item(entry)
+        short = sorted(pk for pk, units in needed.items() if available[pk] < units)
+        if short:
+            entry.errors["stock"] = str(
+                InsufficientStock([(items[pk], needed[pk], available[pk]) for pk in short])
+            )
+            continue
+        for pk, units in needed.items():
+            available[pk] -= units
+    return [entry for entry in entries if not entry.errors], items
+
+
+def _save_chunk(user, entries):
+    with transaction.atomic():
+        entries, items = _check_won_stock(entries)
+        quotes = [
+            Quote(
+                created_by=user,
+                client_id=entry.client_id,
+                status=entry.status,
+                total=entry.total(),
+            )
+            for entry in entries
+        ]
+        Quote.objects.bulk_create(quotes)
+        bump_data_versions([user.pk], QUOTES)
+        QuoteItem.objects.bulk_create(
+            QuoteItem(quote=quote, item_id=item_id, quantity=quantity, unit_price=price)
+            for quote, entry in zip(quotes, entries)
+            for item_id, quantity, price in entry.lines
+        )
+        record_movements(
+            (
+                quote_movement(quote.pk, item_id, -units)
+                for quote, entry in zip(quotes, entries)
+                if entry.status == Quote.STATUS_WON
+                for item_id, units in _units_by_item(entry).items()
+            ),
+            items=items,
+        )
+    for quote, entry in zip(quotes, entries):
+        entry.quote = quote
+
+
+def ingest_quotes(user, payload, chunk_size=INGEST_CHUNK_SIZE):
+    """Validate and store a batch of quotes; return one result per input quote.
+
+    Ownership of clients and items is checked for the whole batch at once,
+    and valid quotes are saved in transactions of ``chunk_size`` so one
+    failing chunk does not discard the rest. Quotes created as won take
+    their stock in the same transaction.
+    """
+
+    entries = [_parse(index, raw) for index, raw in enumerate(payload)]
+    candidates = [entry for entry in entries if not entry.errors]
+    _resolve_ownership(user, candidates)
+
+    valid = [entry for entry in candidates if not entry.errors]
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start : start + chunk_size]
+        try:
+            _save_chunk(user, chunk)
+        except DatabaseError:
+            for entry in chunk:
+                entry.errors["quote"] = "No se pudo guardar la cotización."
+    return [entry.result() for entry in entries]
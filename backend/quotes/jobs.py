@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Quote, QuotePDFJob
+from .pdf import cached_quote_pdf, get_company_profile, is_quote_pdf_cached
+
+
+# Un trabajo "running" más viejo que esto se considera abandonado por un worker caído.
+STALE_JOB_AFTER = timedelta(minutes=5)
+
+
+def enqueue_quote_pdf(quote, fingerprint):
+    """Queue a render of this quote version, reusing any job already queued for it."""
+
+    job, created = QuotePDFJob.objects.get_or_create(quote=quote, fingerprint=fingerprint)
+    if not created and job.status == QuotePDFJob.STATUS_DONE and not is_quote_pdf_cached(
+        quote, fingerprint
+    ):
+        # El archivo se eliminó de la caché; hay que volver a generarlo.
+        job.status = QuotePDFJob.STATUS_PENDING
+        job.save(update_fields=["status", "updated_at"])
+    return job
+
+
+def retry_quote_pdf(job):
+    job.status = QuotePDFJob.STATUS_PENDING
+    job.error = ""
+    job.save(update_fields=["status", "error", "updated_at"])
+    return job
+
+
+def claim_next_job():
+    """Lock the oldest pending job for this worker, or return ``None`` if the queue is empty."""
+
+    stale_before = timezone.now() - STALE_JOB_AFTER
+    with transaction.atomic():
+        job = (
+            QuotePDFJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=QuotePDFJob.STATUS_PENDING)
+                | Q(status=QuotePDFJob.STATUS_RUNNING, updated_at__lt=stale_before)
+            )
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = QuotePDFJob.STATUS_RUNNING
+        job.save(update_fields=["status", "updated_at"])
+    return job
+
+
+def run_job(job):
+    """Render the job's quote into the PDF cache and record the outcome."""
+
+    quote = (
+        Quote.objects.select_related("client", "created_by")
+        .prefetch_related("items__item")
+        .filter(pk=job.quote_id)
+        .first()
+    )
+    if quote is None:
+        job.status = QuotePDFJob.STATUS_FAILED
+        job.error = "La cotización ya no existe."
+    else:
+        try:
+            cached_quote_pdf(quote, get_company_profile(quote.created_by))
+        except Exception as error:
+            job.status = QuotePDFJob.STATUS_FAILED
+            job.error = str(error) or error.__class__.__name__
+        else:
+            job.status = QuotePDFJob.STATUS_DONE
+            job.error = ""
+    job.save(update_fields=["status", "error", "updated_at"])
+    return job
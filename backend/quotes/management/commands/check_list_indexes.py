@@ -0,0 +1,142 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from clients.forms import ClientFilterForm
+from clients.models import Client
+from config.pagination import keyset_queryset
+from inventory.alerts import low_stock_items
+from inventory.forms import ItemFilterForm
+from inventory.models import Item
+from quotes.catalog import ItemCatalog
+from quotes.forms import QuoteFilterForm
+from quotes.models import Quote
+from reports.models import Report
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Siembra datos de prueba en una transacción que se revierte, ejecuta EXPLAIN "
+        "sobre las consultas de los listados y falla si alguna usa un Seq Scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=20000,
+            help="Registros a sembrar por modelo.",
+        )
+        parser.add_argument(
+            "--owners",
+            type=int,
+            default=50,
+            help="Usuarios entre los que se reparten los registros.",
+        )
+
+    def list_querysets(self, user):
+        """The querysets the list views run, keyed by a readable label.
+
+        They are built with the same filter forms, list helpers and keyset
+        page as the views, so the plans match what the views execute.
+        """
+
+        def filtered(form_class, data, queryset, **kwargs):
+            form = form_class(data, **kwargs)
+            if not form.is_valid():
+                raise CommandError(f"Filtro inválido para {form_class.__name__}: {form.errors}")
+            return keyset_queryset(form.filter(queryset))
+
+        clients = Client.objects.filter(owner=user)
+        items = Item.objects.filter(owner=user)
+        quotes = Quote.objects.filter(created_by=user).for_list()
+        client = clients.order_by("pk").first()
+        return {
+            "clientes": keyset_queryset(clients),
+            "clientes (búsqueda)": filtered(ClientFilterForm, {"q": "cliente 12"}, clients),
+            "inventario": keyset_queryset(items),
+            "inventario (búsqueda)": filtered(ItemFilterForm, {"q": "produto 123"}, items),
+            "inventario (stock bajo)": keyset_queryset(low_stock_items(user)),
+            "cotizaciones (buscador de productos)": ItemCatalog(user).search_queryset(
+                "produto 123"
+            ),
+            "cotizaciones": keyset_queryset(quotes),
+            "cotizaciones por estado": filtered(
+                QuoteFilterForm, {"status": Quote.STATUS_WON}, quotes, user=user
+            ),
+            "cotizaciones por cliente": filtered(
+                QuoteFilterForm, {"client": client.pk}, quotes, user=user
+            ),
+            "reportes": Report.objects.filter(created_by=user),
+        }
+
+    def seed(self, rows, owners):
+        user_model = get_user_model()
+        users = user_model.objects.bulk_create(
+            user_model(username=f"explain-seed-{index}") for index in range(owners)
+        )
+        clients = Client.objects.bulk_create(
+            (
+                Client(owner=users[index % owners], name=f"Cliente {index}")
+                for index in range(rows)
+            ),
+            batch_size=2000,
+        )
+        Item.objects.bulk_create(
+            (
+                Item(
+                    owner=users[index % owners],
+                    sku=f"SEED-{index}",
+                    name=f"Producto {index}",
+                    stock=index % 97,
+                )
+                for index in range(rows)
+            ),
+            batch_size=2000,
+        )
+        Quote.objects.bulk_create(
+            (
+                Quote(created_by=users[index % owners], client=clients[index])
+                for index in range(rows)
+            ),
+            batch_size=2000,
+        )
+        Report.objects.bulk_create(
+            (
+                Report(created_by=users[index % owners], name=f"Reporte {index}")
+                for index in range(rows)
+            ),
+            batch_size=2000,
+        )
+        with connection.cursor() as cursor:
+            for model in (Client, Item, Quote, Report):
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+        return users[owners // 2]
+
+    def handle(self, *args, **options):
+        if options["rows"] < 1 or options["owners"] < 1:
+            raise CommandError("--rows y --owners deben ser mayores que cero.")
+
+        failures = []
+        try:
+            with transaction.atomic():
+                user = self.seed(options["rows"], options["owners"])
+                for label, queryset in self.list_querysets(user).items():
+                    plan = queryset.explain()
+                    if options["verbosity"] > 1:
+                        self.stdout.write(f"--- {label}\n{plan}")
+                    if "Seq Scan" in plan:
+                        failures.append(f"{label}:\n{plan}")
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(
+                "Consultas de listado sin índice:\n\n" + "\n\n".join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS("Todos los listados usan índices."))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from quotes.jobs import claim_next_job, run_job
+from quotes.models import QuotePDFJob
+
+
+class Command(BaseCommand):
+    help = "Procesa la cola de PDFs de cotizaciones (modo QUOTE_PDF_ASYNC)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Procesa los trabajos pendientes y termina en lugar de esperar nuevos.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Segundos de espera entre consultas cuando la cola está vacía.",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+                continue
+
+            job = run_job(job)
+            processed += 1
+            if job.status == QuotePDFJob.STATUS_FAILED:
+                self.stderr.write(f"Cotización #{job.quote_id}: {job.error}")
+            elif options["verbosity"] > 1:
+                self.stdout.write(f"Cotización #{job.quote_id}: PDF listo.")
+
+        self.stdout.write(self.style.SUCCESS(f"{processed} PDF(s) procesados."))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quotes", "0002_quote_created_by"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuotePDFJob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("fingerprint", models.CharField(max_length=64)),
+                ("status", models.CharField(choices=[("pending", "En cola"), ("running", "Generando"), ("done", "Listo"), ("failed", "Fallido")], default="pending", max_length=16)),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("quote", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="pdf_jobs", to="quotes.quote")),
+            ],
+            options={
+                "ordering": ("created_at",),
+                "indexes": [models.Index(condition=models.Q(("status__in", ["pending", "running"])), fields=["status", "created_at"], name="quote_pdf_job_queue_idx")],
+                "constraints": [models.UniqueConstraint(fields=("quote", "fingerprint"), name="quote_pdf_job_unique_version")],
+            },
+        ),
+    ]
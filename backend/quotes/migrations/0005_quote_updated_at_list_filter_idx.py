@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clients", "0003_client_owner_created_idx"),
+        ("quotes", "0004_quote_owner_created_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quote",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="quote",
+            index=models.Index(models.F("created_by"), models.F("status"), models.OrderBy(models.F("created_at"), descending=True), models.OrderBy(models.F("id"), descending=True), condition=models.Q(("deleted__isnull", True)), name="quote_owner_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="quote",
+            index=models.Index(models.F("created_by"), models.F("client"), models.OrderBy(models.F("created_at"), descending=True), models.OrderBy(models.F("id"), descending=True), condition=models.Q(("deleted__isnull", True)), name="quote_owner_client_idx"),
+        ),
+    ]
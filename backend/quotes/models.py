@@ -1,9 +1,36 @@
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Coalesce
+from accounts.versions import QUOTES, bump_data_versions
 from clients.models import Client
 from inventory.models import Item
 
+from safedelete.managers import SafeDeleteManager
 from safedelete.models import SafeDeleteModel, SOFT_DELETE
+from safedelete.queryset import SafeDeleteQueryset
+
+
+class QuoteQuerySet(SafeDeleteQueryset):
+    def with_item_count(self):
+        """Annotate ``annotated_item_count`` so ``item_count`` needs no extra query."""
+
+        lines = (
+            QuoteItem.objects.filter(quote=models.OuterRef("pk"))
+            .order_by()
+            .values("quote")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        )
+        return self.annotate(annotated_item_count=Coalesce(models.Subquery(lines), 0))
+
+    def for_list(self):
+        """Only the columns the list rows render, plus the line count."""
+
+        return (
+            self.select_related("client")
+            .only("id", "status", "total", "created_at", "client", "client__name")
+            .with_item_count()
+        )
 
 
 class Quote(SafeDeleteModel):
@@ -29,17 +56,59 @@ class Quote(SafeDeleteModel):
     )
     client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name="quotes")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     status = models.CharField(max_length=32, default=STATUS_DRAFT, choices=STATUS_CHOICES)
 
+    objects = SafeDeleteManager.from_queryset(QuoteQuerySet)()
+
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # Listado paginado por cursor: filtra por usuario y recorre (created_at, id).
+            models.Index(
+                models.F("created_by"),
+                models.F("created_at").desc(),
+                models.F("id").desc(),
+                name="quote_owner_created_idx",
+                condition=models.Q(deleted__isnull=True),
+            ),
+            # Filtros más comunes del listado: por estado y por cliente.
+            models.Index(
+                models.F("created_by"),
+                models.F("status"),
+                models.F("created_at").desc(),
+                models.F("id").desc(),
+                name="quote_owner_status_idx",
+                condition=models.Q(deleted__isnull=True),
+            ),
+            models.Index(
+                models.F("created_by"),
+                models.F("client"),
+                models.F("created_at").desc(),
+                models.F("id").desc(),
+                name="quote_owner_client_idx",
+                condition=models.Q(deleted__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return f"Quote #{self.id} - {self.client}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_data_versions([self.created_by_id], QUOTES)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_data_versions([self.created_by_id], QUOTES)
+        return result
+
     @property
     def item_count(self) -> int:
+        annotated = getattr(self, "annotated_item_count", None)
+        if annotated is not None:
+            return annotated
         return self.items.count()
 
 
@@ -58,3 +127,43 @@ class QuoteItem(models.Model):
     @property
     def subtotal(self):
         return self.quantity * self.unit_price
+
+
+class QuotePDFJob(models.Model):
+    """Queued render of one version (fingerprint) of a quote PDF."""
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "En cola"),
+        (STATUS_RUNNING, "Generando"),
+        (STATUS_DONE, "Listo"),
+        (STATUS_FAILED, "Fallido"),
+    ]
+
+    quote = models.ForeignKey(Quote, on_delete=models.CASCADE, related_name="pdf_jobs")
+    fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=16, default=STATUS_PENDING, choices=STATUS_CHOICES)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("created_at",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["quote", "fingerprint"], name="quote_pdf_job_unique_version"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["status", "created_at"],
+                name="quote_pdf_job_queue_idx",
+                condition=models.Q(status__in=["pending", "running"]),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"PDF de la cotización #{self.quote_id} ({self.get_status_display()})"
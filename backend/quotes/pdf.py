@@ -0,0 +1,401 @@
+import hashlib
+import json
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, storages
+from django.utils import timezone
+from django.utils.formats import date_format
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from accounts.logos import refresh_header_logo
+from accounts.models import CompanyProfile
+
+
+# Súbelo cuando cambie el diseño del PDF para descartar las copias en caché.
+PDF_LAYOUT_VERSION = 1
+
+# Logos ya leídos del almacenamiento, por (perfil, updated_at).
+HEADER_LOGO_CACHE_SIZE = 32
+_header_logo_cache = {}
+
+
+def get_company_profile(user):
+    """Return the user's CompanyProfile or ``None`` if it was never filled."""
+
+    if user is None:
+        return None
+    try:
+        profile = user.company_profile
+    except CompanyProfile.DoesNotExist:
+        return None
+    if profile.logo and not profile.header_logo:
+        # Perfiles guardados antes de que existiera el logo preprocesado.
+        refresh_header_logo(profile)
+    return profile
+
+
+def load_header_logo(company_profile):
+    """Return ``(png_bytes, width, height)`` for the header logo, or ``None``.
+
+    Reads the pre-sized copy once per profile version and keeps it in memory.
+    """
+
+    if not (
+        company_profile.logo
+        and company_profile.header_logo
+        and company_profile.header_logo_width
+        and company_profile.header_logo_height
+    ):
+        return None
+
+    key = (company_profile.pk, company_profile.updated_at)
+    cached = _header_logo_cache.get(key)
+    if cached is None:
+        try:
+            with company_profile.header_logo.open("rb") as logo_file:
+                logo_bytes = logo_file.read()
+        except OSError:
+            return None
+        cached = (logo_bytes, company_profile.header_logo_width, company_profile.header_logo_height)
+        if len(_header_logo_cache) >= HEADER_LOGO_CACHE_SIZE:
+            _header_logo_cache.pop(next(iter(_header_logo_cache)))
+        _header_logo_cache[key] = cached
+    return cached
+
+
+def render_quote_pdf(quote, company_profile=None) -> bytes:
+    """Build the quote document with ReportLab and return the PDF bytes.
+
+    ``quote`` is expected to come with ``client``, ``created_by`` and
+    ``items__item`` already loaded.
+    """
+
+    buffer = BytesIO()
+    document = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        leftMargin=0.9 * inch,
+        rightMargin=0.9 * inch,
+        topMargin=0.9 * inch,
+        bottomMargin=0.8 * inch,
+        title=f"Cotización #{quote.pk}",
+    )
+
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        "QuoteTitle",
+        parent=styles["Heading1"],
+        fontName="Helvetica-Bold",
+        fontSize=18,
+        textColor=colors.HexColor("#0f172a"),
+        spaceAfter=12,
+    )
+    normal_style = ParagraphStyle(
+        "QuoteBody",
+        parent=styles["BodyText"],
+        fontName="Helvetica",
+        fontSize=11,
+        leading=14,
+        textColor=colors.HexColor("#1f2937"),
+    )
+    small_style = ParagraphStyle(
+        "QuoteSmall",
+        parent=normal_style,
+        fontSize=9,
+        leading=12,
+        textColor=colors.HexColor("#475569"),
+        spaceBefore=12,
+    )
+    company_name_style = ParagraphStyle(
+        "CompanyName",
+        parent=normal_style,
+        fontName="Helvetica-Bold",
+        fontSize=13,
+        leading=16,
+        textColor=colors.HexColor("#0f172a"),
+    )
+    company_detail_style = ParagraphStyle(
+        "CompanyDetail",
+        parent=normal_style,
+        fontSize=10,
+        leading=13,
+        textColor=colors.HexColor("#1f2937"),
+    )
+
+    issued_by = "N/A"
+    if quote.created_by:
+        issued_by = quote.created_by.get_full_name() or quote.created_by.get_username()
+
+    company_logo = None
+    header_logo = load_header_logo(company_profile) if company_profile else None
+    if header_logo:
+        logo_bytes, logo_width, logo_height = header_logo
+        max_logo_size = 1.6 * inch
+        scale = min(max_logo_size / logo_width, max_logo_size / logo_height, 1)
+        company_logo = Image(
+            BytesIO(logo_bytes),
+            width=logo_width * scale,
+            height=logo_height * scale,
+        )
+        company_logo.hAlign = "LEFT"
+
+    header_elements = []
+    if company_profile or company_logo:
+        display_name = (company_profile.legal_name if company_profile and company_profile.legal_name else issued_by)
+        detail_lines = []
+        if company_profile:
+            if company_profile.tax_id:
+                detail_lines.append(f"<b>RFC:</b> {company_profile.tax_id}")
+            contact_email = company_profile.contact_email or quote.created_by.email
+            if contact_email:
+                detail_lines.append(f"<b>Correo:</b> {contact_email}")
+            if company_profile.contact_phone:
+                detail_lines.append(f"<b>Teléfono:</b> {company_profile.contact_phone}")
+            if company_profile.tax_address:
+                tax_address = company_profile.tax_address.replace("\n", "<br/>")
+                detail_lines.append(f"<b>Domicilio fiscal:</b> {tax_address}")
+
+        text_flowables = [Paragraph(display_name, company_name_style)]
+        if detail_lines:
+            text_flowables.append(
+                Paragraph("<br/>".join(detail_lines), company_detail_style)
+            )
+
+        if company_logo:
+            header_table = Table(
+                [[company_logo, text_flowables]],
+                colWidths=[1.7 * inch, document.width - 1.7 * inch],
+                hAlign="LEFT",
+            )
+            header_table.setStyle(
+                TableStyle(
+                    [
+                        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                        ("LEFTPADDING", (0, 0), (-1, -1), 0),
+                        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+                        ("TOPPADDING", (0, 0), (-1, -1), 0),
+                        ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
+                    ]
+                )
+            )
+            header_elements.append(header_table)
+        else:
+            header_elements.extend(text_flowables)
+
+        header_elements.append(Spacer(1, 0.25 * inch))
+
+    issued_at = timezone.localtime(quote.created_at)
+    issued_at_display = "{} {}".format(
+        date_format(issued_at, "DATE_FORMAT", use_l10n=True),
+        date_format(issued_at, "TIME_FORMAT", use_l10n=True),
+    ).strip()
+
+    metadata = [
+        ["Folio", f"#{quote.pk}", "Fecha", issued_at_display],
+        ["Cliente", quote.client.name, "Correo", quote.client.email or "—"],
+        ["Generada por", issued_by, "Estado", quote.get_status_display()],
+    ]
+
+    metadata_table = Table(
+        metadata,
+        colWidths=[document.width * 0.18, document.width * 0.32] * 2,
+        hAlign="LEFT",
+    )
+    metadata_style = [
+        ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.HexColor("#f8fafc"), colors.white]),
+        ("BOX", (0, 0), (-1, -1), 0.75, colors.HexColor("#cbd5f5")),
+        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#dbeafe")),
+        ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("FONTNAME", (2, 0), (2, -1), "Helvetica-Bold"),
+        ("TEXTCOLOR", (0, 0), (-1, -1), colors.HexColor("#1f2937")),
+        ("ALIGN", (1, 0), (-1, -1), "LEFT"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 8),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 8),
+        ("TOPPADDING", (0, 0), (-1, -1), 6),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ]
+    metadata_table.setStyle(TableStyle(metadata_style))
+
+    item_rows = [
+        ["Concepto", "Cantidad", "Precio unitario", "Subtotal"],
+    ]
+    for item in quote.items.all():
+        item_rows.append(
+            [
+                str(item.item),
+                str(item.quantity),
+                f"${item.unit_price:.2f}",
+                f"${item.subtotal:.2f}",
+            ]
+        )
+
+    if len(item_rows) == 1:
+        item_rows.append(["Sin conceptos", "—", "—", "—"])
+
+    items_table = Table(
+        item_rows,
+        colWidths=[document.width * 0.42, document.width * 0.16, document.width * 0.2, document.width * 0.22],
+        hAlign="LEFT",
+    )
+    items_table.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1d4ed8")),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+                ("ALIGN", (1, 1), (-2, -1), "CENTER"),
+                ("ALIGN", (-1, 1), (-1, -1), "RIGHT"),
+                ("LEFTPADDING", (0, 0), (-1, -1), 8),
+                ("RIGHTPADDING", (0, 0), (-1, -1), 8),
+                ("TOPPADDING", (0, 0), (-1, 0), 10),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 10),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#94a3b8")),
+                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f8fafc")]),
+            ]
+        )
+    )
+
+    total_table = Table(
+        [["Total", f"${quote.total:.2f}"]],
+        colWidths=[document.width * 0.78, document.width * 0.22],
+        hAlign="LEFT",
+    )
+    total_table.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#f1f5f9")),
+                ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
+                ("TEXTCOLOR", (0, 0), (-1, -1), colors.HexColor("#0f172a")),
+                ("ALIGN", (1, 0), (1, 0), "RIGHT"),
+                ("LEFTPADDING", (0, 0), (-1, -1), 10),
+                ("RIGHTPADDING", (0, 0), (-1, -1), 10),
+                ("TOPPADDING", (0, 0), (-1, -1), 8),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+            ]
+        )
+    )
+
+    footer = Paragraph(
+        "Esta cotización fue generada con CoreQuote. Gracias por su preferencia.",
+        small_style,
+    )
+
+    document.build(
+        [
+            *header_elements,
+            Paragraph("Cotización", title_style),
+            Paragraph("Resumen de la cotización", normal_style),
+            Spacer(1, 0.15 * inch),
+            metadata_table,
+            Spacer(1, 0.3 * inch),
+            items_table,
+            Spacer(1, 0.2 * inch),
+            total_table,
+            footer,
+        ]
+    )
+
+    return buffer.getvalue()
+
+
+def quote_pdf_fingerprint(quote, company_profile=None) -> str:
+    """Digest of every input that shows up in the rendered PDF."""
+
+    created_by = quote.created_by
+    payload = {
+        "layout": PDF_LAYOUT_VERSION,
+        "time_zone": settings.TIME_ZONE,
+        "quote": [quote.pk, quote.status, str(quote.total), quote.created_at.isoformat()],
+        "client": [quote.client_id, quote.client.name, quote.client.email],
+        "created_by": (
+            [created_by.get_full_name(), created_by.get_username(), created_by.email]
+            if created_by
+            else None
+        ),
+        "items": [
+            [line.item_id, str(line.item), line.quantity, str(line.unit_price)]
+            for line in quote.items.all()
+        ],
+        "company": (
+            [
+                company_profile.legal_name,
+                company_profile.tax_id,
+                company_profile.tax_address,
+                company_profile.contact_email,
+                company_profile.contact_phone,
+                company_profile.logo.name,
+                company_profile.updated_at.isoformat(),
+            ]
+            if company_profile
+            else None
+        ),
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def pdf_cache_storage():
+    """Storage for rendered PDFs: a ``STORAGES`` alias or a local folder."""
+
+    alias = settings.QUOTE_PDF_CACHE_STORAGE
+    if alias:
+        return storages[alias]
+    return FileSystemStorage(location=Path(settings.QUOTE_PDF_CACHE_ROOT))
+
+
+def _cache_name(quote, fingerprint):
+    return f"{quote.pk}/{fingerprint}.pdf"
+
+
+def is_quote_pdf_cached(quote, fingerprint) -> bool:
+    return pdf_cache_storage().exists(_cache_name(quote, fingerprint))
+
+
+def read_cached_quote_pdf(quote, fingerprint):
+    """Return the cached PDF bytes for this quote version, or ``None``."""
+
+    storage = pdf_cache_storage()
+    name = _cache_name(quote, fingerprint)
+    if not storage.exists(name):
+        return None
+    with storage.open(name, "rb") as cached:
+        return cached.read()
+
+
+def store_quote_pdf(quote, fingerprint, content):
+    """Save a rendered PDF, dropping the older versions of the same quote."""
+
+    storage = pdf_cache_storage()
+    folder = str(quote.pk)
+    if storage.exists(folder):
+        for stale in storage.listdir(folder)[1]:
+            storage.delete(f"{folder}/{stale}")
+    storage.save(_cache_name(quote, fingerprint), ContentFile(content))
+
+
+def cached_quote_pdf(quote, company_profile=None, fingerprint=None) -> bytes:
+    """Return the PDF bytes for ``quote``, rendering them only on a cache miss.
+
+    Entries are keyed by the fingerprint, so any change to the quote, its
+    lines, the client or the company profile produces a new entry; older
+    entries of the same quote are removed when the new one is stored.
+    """
+
+    if fingerprint is None:
+        fingerprint = quote_pdf_fingerprint(quote, company_profile)
+    content = read_cached_quote_pdf(quote, fingerprint)
+    if content is None:
+        content = render_quote_pdf(quote, company_profile)
+        store_quote_pdf(quote, fingerprint, content)
+    return content
@@ -0,0 +1,22 @@
+"""Entry points of the PDF export process pool.
+
+Spawned processes import this module before Django is set up, so models
+and anything that imports them are only loaded inside the functions.
+"""
+
+
+def setup():
+    import django
+
+    django.setup()
+
+
+def render(quote, company_profile, header_logo):
+    """Render a pickled, fully loaded quote without touching the database."""
+
+    from . import pdf
+
+    if header_logo is not None:
+        key = (company_profile.pk, company_profile.updated_at)
+        pdf._header_logo_cache[key] = header_logo
+    return pdf.render_quote_pdf(quote, company_profile)
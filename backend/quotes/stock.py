@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from accounts.versions import QUOTES, bump_data_versions
+from inventory.ledger import record_movements
+from inventory.models import StockMovement
+
+from .models import Quote, QuoteItem
+
+
+def reserved_lines(quote_ids) -> list:
+    """``(quote_id, item_id, units)`` held by the lines of ``quote_ids`` (one query)."""
+
+    quote_ids = [pk for pk in quote_ids if pk is not None]
+    if not quote_ids:
+        return []
+    return list(
+        QuoteItem.objects.filter(quote_id__in=quote_ids)
+        .order_by("quote_id", "item_id")
+        .values("quote_id", "item_id")
+        .annotate(units=Sum("quantity"))
+        .values_list("quote_id", "item_id", "units")
+    )
+
+
+def quote_movement(quote_id, item_id, quantity):
+    """Ledger entry for stock a quote takes (negative) or gives back (positive)."""
+
+    return StockMovement(
+        item_id=item_id,
+        quantity=quantity,
+        kind=StockMovement.KIND_SALE if quantity < 0 else StockMovement.KIND_RETURN,
+        reference=f"Cotización #{quote_id}",
+    )
+
+
+@contextmanager
+def tracking_stock(quote):
+    """Reconcile stock with whatever the block does to ``quote`` and its lines.
+
+    The quote row is locked first, whatever its status, and ``was_won`` is
+    read from the locked row, so concurrent edits queue and each one sees
+    the status the previous one committed. What it held while won is given
+    back and what it holds afterwards (if it is won) is taken; only the
+    difference per item reaches the ledger.
+    """
+
+    with transaction.atomic():
+        locked_status = None
+        if quote.pk is not None:
+            locked_status = (
+                Quote.objects.select_for_update()
+                .filter(pk=quote.pk)
+                .values_list("status", flat=True)
+                .first()
+            )
+        was_won = locked_status == Quote.STATUS_WON
+        changes = {}
+        if was_won:
+            for _, item_id, units in reserved_lines([quote.pk]):
+                changes[item_id] = units
+        yield
+        if quote.status == Quote.STATUS_WON:
+            for _, item_id, units in reserved_lines([quote.pk]):
+                changes[item_id] = changes.get(item_id, 0) - units
+        record_movements(
+            quote_movement(quote.pk, item_id, delta) for item_id, delta in sorted(changes.items())
+        )
+
+
+def set_quotes_status(quotes, status) -> int:
+    """Move ``quotes`` to ``status``, reserving or restoring stock on won transitions.
+
+    Returns how many quotes changed. Nothing changes if any item falls short.
+    """
+
+    with transaction.atomic():
+        rows = list(
+            quotes.exclude(status=status)
+            .select_for_update()
+            .order_by("pk")
+            .values_list("pk", "status", "created_by")
+        )
+        if not rows:
+            return 0
+        changing = {pk: previous for pk, previous, _ in rows}
+        if status == Quote.STATUS_WON:
+            record_movements(
+                quote_movement(quote_id, item_id, -units)
+                for quote_id, item_id, units in reserved_lines(changing)
+            )
+        else:
+            won = [pk for pk, previous in changing.items() if previous == Quote.STATUS_WON]
+            record_movements(
+                quote_movement(quote_id, item_id, units)
+                for quote_id, item_id, units in reserved_lines(won)
+            )
+        bump_data_versions((owner for _, _, owner in rows), QUOTES)
+        return quotes.filter(pk__in=changing).update(
+            status=status, updated_at=timezone.now()
+        )
+
+
+def release_quotes_stock(quotes):
+    """Give back the stock held by the won quotes in ``quotes``, e.g. before deleting them."""
+
+    with transaction.atomic():
+        won = list(
+            quotes.filter(status=Quote.STATUS_WON)
+            .select_for_update()
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        record_movements(
+            quote_movement(quote_id, item_id, units)
+            for quote_id, item_id, units in reserved_lines(won)
+        )
@@ -1,15 +1,38 @@
+import csv
+import json
 import shutil
 import tempfile
+import threading
+import zipfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+from xml.etree import ElementTree
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+
+from PIL import Image as PILImage
 
 from clients.models import Client
-from inventory.models import Item
-from accounts.models import CompanyProfile
-from .models import Quote, QuoteItem
+from config.pagination import keyset_page
+from inventory.ledger import InsufficientStock
+from inventory.models import Item, StockMovement
+from accounts.models import ApiToken, CompanyProfile
+from .catalog import ItemCatalog
+from .duplication import duplicate_quote
+from .forms import QuoteForm, QuoteItemForm
+from .models import Quote, QuoteItem, QuotePDFJob
+from .pdf import render_quote_pdf
+from .stock import set_quotes_status, tracking_stock
+from .views import QuoteItemFormSet
 
 
 class QuotePDFViewTests(TestCase):
@@ -17,7 +40,10 @@ class QuotePDFViewTests(TestCase):
     def setUpClass(cls):
         super().setUpClass()
         cls._temp_media = tempfile.mkdtemp()
-        cls._override = override_settings(MEDIA_ROOT=cls._temp_media)
+        cls._override = override_settings(
+            MEDIA_ROOT=cls._temp_media,
+            QUOTE_PDF_CACHE_ROOT=f"{cls._temp_media}/pdf-cache",
+        )
         cls._override.enable()
 
     @classmethod
@@ -78,6 +104,135 @@ class QuotePDFViewTests(TestCase):
         self.assertIn(b"ACME Facturaci\xc3\xb3n", response.content)
         self.assertIn(b"ACM010101AA1", response.content)
 
+    def test_pdf_backfills_and_reuses_header_logo(self):
+        buffer = BytesIO()
+        PILImage.new("RGB", (1200, 600), "#0f172a").save(buffer, format="PNG")
+        profile = CompanyProfile.objects.create(
+            user=self.user,
+            legal_name="ACME",
+            logo=SimpleUploadedFile("logo.png", buffer.getvalue(), content_type="image/png"),
+        )
+        self.assertFalse(profile.header_logo)
+
+        self.client.get(reverse("quotes:pdf", args=[self.quote.pk]))
+
+        profile.refresh_from_db()
+        self.assertEqual((profile.header_logo_width, profile.header_logo_height), (480, 240))
+        with mock.patch("quotes.pdf._header_logo_cache", {}) as logo_cache:
+            render_quote_pdf(self.quote, profile)
+            with mock.patch.object(type(profile.header_logo), "open") as open_logo:
+                render_quote_pdf(self.quote, profile)
+        open_logo.assert_not_called()
+        self.assertEqual(len(logo_cache), 1)
+
+    def test_pdf_served_from_cache_on_repeat_download(self):
+        url = reverse("quotes:pdf", args=[self.quote.pk])
+        with mock.patch("quotes.pdf.render_quote_pdf", wraps=render_quote_pdf) as render:
+            first = self.client.get(url)
+            second = self.client.get(url)
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_pdf_honours_if_none_match(self):
+        url = reverse("quotes:pdf", args=[self.quote.pk])
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_pdf_cache_invalidated_when_lines_change(self):
+        url = reverse("quotes:pdf", args=[self.quote.pk])
+        etag = self.client.get(url)["ETag"]
+
+        self.quote.items.update(quantity=3)
+        with mock.patch("quotes.pdf.render_quote_pdf", wraps=render_quote_pdf) as render:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(render.call_count, 1)
+
+    def _export(self, **params):
+        response = self.client.get(reverse("quotes:export"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        return zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+
+    @override_settings(QUOTE_PDF_EXPORT_WORKERS=1)
+    def test_export_streams_zip_of_filtered_quotes(self):
+        won = Quote.objects.create(
+            created_by=self.user, client=self.client_obj, status=Quote.STATUS_WON, total=10
+        )
+        QuoteItem.objects.create(quote=won, item=self.item, quantity=1, unit_price=10)
+
+        archive = self._export(status=Quote.STATUS_WON)
+
+        self.assertEqual(archive.namelist(), [f"cotizacion-{won.pk}.pdf"])
+        single = self.client.get(reverse("quotes:pdf", args=[won.pk]))
+        self.assertEqual(archive.read(f"cotizacion-{won.pk}.pdf"), single.content)
+
+    @override_settings(QUOTE_PDF_EXPORT_WORKERS=2)
+    def test_export_renders_misses_in_worker_processes(self):
+        second = Quote.objects.create(created_by=self.user, client=self.client_obj, total=50)
+        QuoteItem.objects.create(quote=second, item=self.item, quantity=1, unit_price=50)
+
+        archive = self._export()
+
+        self.assertEqual(
+            sorted(archive.namelist()),
+            sorted(f"cotizacion-{pk}.pdf" for pk in (self.quote.pk, second.pk)),
+        )
+        for name in archive.namelist():
+            self.assertTrue(archive.read(name).startswith(b"%PDF"))
+        with mock.patch("quotes.pdf.render_quote_pdf") as render:
+            self.client.get(reverse("quotes:pdf", args=[second.pk]))
+        render.assert_not_called()
+
+    def test_export_rejects_inverted_date_range(self):
+        response = self.client.get(
+            reverse("quotes:export"), {"date_from": "2024-02-01", "date_to": "2024-01-01"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertContains(response, "La fecha inicial", status_code=400)
+
+    @override_settings(QUOTE_PDF_ASYNC=True)
+    def test_async_mode_coalesces_requests_into_one_job(self):
+        url = reverse("quotes:pdf", args=[self.quote.pk])
+        with mock.patch("quotes.pdf.render_quote_pdf") as render:
+            first = self.client.get(url)
+            second = self.client.get(url)
+
+        render.assert_not_called()
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(first.json()["job"], second.json()["job"])
+        self.assertEqual(QuotePDFJob.objects.filter(quote=self.quote).count(), 1)
+
+        status = self.client.get(first.json()["poll_url"], HTTP_HX_REQUEST="true")
+        self.assertContains(status, "data-poll")
+
+    @override_settings(QUOTE_PDF_ASYNC=True)
+    def test_async_worker_renders_queued_pdf(self):
+        job_url = reverse("quotes:pdf_job", args=[self.quote.pk])
+        self.client.get(job_url, HTTP_HX_REQUEST="true")
+
+        call_command("render_quote_pdfs", "--once", stdout=StringIO())
+
+        job = QuotePDFJob.objects.get(quote=self.quote)
+        self.assertEqual(job.status, QuotePDFJob.STATUS_DONE)
+        status = self.client.get(job_url, HTTP_HX_REQUEST="true")
+        self.assertContains(status, "Descargar PDF")
+        self.assertNotContains(status, "data-poll")
+
+        with mock.patch("quotes.pdf.render_quote_pdf") as render:
+            response = self.client.get(reverse("quotes:pdf", args=[self.quote.pk]))
+        render.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b"%PDF"))
+
     def test_pdf_not_accessible_for_other_users(self):
         user_model = get_user_model()
         other_user = user_model.objects.create_user(
@@ -93,3 +248,992 @@ class QuotePDFViewTests(TestCase):
         response = self.client.get(reverse("quotes:pdf", args=[other_quote.pk]))
 
         self.assertEqual(response.status_code, 404)
+
+
+class QuoteItemCatalogTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="catalog", email="catalog@example.com", password="pass1234"
+        )
+        self.client.force_login(self.user)
+        self.client_obj = Client.objects.create(owner=self.user, name="Acme Corp")
+        self.items = [
+            Item.objects.create(
+                owner=self.user, sku=f"SKU-{index}", name=f"Producto {index}", stock=5, cost=index + 1
+            )
+            for index in range(20)
+        ]
+
+    def _quote_with_lines(self, lines):
+        quote = Quote.objects.create(client=self.client_obj, created_by=self.user)
+        for item in self.items[:lines]:
+            QuoteItem.objects.create(quote=quote, item=item, quantity=1, unit_price=10)
+        return quote
+
+    def _edit_form_queries(self, quote):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("quotes:edit", args=[quote.pk]), HTTP_HX_REQUEST="true"
+            )
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_catalog_returns_cost_map_with_etag(self):
+        other_user = get_user_model().objects.create_user(username="other", password="pass5678")
+        foreign = Item.objects.create(owner=other_user, sku="X", name="Ajeno", cost=99)
+
+        response = self.client.get(reverse("quotes:catalog"))
+
+        self.assertEqual(response.status_code, 200)
+        cost_map = response.json()
+        self.assertEqual(cost_map[str(self.items[0].pk)], "1.00")
+        self.assertNotIn(str(foreign.pk), cost_map)
+        self.assertTrue(response.has_header("ETag"))
+
+        cached = self.client.get(
+            reverse("quotes:catalog"), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(cached.status_code, 304)
+
+    def test_catalog_etag_changes_when_an_item_changes(self):
+        etag = self.client.get(reverse("quotes:catalog"))["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.items[0].cost = 50
+            self.items[0].save()
+
+        response = self.client.get(reverse("quotes:catalog"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[str(self.items[0].pk)], "50.00")
+
+    def test_edit_form_does_not_repeat_catalog_per_line(self):
+        _, short_queries = self._edit_form_queries(self._quote_with_lines(1))
+        response, long_queries = self._edit_form_queries(self._quote_with_lines(10))
+
+        self.assertEqual(short_queries, long_queries)
+        self.assertNotContains(response, "data-cost-map=")
+        self.assertContains(response, reverse("quotes:catalog"))
+
+
+class QuoteItemPickerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="picker", email="picker@example.com", password="pass1234"
+        )
+        self.client.force_login(self.user)
+        self.client_obj = Client.objects.create(owner=self.user, name="Acme Corp")
+        self.tornillo = Item.objects.create(owner=self.user, sku="TOR-01", name="Tornillo", cost=1)
+        self.tuerca = Item.objects.create(owner=self.user, sku="TUE-01", name="Tuerca de tornillo", cost=2)
+        self.clavo = Item.objects.create(owner=self.user, sku="CLA-01", name="Clavo", cost=3)
+
+    def _search(self, **params):
+        response = self.client.get(reverse("quotes:item_search"), params)
+        self.assertEqual(response.status_code, 200)
+        return [result["id"] for result in response.json()["results"]]
+
+    def test_search_matches_sku_prefix_and_name_substring(self):
+        self.assertEqual(self._search(q="tor"), [self.tornillo.pk, self.tuerca.pk])
+        self.assertEqual(self._search(q="cla"), [self.clavo.pk])
+        self.assertEqual(self._search(q="01"), [])
+
+    def test_search_is_scoped_to_owner_and_skips_deleted_items(self):
+        other_user = get_user_model().objects.create_user(username="other", password="pass5678")
+        Item.objects.create(owner=other_user, sku="TOR-99", name="Tornillo ajeno")
+        self.tuerca.delete()
+
+        self.assertEqual(self._search(q="tor"), [self.tornillo.pk])
+
+    def test_search_matches_short_and_mid_word_fragments(self):
+        self.assertEqual(self._search(q="orni"), [self.tornillo.pk, self.tuerca.pk])
+        self.assertEqual(self._search(q="av"), [self.clavo.pk])
+        self.assertEqual(self._search(q="tornilo"), [])
+
+    def test_search_reads_the_version_without_aggregating_items(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._search(q="tor")
+        with CaptureQueriesContext(connection) as cached:
+            self._search(q="tor")
+
+        self.assertEqual(len(queries) - len(cached), 1)
+        self.assertFalse([query for query in cached if Item._meta.db_table in query["sql"]])
+
+    def test_search_respects_limit(self):
+        self.assertEqual(len(self._search(q="", limit=2)), 2)
+
+    def test_item_field_renders_only_selected_option(self):
+        quote = Quote.objects.create(client=self.client_obj, created_by=self.user)
+        QuoteItem.objects.create(quote=quote, item=self.clavo, quantity=1, unit_price=5)
+
+        response = self.client.get(
+            reverse("quotes:edit", args=[quote.pk]), HTTP_HX_REQUEST="true"
+        )
+
+        self.assertContains(response, str(self.clavo))
+        self.assertNotContains(response, str(self.tornillo))
+        self.assertContains(response, f'data-picker-url="{reverse("quotes:item_search")}"')
+        self.assertContains(response, 'data-picker-label="{sku} - {name}"')
+
+    def test_form_rejects_items_from_other_owners(self):
+        other_user = get_user_model().objects.create_user(username="other", password="pass5678")
+        foreign = Item.objects.create(owner=other_user, sku="AJ-1", name="Ajeno")
+
+        form = QuoteItemForm(
+            data={"item": foreign.pk, "quantity": 1, "unit_price": "1.00"}, user=self.user
+        )
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("item", form.errors)
+
+
+class QuoteItemBatchValidationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="batch", email="batch@example.com", password="pass1234"
+        )
+        self.client.force_login(self.user)
+        self.client_obj = Client.objects.create(owner=self.user, name="Acme Corp")
+        self.items = [
+            Item.objects.create(owner=self.user, sku=f"B-{index}", name=f"Producto {index}")
+            for index in range(12)
+        ]
+
+    def _formset_data(self, item_pks):
+        data = {
+            "items-TOTAL_FORMS": str(len(item_pks)),
+            "items-INITIAL_FORMS": "0",
+            "items-MIN_NUM_FORMS": "1",
+            "items-MAX_NUM_FORMS": "1000",
+        }
+        for index, pk in enumerate(item_pks):
+            data[f"items-{index}-item"] = str(pk)
+            data[f"items-{index}-quantity"] = "1"
+            data[f"items-{index}-unit_price"] = "10.00"
+        return data
+
+    def _validate(self, item_pks):
+        formset = QuoteItemFormSet(
+            self._formset_data(item_pks),
+            prefix="items",
+            form_kwargs={"user": self.user, "catalog": ItemCatalog(self.user)},
+        )
+        formset.forms  # Construir los formularios fuera de la medición.
+        with CaptureQueriesContext(connection) as queries:
+            is_valid = formset.is_valid()
+        item_table = Item._meta.db_table
+        item_queries = [query for query in queries if item_table in query["sql"]]
+        return formset, is_valid, item_queries
+
+    def test_all_items_resolved_in_one_query(self):
+        formset, is_valid, item_queries = self._validate([item.pk for item in self.items])
+
+        self.assertTrue(is_valid)
+        self.assertEqual(len(item_queries), 1)
+        self.assertEqual(
+            [form.cleaned_data["item"] for form in formset], self.items
+        )
+
+    def test_unknown_and_foreign_items_reported_per_row(self):
+        other_user = get_user_model().objects.create_user(username="other", password="pass5678")
+        foreign = Item.objects.create(owner=other_user, sku="AJ-1", name="Ajeno")
+
+        formset, is_valid, item_queries = self._validate(
+            [self.items[0].pk, foreign.pk, 999999, "abc"]
+        )
+
+        self.assertFalse(is_valid)
+        self.assertEqual(len(item_queries), 1)
+        self.assertNotIn("item", formset.forms[0].errors)
+        message = QuoteItemForm.base_fields["item"].error_messages["invalid_choice"]
+        for form, value in zip(formset.forms[1:], [foreign.pk, 999999, "abc"]):
+            self.assertEqual(form.errors["item"], [message % {"value": value}])
+
+
+class QuoteLinePersistenceTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="bulk", email="bulk@example.com", password="pass1234"
+        )
+        self.client.force_login(self.user)
+        self.client_obj = Client.objects.create(owner=self.user, name="Acme Corp")
+        self.items = [
+            Item.objects.create(owner=self.user, sku=f"P-{index}", name=f"Producto {index}")
+            for index in range(25)
+        ]
+
+    def _payload(self, lines):
+        data = {
+            "client": self.client_obj.pk,
+            "status": Quote.STATUS_DRAFT,
+            "items-TOTAL_FORMS": str(len(lines)),
+            "items-INITIAL_FORMS": "0",
+            "items-MIN_NUM_FORMS": "1",
+            "items-MAX_NUM_FORMS": "1000",
+        }
+        for index, (item, quantity, unit_price) in enumerate(lines):
+            data[f"items-{index}-item"] = str(item.pk)
+            data[f"items-{index}-quantity"] = str(quantity)
+            data[f"items-{index}-unit_price"] = unit_price
+        return data
+
+    def _lines(self, count, unit_price="10.00"):
+        return [(item, 2, unit_price) for item in self.items[:count]]
+
+    def _post(self, url, lines):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, self._payload(lines))
+        self.assertEqual(response.status_code, 302)
+        return len(queries)
+
+    def test_create_query_count_is_constant(self):
+        short = self._post(reverse("quotes:create"), self._lines(2))
+        long = self._post(reverse("quotes:create"), self._lines(20))
+
+        self.assertEqual(short, long)
+        quote = Quote.objects.filter(created_by=self.user).latest("id")
+        self.assertEqual(quote.items.count(), 20)
+        self.assertEqual(quote.total, 400)
+
+    def test_edit_query_count_is_constant(self):
+        small = Quote.objects.create(client=self.client_obj, created_by=self.user)
+        large = Quote.objects.create(client=self.client_obj, created_by=self.user)
+        self._post(reverse("quotes:edit", args=[small.pk]), self._lines(2))
+        self._post(reverse("quotes:edit", args=[large.pk]), self._lines(20))
+
+        short = self._post(reverse("quotes:edit", args=[small.pk]), self._lines(3, "12.00"))
+        long = self._post(reverse("quotes:edit", args=[large.pk]), self._lines(25, "12.00"))
+
+        self.assertEqual(short, long)
+        large.refresh_from_db()
+        self.assertEqual(large.items.count(), 25)
+        self.assertEqual(large.total, 600)
+
+    def test_edit_only_touches_changed_lines(self):
+        quote = Quote.objects.create(client=self.client_obj, created_by=self.user)
+        self._post(reverse("quotes:edit", args=[quote.pk]), self._lines(4))
+        original_ids = list(quote.items.values_list("id", flat=True))
+
+        lines = self._lines(3)
+        lines[1] = (self.items[10], 5, "3.00")
+        self._post(reverse("quotes:edit", args=[quote.pk]), lines)
+
+        rows = list(quote.items.values_list("id", "item_id", "quantity"))
+        self.assertEqual([row[0] for row in rows], original_ids[:3])
+        self.assertEqual(rows[1][1:], (self.items[10].pk, 5))
+        quote.refresh_from_db()
+        self.assertEqual(quote.total, 55)
+
+
+class QuoteListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="seller", password="pass1234")
+        self.client.force_login(self.user)
+        client_obj = Client.objects.create(owner=self.user, name="Acme", email="a@acme.test")
+        self.quotes = Quote.objects.bulk_create(
+            Quote(created_by=self.user, client=client_obj, total=index) for index in range(7)
+        )
+        # Dos cotizaciones con la misma fecha obligan a desempatar por id.
+        same_moment = timezone.now()
+        Quote.objects.filter(pk__in=[self.quotes[2].pk, self.quotes[3].pk]).update(
+            created_at=same_moment
+        )
+
+    def test_pages_walk_every_quote_once_in_order(self):
+        expected = list(
+            Quote.objects.filter(created_by=self.user)
+            .order_by("-created_at", "-id")
+            .values_list("pk", flat=True)
+        )
+        with mock.patch("config.pagination.PAGE_SIZE", 3):
+            response = self.client.get(reverse("quotes:list"))
+            seen = [quote.pk for quote in response.context["quotes"]]
+            cursor = response.context["page"].next_cursor
+            while cursor:
+                response = self.client.get(reverse("quotes:list_page"), {"cursor": cursor})
+                seen.extend(quote.pk for quote in response.context["quotes"])
+                cursor = response.context["page"].next_cursor
+
+        self.assertEqual(seen, expected)
+        self.assertNotContains(response, "quotes-load-more")
+
+    def test_deep_page_is_a_single_query(self):
+        queryset = Quote.objects.filter(created_by=self.user)
+        first = keyset_page(queryset, per_page=5)
+
+        with self.assertNumQueries(1):
+            second = keyset_page(queryset, first.next_cursor, per_page=5)
+
+        self.assertEqual(len(second.items), 2)
+        self.assertFalse(second.has_next)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse("quotes:list_page"), {"cursor": "nope"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class QuoteListProjectionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="seller", password="pass1234")
+        self.client.force_login(self.user)
+        self.client_obj = Client.objects.create(owner=self.user, name="Acme", email="a@acme.test")
+        self.item = Item.objects.create(owner=self.user, sku="SKU1", name="Servicio", cost=10)
+
+    def add_quotes(self, count):
+        for _ in range(count):
+            quote = Quote.objects.create(created_by=self.user, client=self.client_obj)
+            QuoteItem.objects.bulk_create(
+                QuoteItem(quote=quote, item=self.item, quantity=1, unit_price=10) for _ in range(2)
+            )
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("quotes:list"))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self.add_quotes(2)
+        few = self.list_queries()
+        self.add_quotes(6)
+
+        self.assertEqual(self.list_queries(), few)
+
+    def test_item_count_reads_annotation(self):
+        self.add_quotes(1)
+        quote = Quote.objects.for_list().get()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(quote.item_count, 2)
+            self.assertEqual(str(quote.client), "Acme")
+        self.assertEqual(Quote.objects.get().item_count, 2)
+
+    def test_row_fragment_renders_item_count(self):
+        self.add_quotes(1)
+        quote = Quote.objects.get()
+
+        response = self.client.get(reverse("quotes:row", args=[quote.pk]))
+
+        self.assertContains(response, "<td>2</td>", html=True)
+
+
+class QuoteFormClientPickerTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="picker", password="pass1234")
+        self.acme = Client.objects.create(owner=self.user, name="Acme", email="a@acme.test")
+        self.globex = Client.objects.create(owner=self.user, name="Globex")
+        stranger = get_user_model().objects.create_user(username="stranger", password="pass1234")
+        self.foreign = Client.objects.create(owner=stranger, name="Ajeno")
+
+    def test_renders_only_the_chosen_client(self):
+        html = str(QuoteForm(initial={"client": self.acme.pk}, user=self.user)["client"])
+
+        self.assertIn(f'<option value="{self.acme.pk}" selected>Acme</option>', html)
+        self.assertNotIn("Globex", html)
+        self.assertIn(f'data-picker-url="{reverse("clients:search")}"', html)
+        self.assertIn('data-picker-label="{name}"', html)
+
+    def test_rejects_clients_of_other_owners(self):
+        form = QuoteForm({"client": self.foreign.pk, "status": Quote.STATUS_DRAFT}, user=self.user)
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("client", form.errors)
+
+
+class QuoteListFilterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="seller", password="pass1234")
+        self.client.force_login(self.user)
+        self.acme = Client.objects.create(owner=self.user, name="Acme", email="a@acme.test")
+        self.globex = Client.objects.create(owner=self.user, name="Globex", email="g@globex.test")
+        self.won = Quote.objects.create(
+            created_by=self.user, client=self.acme, status=Quote.STATUS_WON, total=500
+        )
+        self.draft = Quote.objects.create(created_by=self.user, client=self.acme, total=80)
+        self.other_client = Quote.objects.create(
+            created_by=self.user, client=self.globex, status=Quote.STATUS_WON, total=90
+        )
+
+    def rows(self, response):
+        return [quote.pk for quote in response.context["quotes"]]
+
+    def test_fragment_combines_filters(self):
+        response = self.client.get(
+            reverse("quotes:list_page"),
+            {"status": Quote.STATUS_WON, "client": self.acme.pk, "total_min": "100"},
+        )
+
+        self.assertEqual(self.rows(response), [self.won.pk])
+        self.assertNotContains(response, "<html")
+
+    def test_fragment_filters_by_total_range_and_dates(self):
+        today = timezone.localdate().isoformat()
+        response = self.client.get(
+            reverse("quotes:list_page"),
+            {"total_max": "100", "date_from": today, "date_to": today},
+        )
+
+        self.assertEqual(self.rows(response), [self.other_client.pk, self.draft.pk])
+
+    def test_list_page_reads_filters_from_the_url(self):
+        response = self.client.get(reverse("quotes:list"), {"client": self.globex.pk})
+
+        self.assertEqual(self.rows(response), [self.other_client.pk])
+        self.assertContains(response, f'<option value="{self.globex.pk}" selected>')
+
+    def test_load_more_keeps_filters(self):
+        with mock.patch("config.pagination.PAGE_SIZE", 1):
+            response = self.client.get(reverse("quotes:list_page"), {"status": Quote.STATUS_WON})
+
+        self.assertContains(response, "?status=won&amp;cursor=")
+
+    def test_fragment_is_revalidated_with_etag(self):
+        url = reverse("quotes:list_page")
+        first = self.client.get(url, {"status": Quote.STATUS_WON})
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        cached = self.client.get(
+            url, {"status": Quote.STATUS_WON}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(cached.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.status = Quote.STATUS_WON
+            self.draft.save()
+        changed = self.client.get(
+            url, {"status": Quote.STATUS_WON}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn(self.draft.pk, self.rows(changed))
+
+    def test_revalidation_does_not_read_quotes(self):
+        url = reverse("quotes:list_page")
+        etag = self.client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(cached.status_code, 304)
+        self.assertFalse([query for query in queries if Quote._meta.db_table in query["sql"]])
+
+    def test_renaming_a_client_invalidates_the_list(self):
+        url = reverse("quotes:list_page")
+        etag = self.client.get(url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("clients:update", args=[self.acme.pk]),
+                {"name": "Acme Industrial", "email": "a@acme.test"},
+                HTTP_HX_REQUEST="true",
+            )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Acme Industrial")
+
+    def test_invalid_filters_are_reported(self):
+        response = self.client.get(
+            reverse("quotes:list_page"), {"total_min": "100", "total_max": "10"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertContains(response, "El total mínimo", status_code=400)
+
+
+class QuoteBulkStatusTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="seller", password="pass1234")
+        self.client.force_login(self.user)
+        client_obj = Client.objects.create(owner=self.user, name="Acme", email="a@acme.test")
+        item = Item.objects.create(owner=self.user, sku="SKU1", name="Servicio", cost=10)
+        self.quotes = [
+            Quote.objects.create(created_by=self.user, client=client_obj, total=10)
+            for _ in range(3)
+        ]
+        for quote in self.quotes:
+            QuoteItem.objects.create(quote=quote, item=item, quantity=1, unit_price=10)
+        stranger = get_user_model().objects.create_user(username="other", password="pass1234")
+        self.foreign = Quote.objects.create(
+            created_by=stranger, client=Client.objects.create(owner=stranger, name="Ajeno")
+        )
+
+    def post(self, **data):
+        return self.client.post(reverse("quotes:bulk_status"), data, HTTP_HX_REQUEST="true")
+
+    def test_updates_selected_quotes_in_one_statement(self):
+        selected = [self.quotes[0].pk, self.quotes[2].pk, self.foreign.pk]
+        lines_before = list(QuoteItem.objects.values_list("pk", "quantity", "unit_price"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(status=Quote.STATUS_SENT, quotes=selected)
+
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"created_by_id"', updates[0])
+        self.assertEqual(
+            set(Quote.objects.filter(status=Quote.STATUS_SENT).values_list("pk", flat=True)),
+            {self.quotes[0].pk, self.quotes[2].pk},
+        )
+        self.assertEqual(Quote.all_objects.get(pk=self.foreign.pk).status, Quote.STATUS_DRAFT)
+        self.assertEqual(
+            list(QuoteItem.objects.values_list("pk", "quantity", "unit_price")), lines_before
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode().count('hx-swap-oob="true"'), 2)
+        self.assertContains(response, f'id="quote-{self.quotes[0].pk}"')
+        self.assertNotContains(response, f'id="quote-{self.foreign.pk}"')
+        self.assertIn("2 cotizaciones actualizadas.", response["HX-Trigger"])
+
+    def test_requires_a_selection(self):
+        response = self.post(status=Quote.STATUS_WON)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Selecciona al menos", response["HX-Trigger"])
+
+
+class QuoteStockReservationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="stock", password="pass1234")
+        self.client.force_login(self.user)
+        self.client_obj = Client.objects.create(owner=self.user, name="Acme")
+        self.bolt = Item.objects.create(owner=self.user, sku="BOLT", name="Perno", stock=10)
+        self.nut = Item.objects.create(owner=self.user, sku="NUT", name="Tuerca", stock=4)
+        self.quote = Quote.objects.create(created_by=self.user, client=self.client_obj, total=0)
+        QuoteItem.objects.create(quote=self.quote, item=self.bolt, quantity=3, unit_price=1)
+        QuoteItem.objects.create(quote=self.quote, item=self.nut, quantity=2, unit_price=1)
+
+    def _payload(self, status, lines):
+        data = {
+            "client": self.client_obj.pk,
+            "status": status,
+            "items-TOTAL_FORMS": str(len(lines)),
+            "items-INITIAL_FORMS": "0",
+            "items-MIN_NUM_FORMS": "1",
+            "items-MAX_NUM_FORMS": "1000",
+        }
+        for index, (item, quantity) in enumerate(lines):
+            data[f"items-{index}-item"] = str(item.pk)
+            data[f"items-{index}-quantity"] = str(quantity)
+            data[f"items-{index}-unit_price"] = "1.00"
+        return data
+
+    def edit(self, status, lines):
+        return self.client.post(
+            reverse("quotes:edit", args=[self.quote.pk]), self._payload(status, lines)
+        )
+
+    def assertStock(self, bolt, nut):
+        self.bolt.refresh_from_db()
+        self.nut.refresh_from_db()
+        self.assertEqual((self.bolt.stock, self.nut.stock), (bolt, nut))
+
+    def test_winning_and_reverting_moves_stock(self):
+        self.edit(Quote.STATUS_WON, [(self.bolt, 3), (self.nut, 2)])
+        self.assertStock(7, 2)
+        self.assertEqual(
+            list(
+                StockMovement.objects.filter(item=self.bolt).values_list("kind", "quantity", "reference")
+            ),
+            [(StockMovement.KIND_SALE, -3, f"Cotización #{self.quote.pk}")],
+        )
+
+        self.edit(Quote.STATUS_WON, [(self.bolt, 5)])
+        self.assertStock(5, 4)
+
+        self.edit(Quote.STATUS_LOST, [(self.bolt, 5)])
+        self.assertStock(10, 4)
+
+    def test_insufficient_stock_leaves_everything_untouched(self):
+        response = self.edit(Quote.STATUS_WON, [(self.bolt, 3), (self.nut, 5)])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Stock insuficiente: NUT (se necesitan 5, hay 4).")
+        self.quote.refresh_from_db()
+        self.assertEqual(self.quote.status, Quote.STATUS_DRAFT)
+        self.assertEqual(self.quote.items.get(item=self.nut).quantity, 2)
+        self.assertStock(10, 4)
+
+    def test_creating_a_won_quote_reserves_stock(self):
+        response = self.client.post(
+            reverse("quotes:create"), self._payload(Quote.STATUS_WON, [(self.nut, 4)])
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertStock(10, 0)
+
+    def test_bulk_status_reserves_and_rejects_shortages(self):
+        other = Quote.objects.create(created_by=self.user, client=self.client_obj, total=0)
+        QuoteItem.objects.create(quote=other, item=self.nut, quantity=3, unit_price=1)
+        url = reverse("quotes:bulk_status")
+
+        response = self.client.post(
+            url, {"status": Quote.STATUS_WON, "quotes": [self.quote.pk, other.pk]}, HTTP_HX_REQUEST="true"
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("Stock insuficiente", response["HX-Trigger"])
+        self.assertFalse(Quote.objects.filter(status=Quote.STATUS_WON).exists())
+        self.assertStock(10, 4)
+
+        self.client.post(url, {"status": Quote.STATUS_WON, "quotes": [other.pk]}, HTTP_HX_REQUEST="true")
+        self.assertStock(10, 1)
+        self.client.post(url, {"status": Quote.STATUS_SENT, "quotes": [other.pk]}, HTTP_HX_REQUEST="true")
+        self.assertStock(10, 4)
+
+    def test_deleting_a_won_quote_restores_stock(self):
+        self.edit(Quote.STATUS_WON, [(self.bolt, 3), (self.nut, 2)])
+
+        self.client.post(reverse("quotes:delete", args=[self.quote.pk]))
+
+        self.assertStock(10, 4)
+
+    def test_api_reserves_stock_for_won_quotes_in_order(self):
+        _, key = ApiToken.issue(self.user, "ERP")
+        line = {"item": self.nut.pk, "quantity": 3, "unit_price": 1}
+        payload = {
+            "quotes": [
+                {"ref": "a", "client": self.client_obj.pk, "status": "won", "lines": [line]},
+                {"ref": "b", "client": self.client_obj.pk, "status": "won", "lines": [line]},
+            ]
+        }
+
+        response = self.client.post(
+            reverse("quotes:api_bulk"),
+            json.dumps(payload),
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {key}",
+        )
+
+        results = response.json()["results"]
+        self.assertEqual([result["status"] for result in results], ["created", "error"])
+        self.assertIn("NUT", results[1]["errors"]["stock"])
+        self.assertStock(10, 1)
+
+
+class QuoteStockConcurrencyTests(TransactionTestCase):
+    def test_concurrent_wins_never_oversell_or_deadlock(self):
+        user = get_user_model().objects.create_user(username="rush", password="pass1234")
+        client_obj = Client.objects.create(owner=user, name="Acme")
+        bolt = Item.objects.create(owner=user, sku="BOLT", name="Perno", stock=5)
+        nut = Item.objects.create(owner=user, sku="NUT", name="Tuerca", stock=5)
+        quotes = []
+        for index in range(12):
+            quote = Quote.objects.create(created_by=user, client=client_obj, total=0)
+            # Mitad de las cotizaciones lista los productos en orden inverso.
+            pair = (bolt, nut) if index % 2 else (nut, bolt)
+            for item in pair:
+                QuoteItem.objects.create(quote=quote, item=item, quantity=1, unit_price=1)
+            quotes.append(quote)
+
+        outcomes = []
+        barrier = threading.Barrier(len(quotes))
+
+        def win(quote):
+            try:
+                barrier.wait()
+                set_quotes_status(Quote.objects.filter(pk=quote.pk), Quote.STATUS_WON)
+                outcomes.append("won")
+            except InsufficientStock:
+                outcomes.append("short")
+            except Exception as error:
+                outcomes.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=win, args=(quote,)) for quote in quotes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes, key=str), ["short"] * 7 + ["won"] * 5)
+        self.assertEqual(Quote.objects.filter(status=Quote.STATUS_WON).count(), 5)
+        self.assertEqual(
+            list(Item.objects.order_by("pk").values_list("stock", flat=True)), [0, 0]
+        )
+
+    def test_concurrent_edits_to_won_reserve_stock_once(self):
+        user = get_user_model().objects.create_user(username="twice", password="pass1234")
+        client_obj = Client.objects.create(owner=user, name="Acme")
+        bolt = Item.objects.create(owner=user, sku="BOLT", name="Perno", stock=10)
+        quote = Quote.objects.create(created_by=user, client=client_obj, total=0)
+        QuoteItem.objects.create(quote=quote, item=bolt, quantity=3, unit_price=1)
+
+        outcomes = []
+        barrier = threading.Barrier(2)
+
+        def edit_to_won():
+            try:
+                # Cada hilo carga su copia cuando la cotización aún es borrador.
+                copy = Quote.objects.get(pk=quote.pk)
+                barrier.wait()
+                copy.status = Quote.STATUS_WON
+                with tracking_stock(copy):
+                    copy.save()
+                outcomes.append("saved")
+            except Exception as error:
+                outcomes.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=edit_to_won) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(outcomes, ["saved", "saved"])
+        bolt.refresh_from_db()
+        self.assertEqual(bolt.stock, 7)
+        self.assertEqual(
+            list(StockMovement.objects.filter(item=bolt).values_list("quantity", flat=True)),
+            [-3],
+        )
+
+
+class QuoteDuplicateTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="seller", password="pass1234")
+        self.client.force_login(self.user)
+        self.acme = Client.objects.create(owner=self.user, name="Acme", email="a@acme.test")
+        self.globex = Client.objects.create(owner=self.user, name="Globex", email="g@globex.test")
+        self.item = Item.objects.create(owner=self.user, sku="SKU1", name="Servicio", cost=10)
+        self.quote = Quote.objects.create(
+            created_by=self.user, client=self.acme, status=Quote.STATUS_WON, total=70
+        )
+        for quantity in (1, 2, 3):
+            QuoteItem.objects.create(quote=self.quote, item=self.item, quantity=quantity, unit_price=10)
+
+    def test_copies_quote_and_lines_into_a_draft(self):
+        copy = duplicate_quote(self.quote)
+
+        self.assertNotEqual(copy.pk, self.quote.pk)
+        self.assertEqual(copy.client, self.acme)
+        self.assertEqual(copy.status, Quote.STATUS_DRAFT)
+        self.assertEqual(copy.total, self.quote.total)
+        self.assertEqual(copy.created_by, self.user)
+        self.assertEqual(
+            list(copy.items.values_list("item_id", "quantity", "unit_price")),
+            list(self.quote.items.values_list("item_id", "quantity", "unit_price")),
+        )
+
+    def test_statement_count_does_not_depend_on_lines(self):
+        with CaptureQueriesContext(connection) as few:
+            duplicate_quote(self.quote)
+        QuoteItem.objects.bulk_create(
+            QuoteItem(quote=self.quote, item=self.item, quantity=1, unit_price=1) for _ in range(20)
+        )
+        with CaptureQueriesContext(connection) as many:
+            copy = duplicate_quote(self.quote)
+
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(copy.items.count(), 23)
+
+    def test_view_duplicates_for_another_client_and_opens_edit_form(self):
+        response = self.client.post(
+            reverse("quotes:duplicate", args=[self.quote.pk]),
+            {"client": self.globex.pk},
+            HTTP_HX_REQUEST="true",
+        )
+
+        copy = Quote.objects.exclude(pk=self.quote.pk).get()
+        self.assertEqual(copy.client, self.globex)
+        self.assertContains(response, reverse("quotes:edit", args=[copy.pk]))
+        trigger = json.loads(response["HX-Trigger"])
+        self.assertEqual(trigger["listChanged"]["action"], "prepend")
+        self.assertIn(f'id="quote-{copy.pk}"', trigger["listChanged"]["html"])
+
+    def test_rejects_foreign_client(self):
+        stranger = get_user_model().objects.create_user(username="other", password="pass1234")
+        foreign = Client.objects.create(owner=stranger, name="Ajeno")
+
+        response = self.client.post(
+            reverse("quotes:duplicate", args=[self.quote.pk]),
+            {"client": foreign.pk},
+            HTTP_HX_REQUEST="true",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Quote.objects.count(), 1)
+        self.assertContains(response, "Duplicar cotización")
+
+
+class QuoteBulkApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="erp", password="pass1234")
+        _, self.key = ApiToken.issue(self.user, "ERP")
+        self.acme = Client.objects.create(owner=self.user, name="Acme", email="a@acme.test")
+        self.item = Item.objects.create(owner=self.user, sku="SKU1", name="Servicio", cost=10)
+        self.other_item = Item.objects.create(owner=self.user, sku="SKU2", name="Soporte", cost=5)
+        stranger = get_user_model().objects.create_user(username="other", password="pass1234")
+        self.foreign_client = Client.objects.create(owner=stranger, name="Ajeno")
+
+    def post(self, payload, key=None):
+        return self.client.post(
+            reverse("quotes:api_bulk"),
+            json.dumps(payload),
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {key or self.key}",
+        )
+
+    def quote_payload(self, ref, **overrides):
+        data = {
+            "ref": ref,
+            "client": self.acme.pk,
+            "lines": [
+                {"item": self.item.pk, "quantity": 2, "unit_price": "10.50"},
+                {"sku": "SKU2", "quantity": 1, "unit_price": 4},
+            ],
+        }
+        data.update(overrides)
+        return data
+
+    def test_requires_a_valid_token(self):
+        response = self.post({"quotes": [self.quote_payload("A")]}, key="nope")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Quote.objects.exists())
+
+    def test_creates_valid_quotes_and_reports_errors_per_quote(self):
+        payload = {
+            "quotes": [
+                self.quote_payload("ok", status=Quote.STATUS_SENT),
+                self.quote_payload("foreign", client=self.foreign_client.pk),
+                self.quote_payload("sku", lines=[{"sku": "NOPE", "quantity": 1, "unit_price": 1}]),
+                self.quote_payload("qty", lines=[{"item": self.item.pk, "quantity": 0, "unit_price": 1}]),
+            ]
+        }
+
+        response = self.post(payload)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["created"], body["failed"]), (1, 3))
+        results = {result["ref"]: result for result in body["results"]}
+        created = Quote.objects.get(pk=results["ok"]["id"])
+        self.assertEqual(created.created_by, self.user)
+        self.assertEqual(created.status, Quote.STATUS_SENT)
+        self.assertEqual(created.total, Decimal("25.00"))
+        self.assertEqual(created.items.count(), 2)
+        self.assertIn("client", results["foreign"]["errors"])
+        self.assertIn("NOPE", results["sku"]["errors"]["lines"]["0"])
+        self.assertIn("0", results["qty"]["errors"]["lines"])
+
+    def test_sku_lines_match_case_insensitively(self):
+        payload = {
+            "quotes": [
+                self.quote_payload("lower", lines=[{"sku": "sku2", "quantity": 1, "unit_price": 4}]),
+            ]
+        }
+
+        response = self.post(payload)
+
+        body = response.json()
+        self.assertEqual(body["created"], 1)
+        created = Quote.objects.get(pk=body["results"][0]["id"])
+        self.assertEqual(list(created.items.values_list("item", flat=True)), [self.other_item.pk])
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        with CaptureQueriesContext(connection) as small:
+            self.post({"quotes": [self.quote_payload(str(index)) for index in range(2)]})
+        with CaptureQueriesContext(connection) as large:
+            self.post({"quotes": [self.quote_payload(str(index)) for index in range(200)]})
+
+        self.assertEqual(len(large), len(small))
+        self.assertEqual(Quote.objects.count(), 202)
+
+    def test_rejects_oversized_body(self):
+        payload = {"quotes": [self.quote_payload(str(index)) for index in range(3)]}
+
+        with mock.patch("quotes.views.INGEST_MAX_BODY_SIZE", 200):
+            response = self.post(payload)
+
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("200 bytes", response.json()["error"])
+        self.assertFalse(Quote.objects.exists())
+
+    def test_rejects_malformed_payload(self):
+        response = self.client.post(
+            reverse("quotes:api_bulk"),
+            "{nope",
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.key}",
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+class QuoteSpreadsheetExportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="seller", password="pass1234")
+        self.client.force_login(self.user)
+        self.client_obj = Client.objects.create(owner=self.user, name="Acme, S.A.", email="a@acme.test")
+        item = Item.objects.create(owner=self.user, sku="SKU1", name="Servicio <premium>", cost=10)
+        self.quote = Quote.objects.create(
+            created_by=self.user, client=self.client_obj, status=Quote.STATUS_WON, total=2500
+        )
+        QuoteItem.objects.create(quote=self.quote, item=item, quantity=2, unit_price=1250)
+        deleted = Quote.objects.create(created_by=self.user, client=self.client_obj, total=1)
+        QuoteItem.objects.create(quote=deleted, item=item, quantity=1, unit_price=1)
+        deleted.delete()
+        stranger = get_user_model().objects.create_user(username="other", password="pass1234")
+        Quote.objects.create(
+            created_by=stranger,
+            client=Client.objects.create(owner=stranger, name="Ajeno"),
+            total=9,
+        )
+
+    def download(self, name, **params):
+        response = self.client.get(reverse(f"quotes:{name}"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_quotes_csv_with_currency(self):
+        content = self.download("export_quotes", format="csv", currency="1").decode("utf-8-sig")
+        rows = list(csv.reader(StringIO(content)))
+
+        self.assertEqual(rows[0][0], "Folio")
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], str(self.quote.pk))
+        self.assertEqual(rows[1][2], "Acme, S.A.")
+        self.assertEqual(rows[1][4], "Ganada")
+        self.assertEqual(rows[1][5], "1")
+        self.assertEqual(rows[1][6], "$2,500.00")
+
+    def test_lines_csv_joins_item_and_client(self):
+        content = self.download("export_lines", format="csv").decode("utf-8-sig")
+        rows = list(csv.reader(StringIO(content)))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][3:], ["Acme, S.A.", "SKU1", "Servicio <premium>", "2", "1250.00", "2500.00"])
+
+    def test_lines_xlsx_is_a_valid_workbook(self):
+        content = self.download("export_lines", format="xlsx", status=Quote.STATUS_WON)
+
+        with zipfile.ZipFile(BytesIO(content)) as workbook:
+            self.assertIn("[Content_Types].xml", workbook.namelist())
+            sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+        namespace = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        rows = sheet.findall("s:sheetData/s:row", namespace)
+        self.assertEqual(len(rows), 2)
+        texts = ["".join(cell.itertext()) for cell in rows[1]]
+        self.assertIn("Servicio <premium>", texts)
+        self.assertEqual(texts[-1], "2500.00")
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(reverse("quotes:export_quotes"), {"format": "pdf"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ListIndexCheckTests(TestCase):
+    def test_list_queries_use_indexes_and_leave_no_data(self):
+        out = StringIO()
+
+        # Pocas filas, pero las mismas ~400 por usuario que la siembra por defecto.
+        call_command("check_list_indexes", rows=2000, owners=5, stdout=out)
+
+        self.assertIn("Todos los listados usan índices.", out.getvalue())
+        self.assertFalse(Quote.objects.exists())
+        self.assertFalse(get_user_model().objects.exists())
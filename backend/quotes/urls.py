@@ -6,9 +6,19 @@ app_name = "quotes"
 
 urlpatterns = [
     path("", views.quote_list, name="list"),
+    path("page/", views.quote_list_page, name="list_page"),
+    path("bulk-status/", views.quote_bulk_status, name="bulk_status"),
     path("create/", views.quote_create, name="create"),
+    path("export/", views.quote_export, name="export"),
+    path("export/quotes/", views.quote_export_quotes, name="export_quotes"),
+    path("export/lines/", views.quote_export_lines, name="export_lines"),
+    path("api/bulk/", views.quote_api_bulk, name="api_bulk"),
+    path("catalog/", views.quote_catalog, name="catalog"),
+    path("items/search/", views.quote_item_search, name="item_search"),
     path("<int:pk>/edit/", views.quote_edit, name="edit"),
+    path("<int:pk>/duplicate/", views.quote_duplicate, name="duplicate"),
     path("<int:pk>/delete/", views.quote_delete, name="delete"),
     path("<int:pk>/row/", views.quote_row, name="row"),
     path("<int:pk>/pdf/", views.quote_pdf, name="pdf"),
+    path("<int:pk>/pdf/job/", views.quote_pdf_job, name="pdf_job"),
 ]
@@ -1,26 +1,58 @@
+import hashlib
 import json
 from decimal import Decimal
-from io import BytesIO
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.forms import formset_factory
-from django.http import HttpResponse, HttpResponseNotAllowed
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
+from django.urls import reverse
 from django.db import transaction
 from django.utils import timezone
-from django.utils.formats import date_format
-
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.lib.utils import ImageReader
-from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
-
-from accounts.models import CompanyProfile
-from .forms import QuoteForm, QuoteItemForm
-from .models import Quote, QuoteItem
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
+
+from accounts.api import api_token_required
+from accounts.versions import CLIENTS, QUOTES, data_version
+from config.pagination import keyset_page
+from config.streaming import stream_csv, stream_xlsx, stream_zip
+from inventory.ledger import InsufficientStock
+
+from .catalog import SEARCH_LIMIT, SEARCH_MAX_LIMIT, ItemCatalog
+from .duplication import duplicate_quote
+from .export import (
+    EXPORT_CHUNK_SIZE,
+    iter_quote_pdfs,
+    line_sheet_rows,
+    quote_sheet_rows,
+)
+from .forms import (
+    QuoteBulkStatusForm,
+    QuoteDuplicateForm,
+    QuoteFilterForm,
+    QuoteForm,
+    QuoteItemForm,
+)
+from .ingest import INGEST_MAX_BATCH, INGEST_MAX_BODY_SIZE, ingest_quotes
+from .jobs import enqueue_quote_pdf, retry_quote_pdf
+from .models import Quote, QuoteItem, QuotePDFJob
+from .pdf import (
+    cached_quote_pdf,
+    get_company_profile,
+    is_quote_pdf_cached,
+    quote_pdf_fingerprint,
+)
+from .stock import release_quotes_stock, set_quotes_status, tracking_stock
 
 QuoteItemFormSet = formset_factory(QuoteItemForm, extra=0, min_num=1, validate_min=True)
 
@@ -29,8 +61,66 @@ def _is_htmx(request):
     return request.headers.get("HX-Request") == "true"
 
 
-def _blank_item_formset(user):
-    return QuoteItemFormSet(prefix="items", initial=[{}], form_kwargs={"user": user})
+def _item_form_kwargs(user, catalog=None):
+    return {"user": user, "catalog": catalog or ItemCatalog(user)}
+
+
+def _blank_item_formset(user, catalog=None):
+    return QuoteItemFormSet(
+        prefix="items", initial=[{}], form_kwargs=_item_form_kwargs(user, catalog)
+    )
+
+
+def _submitted_lines(formset):
+    return [
+        (
+            item_form.cleaned_data["item"],
+            item_form.cleaned_data["quantity"],
+            item_form.cleaned_data["unit_price"],
+        )
+        for item_form in formset
+        if item_form.cleaned_data.get("item")
+    ]
+
+
+def _lines_total(lines):
+    return sum((quantity * unit_price for _, quantity, unit_price in lines), Decimal("0"))
+
+
+def _save_quote_lines(quote, lines, existing=()):
+    """Store ``lines`` on ``quote`` with a constant number of queries.
+
+    Existing rows are reused in order: changed ones are updated in a single
+    ``bulk_update``, extra lines are inserted with ``bulk_create`` and rows
+    left over are deleted together.
+    """
+
+    existing = list(existing)
+    changed = []
+    for quote_item, (item, quantity, unit_price) in zip(existing, lines):
+        if (quote_item.item_id, quote_item.quantity, quote_item.unit_price) == (
+            item.pk,
+            quantity,
+            unit_price,
+        ):
+            continue
+        quote_item.item = item
+        quote_item.quantity = quantity
+        quote_item.unit_price = unit_price
+        changed.append(quote_item)
+    if changed:
+        QuoteItem.objects.bulk_update(changed, ["item", "quantity", "unit_price"])
+
+    new_items = [
+        QuoteItem(quote=quote, item=item, quantity=quantity, unit_price=unit_price)
+        for item, quantity, unit_price in lines[len(existing):]
+    ]
+    if new_items:
+        QuoteItem.objects.bulk_create(new_items)
+
+    stale = [quote_item.pk for quote_item in existing[len(lines):]]
+    if stale:
+        QuoteItem.objects.filter(pk__in=stale).delete()
 
 
 def _render_quote_form(
@@ -53,27 +143,156 @@ def _render_quote_form(
     )
 
 
+def _quote_list_queryset(user):
+    return Quote.objects.filter(created_by=user).for_list()
+
+
+def _quote_list_context(request, filter_form, cursor=None):
+    context = {
+        "filter_form": filter_form,
+        "filter_query": filter_form.querystring(),
+        "cursor": cursor,
+        "quotes": [],
+        "page": None,
+    }
+    if filter_form.is_bound and not filter_form.is_valid():
+        return context
+
+    queryset = _quote_list_queryset(request.user)
+    if filter_form.is_bound:
+        queryset = filter_form.filter(queryset)
+    page = keyset_page(queryset, cursor)
+    context.update(quotes=page.items, page=page)
+    return context
+
+
+def _render_quote_list(request, filter_form, status=200):
+    context = _quote_list_context(request, filter_form)
+    context["bulk_form"] = QuoteBulkStatusForm()
+    return render(request, "quotes/list.html", context, status=status)
+
+
+def _quote_list_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    # El listado muestra el nombre del cliente: editar un cliente también lo invalida.
+    version = data_version(request.user, QUOTES, CLIENTS)
+    raw = f"{request.user.pk}:{request.GET.urlencode()}:{version}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _render_quote_edit(request, quote, catalog):
+    initial = [
+        {
+            "item": item.item_id,
+            "quantity": item.quantity,
+            "unit_price": item.unit_price,
+        }
+        for item in quote.items.select_related("item")
+    ] or [{}]
+    formset = QuoteItemFormSet(
+        prefix="items",
+        initial=initial,
+        form_kwargs=_item_form_kwargs(request.user, catalog),
+    )
+    template = "quotes/partials/quote_form.html" if _is_htmx(request) else "quotes/form_page.html"
+    return _render_quote_form(
+        request,
+        QuoteForm(instance=quote, user=request.user),
+        formset,
+        mode="edit",
+        quote=quote,
+        template=template,
+    )
+
+
 @login_required
 def quote_list(request):
-    return render(
-        request,
-        "quotes/list.html",
-        {
-            "quotes": Quote.objects.filter(created_by=request.user)
-            .select_related("client")
-            .order_by("-created_at"),
-        },
+    filter_form = QuoteFilterForm(request.GET or None, user=request.user)
+    status = 400 if filter_form.is_bound and not filter_form.is_valid() else 200
+    return _render_quote_list(request, filter_form, status=status)
+
+
+@login_required
+@condition(etag_func=_quote_list_etag)
+def quote_list_page(request):
+    """Rows matching the filters after ``cursor``, plus the following "load more" row.
+
+    Filters and cursor travel in the query string, so the browser can keep
+    each fragment and revalidate it against the ETag of the user's quotes.
+    """
+
+    filter_form = QuoteFilterForm(request.GET, user=request.user)
+    try:
+        context = _quote_list_context(request, filter_form, request.GET.get("cursor"))
+    except ValueError:
+        return HttpResponseBadRequest("Cursor inválido.")
+    status = 400 if filter_form.errors else 200
+    response = render(request, "quotes/partials/quote_rows.html", context, status=status)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+def quote_bulk_status(request):
+    """Set the status of the selected quotes in one owner-scoped UPDATE.
+
+    Moving to or from won reserves or restores stock for every line; the
+    affected rows come back as out-of-band swaps.
+    """
+
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    form = QuoteBulkStatusForm(request.POST)
+    pks = [int(pk) for pk in request.POST.getlist("quotes") if pk.isdigit()]
+    if not form.is_valid() or not pks:
+        if not _is_htmx(request):
+            return redirect("quotes:list")
+        message = "Selecciona al menos una cotización." if form.is_valid() else "Elige un estado válido."
+        response = HttpResponse("", status=400)
+        response["HX-Trigger"] = json.dumps({"toast": {"message": message, "type": "error"}})
+        return response
+
+    status = form.cleaned_data["status"]
+    selected = Quote.objects.filter(created_by=request.user, pk__in=pks)
+    try:
+        updated = set_quotes_status(selected, status)
+    except InsufficientStock as error:
+        if not _is_htmx(request):
+            return redirect("quotes:list")
+        response = HttpResponse("", status=409)
+        response["HX-Trigger"] = json.dumps({"toast": {"message": str(error), "type": "error"}})
+        return response
+    if not _is_htmx(request):
+        return redirect("quotes:list")
+
+    rows = "".join(
+        render_to_string(
+            "quotes/partials/quote_row.html", {"quote": quote, "oob": True}, request=request
+        )
+        for quote in selected.for_list()
     )
+    message = (
+        "1 cotización actualizada."
+        if updated == 1
+        else f"{updated} cotizaciones actualizadas."
+    )
+    response = HttpResponse(rows)
+    response["HX-Trigger"] = json.dumps({"toast": {"message": message, "type": "success"}})
+    return response
 
 
 @login_required
 def quote_create(request):
+    catalog = ItemCatalog(request.user)
+
     if request.method == "GET":
         template = "quotes/partials/quote_form.html" if _is_htmx(request) else "quotes/form_page.html"
         return _render_quote_form(
             request,
             QuoteForm(user=request.user),
-            _blank_item_formset(request.user),
+            _blank_item_formset(request.user, catalog),
             template=template,
         )
 
@@ -81,37 +300,32 @@ def quote_create(request):
         return HttpResponseNotAllowed(["GET", "POST"])
 
     form = QuoteForm(request.POST, user=request.user)
-    formset = QuoteItemFormSet(request.POST, prefix="items", form_kwargs={"user": request.user})
+    formset = QuoteItemFormSet(
+        request.POST, prefix="items", form_kwargs=_item_form_kwargs(request.user, catalog)
+    )
     if not (form.is_valid() and formset.is_valid()):
         template = "quotes/partials/quote_form.html" if _is_htmx(request) else "quotes/form_page.html"
         return _render_quote_form(request, form, formset, template=template)
 
-    with transaction.atomic():
-        quote = form.save(commit=False)
-        quote.created_by = request.user
-        quote.save()
-        total = Decimal("0")
-        for item_form in formset:
-            item = item_form.cleaned_data.get("item")
-            quantity = item_form.cleaned_data.get("quantity")
-            unit_price = item_form.cleaned_data.get("unit_price")
-            if not item:
-                continue
-            quote_item = QuoteItem.objects.create(
-                quote=quote,
-                item=item,
-                quantity=quantity,
-                unit_price=unit_price,
-            )
-            total += quote_item.subtotal
-        quote.total = total
-        quote.save(update_fields=["total"])
+    lines = _submitted_lines(formset)
+    quote = form.save(commit=False)
+    quote.created_by = request.user
+    quote.total = _lines_total(lines)
+    try:
+        with tracking_stock(quote):
+            quote.save()
+            _save_quote_lines(quote, lines)
+    except InsufficientStock as error:
+        quote.pk = None
+        form.add_error(None, str(error))
+        template = "quotes/partials/quote_form.html" if _is_htmx(request) else "quotes/form_page.html"
+        return _render_quote_form(request, form, formset, template=template)
 
     if not _is_htmx(request):
         return redirect("quotes:list")
 
     fresh_form = QuoteForm(user=request.user)
-    fresh_formset = _blank_item_formset(request.user)
+    fresh_formset = _blank_item_formset(request.user, catalog)
     form_html = render_to_string(
         "quotes/partials/quote_form.html",
         {"form": fresh_form, "formset": fresh_formset, "mode": "create"},
@@ -143,35 +357,17 @@ def quote_edit(request, pk):
         Quote.objects.select_related("client").filter(created_by=request.user),
         pk=pk,
     )
+    catalog = ItemCatalog(request.user)
 
     if request.method == "GET":
-        initial = [
-            {
-                "item": item.item_id,
-                "quantity": item.quantity,
-                "unit_price": item.unit_price,
-            }
-            for item in quote.items.select_related("item")
-        ] or [{}]
-        formset = QuoteItemFormSet(
-            prefix="items", initial=initial, form_kwargs={"user": request.user}
-        )
-        template = "quotes/partials/quote_form.html" if _is_htmx(request) else "quotes/form_page.html"
-        return _render_quote_form(
-            request,
-            QuoteForm(instance=quote, user=request.user),
-            formset,
-            mode="edit",
-            quote=quote,
-            template=template,
-        )
+        return _render_quote_edit(request, quote, catalog)
 
     if request.method != "POST":
         return HttpResponseNotAllowed(["GET", "POST"])
 
     form = QuoteForm(request.POST, instance=quote, user=request.user)
     formset = QuoteItemFormSet(
-        request.POST, prefix="items", form_kwargs={"user": request.user}
+        request.POST, prefix="items", form_kwargs=_item_form_kwargs(request.user, catalog)
     )
     if not (form.is_valid() and formset.is_valid()):
         template = "quotes/partials/quote_form.html" if _is_htmx(request) else "quotes/form_page.html"
@@ -184,25 +380,24 @@ def quote_edit(request, pk):
             template=template,
         )
 
-    with transaction.atomic():
-        quote = form.save()
-        quote.items.all().delete()
-        total = Decimal("0")
-        for item_form in formset:
-            item = item_form.cleaned_data.get("item")
-            quantity = item_form.cleaned_data.get("quantity")
-            unit_price = item_form.cleaned_data.get("unit_price")
-            if not item:
-                continue
-            quote_item = QuoteItem.objects.create(
-                quote=quote,
-                item=item,
-                quantity=quantity,
-                unit_price=unit_price,
-            )
-            total += quote_item.subtotal
-        quote.total = total
-        quote.save(update_fields=["total"])
+    lines = _submitted_lines(formset)
+    quote = form.save(commit=False)
+    quote.total = _lines_total(lines)
+    try:
+        with tracking_stock(quote):
+            quote.save()
+            _save_quote_lines(quote, lines, existing=quote.items.order_by("id"))
+    except InsufficientStock as error:
+        form.add_error(None, str(error))
+        template = "quotes/partials/quote_form.html" if _is_htmx(request) else "quotes/form_page.html"
+        return _render_quote_form(
+            request,
+            form,
+            formset,
+            mode="edit",
+            quote=quote,
+            template=template,
+        )
 
     if not _is_htmx(request):
         return redirect("quotes:list")
@@ -211,7 +406,7 @@ def quote_edit(request, pk):
         "quotes/partials/quote_form.html",
         {
             "form": QuoteForm(user=request.user),
-            "formset": _blank_item_formset(request.user),
+            "formset": _blank_item_formset(request.user, catalog),
             "mode": "create",
         },
         request=request,
@@ -237,10 +432,134 @@ def quote_edit(request, pk):
 
 
 @login_required
-def quote_row(request, pk):
+def quote_duplicate(request, pk):
+    """Ask for the client of the copy, then duplicate and open the copy for editing."""
+
     quote = get_object_or_404(
         Quote.objects.select_related("client").filter(created_by=request.user), pk=pk
     )
+
+    if request.method == "GET":
+        form = QuoteDuplicateForm(user=request.user, initial={"client": quote.client_id})
+    elif request.method == "POST":
+        form = QuoteDuplicateForm(request.POST, user=request.user)
+        if form.is_valid():
+            copy = duplicate_quote(quote, client=form.cleaned_data["client"])
+            if not _is_htmx(request):
+                return redirect("quotes:edit", pk=copy.pk)
+
+            response = _render_quote_edit(request, copy, ItemCatalog(request.user))
+            row_html = render_to_string(
+                "quotes/partials/quote_row.html",
+                {"quote": Quote.objects.for_list().get(pk=copy.pk)},
+                request=request,
+            )
+            response["HX-Trigger"] = json.dumps(
+                {
+                    "toast": {
+                        "message": f"Cotización #{quote.pk} duplicada como #{copy.pk}.",
+                        "type": "success",
+                    },
+                    "listChanged": {
+                        "action": "prepend",
+                        "target": "#quotes-table-body",
+                        "html": row_html,
+                    },
+                }
+            )
+            return response
+    else:
+        return HttpResponseNotAllowed(["GET", "POST"])
+
+    template = (
+        "quotes/partials/quote_duplicate.html" if _is_htmx(request) else "quotes/duplicate_page.html"
+    )
+    return render(request, template, {"form": form, "quote": quote})
+
+
+@csrf_exempt
+@api_token_required
+def quote_api_bulk(request):
+    """Create a batch of quotes sent as JSON by an external system.
+
+    Body: ``{"quotes": [{"ref", "client", "status", "lines": [{"item" | "sku",
+    "quantity", "unit_price"}]}]}``. Returns one result per quote, in order.
+    """
+
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    # Los lotes grandes superan DATA_UPLOAD_MAX_MEMORY_SIZE, así que el cuerpo se
+    # lee aparte con su propio límite: primero por la cabecera y luego leyendo
+    # como mucho un byte más del límite, por si la cabecera no lo dice.
+    too_large = JsonResponse(
+        {"error": f"El cuerpo admite como máximo {INGEST_MAX_BODY_SIZE} bytes."}, status=413
+    )
+    try:
+        content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > INGEST_MAX_BODY_SIZE:
+        return too_large
+    body = request.read(INGEST_MAX_BODY_SIZE + 1)
+    if len(body) > INGEST_MAX_BODY_SIZE:
+        return too_large
+
+    try:
+        payload = json.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"error": "El cuerpo no es JSON válido."}, status=400)
+
+    quotes = payload.get("quotes") if isinstance(payload, dict) else None
+    if not isinstance(quotes, list) or not quotes:
+        return JsonResponse(
+            {"error": "Envía una lista \"quotes\" con al menos una cotización."}, status=400
+        )
+    if len(quotes) > INGEST_MAX_BATCH:
+        return JsonResponse(
+            {"error": f"El lote admite como máximo {INGEST_MAX_BATCH} cotizaciones."},
+            status=413,
+        )
+
+    results = ingest_quotes(request.user, quotes)
+    created = sum(1 for result in results if result["status"] == "created")
+    return JsonResponse(
+        {"created": created, "failed": len(results) - created, "results": results}
+    )
+
+
+def _catalog_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    return ItemCatalog(request.user).version
+
+
+@login_required
+@condition(etag_func=_catalog_etag)
+def quote_catalog(request):
+    """Cost map of the user's items, shared by every line of the quote form."""
+
+    response = JsonResponse(ItemCatalog(request.user).cost_map())
+    patch_cache_control(response, private=True, max_age=86400)
+    return response
+
+
+@login_required
+def quote_item_search(request):
+    """Typeahead results for the product picker of the quote lines."""
+
+    try:
+        limit = int(request.GET.get("limit", SEARCH_LIMIT))
+    except ValueError:
+        limit = SEARCH_LIMIT
+    limit = min(max(limit, 1), SEARCH_MAX_LIMIT)
+    results = ItemCatalog(request.user).search(request.GET.get("q", ""), limit)
+    return JsonResponse({"results": results})
+
+
+@login_required
+def quote_row(request, pk):
+    quote = get_object_or_404(Quote.objects.filter(created_by=request.user).for_list(), pk=pk)
     return render(request, "quotes/partials/quote_row.html", {"quote": quote})
 
 
@@ -253,271 +572,126 @@ def quote_pdf(request, pk):
         pk=pk,
     )
 
-    buffer = BytesIO()
-    document = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        leftMargin=0.9 * inch,
-        rightMargin=0.9 * inch,
-        topMargin=0.9 * inch,
-        bottomMargin=0.8 * inch,
-        title=f"Cotización #{quote.pk}",
-    )
+    company_profile = get_company_profile(quote.created_by)
+    fingerprint = quote_pdf_fingerprint(quote, company_profile)
+    etag = quote_etag(fingerprint)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
 
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "QuoteTitle",
-        parent=styles["Heading1"],
-        fontName="Helvetica-Bold",
-        fontSize=18,
-        textColor=colors.HexColor("#0f172a"),
-        spaceAfter=12,
-    )
-    normal_style = ParagraphStyle(
-        "QuoteBody",
-        parent=styles["BodyText"],
-        fontName="Helvetica",
-        fontSize=11,
-        leading=14,
-        textColor=colors.HexColor("#1f2937"),
-    )
-    small_style = ParagraphStyle(
-        "QuoteSmall",
-        parent=normal_style,
-        fontSize=9,
-        leading=12,
-        textColor=colors.HexColor("#475569"),
-        spaceBefore=12,
+    if settings.QUOTE_PDF_ASYNC and not is_quote_pdf_cached(quote, fingerprint):
+        job = enqueue_quote_pdf(quote, fingerprint)
+        return JsonResponse(
+            {
+                "job": job.pk,
+                "status": job.status,
+                "poll_url": reverse("quotes:pdf_job", args=[quote.pk]),
+            },
+            status=202,
+        )
+
+    content = cached_quote_pdf(quote, company_profile, fingerprint)
+    filename = f"cotizacion-{quote.pk}.pdf"
+    response = HttpResponse(content, content_type="application/pdf")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+def quote_export(request):
+    """Stream a ZIP with the PDF of every quote matching the filter."""
+
+    form = QuoteFilterForm(request.GET, user=request.user)
+    if not form.is_valid():
+        return _render_quote_list(request, form, status=400)
+
+    quotes = (
+        form.filter(Quote.objects.filter(created_by=request.user))
+        .select_related("client", "created_by")
+        .prefetch_related("items__item")
+        .order_by("created_at", "id")
     )
-    company_name_style = ParagraphStyle(
-        "CompanyName",
-        parent=normal_style,
-        fontName="Helvetica-Bold",
-        fontSize=13,
-        leading=16,
-        textColor=colors.HexColor("#0f172a"),
+    pdfs = iter_quote_pdfs(
+        quotes.iterator(chunk_size=EXPORT_CHUNK_SIZE),
+        get_company_profile(request.user),
     )
-    company_detail_style = ParagraphStyle(
-        "CompanyDetail",
-        parent=normal_style,
-        fontSize=10,
-        leading=13,
-        textColor=colors.HexColor("#1f2937"),
+    response = StreamingHttpResponse(
+        stream_zip((f"cotizacion-{quote.pk}.pdf", content) for quote, content in pdfs),
+        content_type="application/zip",
     )
+    filename = f"cotizaciones-{timezone.localdate():%Y%m%d}.zip"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    patch_cache_control(response, private=True, no_store=True)
+    return response
 
-    issued_by = "N/A"
-    if quote.created_by:
-        issued_by = quote.created_by.get_full_name() or quote.created_by.get_username()
 
-    try:
-        company_profile = quote.created_by.company_profile
-    except CompanyProfile.DoesNotExist:
-        company_profile = None
-    company_logo = None
-    if company_profile and company_profile.logo:
-        logo_bytes = None
-        try:
-            company_profile.logo.open("rb")
-            logo_bytes = company_profile.logo.read()
-        except Exception:
-            logo_bytes = None
-        finally:
-            try:
-                company_profile.logo.close()
-            except Exception:
-                pass
-
-        if logo_bytes:
-            try:
-                logo_buffer = BytesIO(logo_bytes)
-                logo_reader = ImageReader(logo_buffer)
-                logo_width, logo_height = logo_reader.getSize()
-                if logo_width and logo_height:
-                    max_logo_width = 1.6 * inch
-                    max_logo_height = 1.6 * inch
-                    scale = min(
-                        max_logo_width / logo_width,
-                        max_logo_height / logo_height,
-                        1,
-                    )
-                    resized_width = logo_width * scale
-                    resized_height = logo_height * scale
-                else:
-                    resized_width = resized_height = 1.6 * inch
-
-                company_logo = Image(
-                    BytesIO(logo_bytes),
-                    width=resized_width,
-                    height=resized_height,
-                )
-                company_logo.hAlign = "LEFT"
-            except Exception:
-                company_logo = None
-
-    header_elements = []
-    if company_profile or company_logo:
-        display_name = (company_profile.legal_name if company_profile and company_profile.legal_name else issued_by)
-        detail_lines = []
-        if company_profile:
-            if company_profile.tax_id:
-                detail_lines.append(f"<b>RFC:</b> {company_profile.tax_id}")
-            contact_email = company_profile.contact_email or quote.created_by.email
-            if contact_email:
-                detail_lines.append(f"<b>Correo:</b> {contact_email}")
-            if company_profile.contact_phone:
-                detail_lines.append(f"<b>Teléfono:</b> {company_profile.contact_phone}")
-            if company_profile.tax_address:
-                tax_address = company_profile.tax_address.replace("\n", "<br/>")
-                detail_lines.append(f"<b>Domicilio fiscal:</b> {tax_address}")
-
-        text_flowables = [Paragraph(display_name, company_name_style)]
-        if detail_lines:
-            text_flowables.append(
-                Paragraph("<br/>".join(detail_lines), company_detail_style)
-            )
+SPREADSHEET_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", stream_csv),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", stream_xlsx),
+}
 
-        if company_logo:
-            header_table = Table(
-                [[company_logo, text_flowables]],
-                colWidths=[1.7 * inch, document.width - 1.7 * inch],
-                hAlign="LEFT",
-            )
-            header_table.setStyle(
-                TableStyle(
-                    [
-                        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                        ("LEFTPADDING", (0, 0), (-1, -1), 0),
-                        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
-                        ("TOPPADDING", (0, 0), (-1, -1), 0),
-                        ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
-                    ]
-                )
-            )
-            header_elements.append(header_table)
-        else:
-            header_elements.extend(text_flowables)
-
-        header_elements.append(Spacer(1, 0.25 * inch))
-
-    issued_at = timezone.localtime(quote.created_at)
-    issued_at_display = "{} {}".format(
-        date_format(issued_at, "DATE_FORMAT", use_l10n=True),
-        date_format(issued_at, "TIME_FORMAT", use_l10n=True),
-    ).strip()
-
-    metadata = [
-        ["Folio", f"#{quote.pk}", "Fecha", issued_at_display],
-        ["Cliente", quote.client.name, "Correo", quote.client.email or "—"],
-        ["Generada por", issued_by, "Estado", quote.get_status_display()],
-    ]
 
-    metadata_table = Table(
-        metadata,
-        colWidths=[document.width * 0.18, document.width * 0.32] * 2,
-        hAlign="LEFT",
-    )
-    metadata_style = [
-        ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.HexColor("#f8fafc"), colors.white]),
-        ("BOX", (0, 0), (-1, -1), 0.75, colors.HexColor("#cbd5f5")),
-        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#dbeafe")),
-        ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
-        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-        ("FONTNAME", (2, 0), (2, -1), "Helvetica-Bold"),
-        ("TEXTCOLOR", (0, 0), (-1, -1), colors.HexColor("#1f2937")),
-        ("ALIGN", (1, 0), (-1, -1), "LEFT"),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("LEFTPADDING", (0, 0), (-1, -1), 8),
-        ("RIGHTPADDING", (0, 0), (-1, -1), 8),
-        ("TOPPADDING", (0, 0), (-1, -1), 6),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-    ]
-    metadata_table.setStyle(TableStyle(metadata_style))
+def _spreadsheet_export(request, build_rows, basename):
+    export_format = request.GET.get("format", "csv")
+    if export_format not in SPREADSHEET_FORMATS:
+        return HttpResponseBadRequest("Formato de exportación no soportado.")
 
-    item_rows = [
-        ["Concepto", "Cantidad", "Precio unitario", "Subtotal"],
-    ]
-    for item in quote.items.all():
-        item_rows.append(
-            [
-                str(item.item),
-                str(item.quantity),
-                f"${item.unit_price:.2f}",
-                f"${item.subtotal:.2f}",
-            ]
-        )
+    form = QuoteFilterForm(request.GET, user=request.user)
+    if not form.is_valid():
+        return _render_quote_list(request, form, status=400)
 
-    if len(item_rows) == 1:
-        item_rows.append(["Sin conceptos", "—", "—", "—"])
+    quotes = form.filter(Quote.objects.filter(created_by=request.user))
+    rows = build_rows(quotes, currency=bool(request.GET.get("currency")))
+    content_type, stream = SPREADSHEET_FORMATS[export_format]
+    response = StreamingHttpResponse(stream(rows), content_type=content_type)
+    filename = f"{basename}-{timezone.localdate():%Y%m%d}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    patch_cache_control(response, private=True, no_store=True)
+    return response
 
-    items_table = Table(
-        item_rows,
-        colWidths=[document.width * 0.42, document.width * 0.16, document.width * 0.2, document.width * 0.22],
-        hAlign="LEFT",
-    )
-    items_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1d4ed8")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
-                ("ALIGN", (1, 1), (-2, -1), "CENTER"),
-                ("ALIGN", (-1, 1), (-1, -1), "RIGHT"),
-                ("LEFTPADDING", (0, 0), (-1, -1), 8),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 8),
-                ("TOPPADDING", (0, 0), (-1, 0), 10),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 10),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#94a3b8")),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f8fafc")]),
-            ]
-        )
-    )
 
-    total_table = Table(
-        [["Total", f"${quote.total:.2f}"]],
-        colWidths=[document.width * 0.78, document.width * 0.22],
-        hAlign="LEFT",
-    )
-    total_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#f1f5f9")),
-                ("FONTNAME", (0, 0), (-1, -1), "Helvetica-Bold"),
-                ("TEXTCOLOR", (0, 0), (-1, -1), colors.HexColor("#0f172a")),
-                ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-                ("LEFTPADDING", (0, 0), (-1, -1), 10),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 10),
-                ("TOPPADDING", (0, 0), (-1, -1), 8),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-            ]
-        )
-    )
+@login_required
+def quote_export_quotes(request):
+    """Stream the filtered quotes (one row each) as CSV or XLSX."""
 
-    footer = Paragraph(
-        "Esta cotización fue generada con CoreQuote. Gracias por su preferencia.",
-        small_style,
-    )
+    return _spreadsheet_export(request, quote_sheet_rows, "cotizaciones")
 
-    document.build(
-        [
-            *header_elements,
-            Paragraph("Cotización", title_style),
-            Paragraph("Resumen de la cotización", normal_style),
-            Spacer(1, 0.15 * inch),
-            metadata_table,
-            Spacer(1, 0.3 * inch),
-            items_table,
-            Spacer(1, 0.2 * inch),
-            total_table,
-            footer,
-        ]
+
+@login_required
+def quote_export_lines(request):
+    """Stream the lines of the filtered quotes as CSV or XLSX."""
+
+    return _spreadsheet_export(request, line_sheet_rows, "partidas")
+
+
+@login_required
+def quote_pdf_job(request, pk):
+    """Queue the quote PDF if needed and return its status fragment for polling."""
+
+    quote = get_object_or_404(
+        Quote.objects.select_related("client", "created_by")
+        .prefetch_related("items__item")
+        .filter(created_by=request.user),
+        pk=pk,
     )
+    fingerprint = quote_pdf_fingerprint(quote, get_company_profile(quote.created_by))
+    job = None
+    if not is_quote_pdf_cached(quote, fingerprint):
+        job = enqueue_quote_pdf(quote, fingerprint)
+        if job.status == QuotePDFJob.STATUS_FAILED and request.GET.get("retry"):
+            job = retry_quote_pdf(job)
 
-    buffer.seek(0)
-    filename = f"cotizacion-{quote.pk}.pdf"
-    response = HttpResponse(buffer.getvalue(), content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return response
+    return render(
+        request,
+        "quotes/partials/pdf_status.html",
+        {
+            "quote": quote,
+            "job": job,
+            "ready": job is None or job.status == QuotePDFJob.STATUS_DONE,
+        },
+    )
 
 
 @login_required
@@ -526,7 +700,9 @@ def quote_delete(request, pk):
         return HttpResponseNotAllowed(["POST", "DELETE"])
 
     quote = get_object_or_404(Quote.objects.filter(created_by=request.user), pk=pk)
-    quote.delete()
+    with transaction.atomic():
+        release_quotes_stock(Quote.objects.filter(pk=quote.pk))
+        quote.delete()
     if not _is_htmx(request):
         return redirect("quotes:list")
 
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="report",
+            index=models.Index(models.F("created_by"), models.OrderBy(models.F("created_at"), descending=True), condition=models.Q(("deleted__isnull", True)), name="report_owner_created_idx"),
+        ),
+    ]
@@ -13,6 +13,15 @@ class Report(SafeDeleteModel):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # Listado de reportes: filtra por autor y ordena por fecha.
+            models.Index(
+                models.F("created_by"),
+                models.F("created_at").desc(),
+                name="report_owner_created_idx",
+                condition=models.Q(deleted__isnull=True),
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name